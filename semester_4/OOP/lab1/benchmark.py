@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from library_system import (USAGE_REPORTS, Book, Catalog, InMemoryTransport, Librarian, Library,
+                            LoanEvent, Notification, NotificationDispatcher, ReadReplicaPool,
+                            ReplicaClient, SnapshotRecordStore, Student, TimeOrderedIdAllocator,
+                            UsageReport, set_id_factory, write_snapshot)
+
+
+def synthetic_records(count: int):
+    for i in range(count):
+        yield ("Book", f"Book title {i}", f"B{i:08d}", f"Floor {i % 5}, Shelf {chr(65 + i % 20)}",
+               False, None, f"Author {i % 5000}", f"978-{i:010d}", f"Publisher {i % 200}", 100 + i % 900)
+
+
+def bench_snapshot(sizes):
+    print(f"{'items':>12} {'pickle load':>14} {'snapshot open':>14} {'first get_item':>15} {'file MB':>9}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            pickle_path = os.path.join(tmp, "catalog.pickle")
+            snapshot_path = os.path.join(tmp, "catalog.snap")
+
+            catalog = Catalog()
+            for record in synthetic_records(size):
+                catalog.add_item(Book(*record[1:4], *record[6:]))
+            with open(pickle_path, "wb") as f:
+                pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+            del catalog
+            write_snapshot(synthetic_records(size), snapshot_path)
+
+            start = time.perf_counter()
+            with open(pickle_path, "rb") as f:
+                catalog = pickle.load(f)
+            pickle_time = time.perf_counter() - start
+            del catalog
+
+            start = time.perf_counter()
+            store = SnapshotRecordStore(snapshot_path)
+            catalog = Catalog(store)
+            open_time = time.perf_counter() - start
+            start = time.perf_counter()
+            catalog.get_item(f"B{size // 2:08d}")
+            get_time = time.perf_counter() - start
+            store.close()
+
+            size_mb = os.path.getsize(snapshot_path) / 1e6
+            print(f"{size:>12,} {pickle_time:>13.3f}s {open_time * 1000:>12.2f}ms {get_time * 1000:>13.3f}ms {size_mb:>9.1f}")
+
+
+def _replica_client(address, seconds, results):
+    client = ReplicaClient(address)
+    queries = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        client.query("search_by_title", f"title {queries % 100}")
+        queries += 1
+    client.close()
+    results.put(queries)
+
+
+def bench_replicas(items, max_workers, seconds):
+    library = Library("Benchmark Library", "1 Bench St")
+    for record in synthetic_records(items):
+        library.add_item_to_catalog(Book(*record[1:4], *record[6:]))
+
+    context = multiprocessing.get_context("fork")
+    print(f"{'workers':>8} {'queries':>10} {'QPS':>10} {'speedup':>8}")
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        with ReadReplicaPool(library, workers=workers) as pool:
+            results = context.Queue()
+            clients = [context.Process(target=_replica_client, args=(pool.address, seconds, results))
+                       for _ in range(workers * 2)]
+            for client in clients:
+                client.start()
+            total = sum(results.get() for _ in clients)
+            for client in clients:
+                client.join()
+        qps = total / seconds
+        baseline = baseline or qps
+        print(f"{workers:>8} {total:>10,} {qps:>10.1f} {qps / baseline:>7.2f}x")
+
+
+async def _deliver(count, recipients, max_queue):
+    async with NotificationDispatcher(InMemoryTransport(), max_queue=max_queue) as dispatcher:
+        for i in range(count):
+            await dispatcher.submit(Notification(f"student-{i % recipients}", f"Notification {i}"))
+    return dispatcher.get_stats()
+
+
+def bench_notifications(count, recipients, max_queue):
+    stats = asyncio.run(_deliver(count, recipients, max_queue))
+    for key, value in stats.items():
+        print(f"{key}: {value:,.1f}" if isinstance(value, float) else f"{key}: {value:,}")
+
+
+def _copying_overdue_sweep(library):
+    # The sweep as it was when borrowed_items returned a list copy
+    current_date = datetime.now()
+    count = 0
+    for student in library._students.values():
+        for item in list(student.borrowed_items):
+            if item.due_date and current_date > item.due_date:
+                count += 1
+    return count
+
+
+def _copying_statistics(library):
+    # Counting by materialising lists, as get_library_statistics used to
+    catalog = library._catalog
+    reservations = list(library._reservations.get_all())
+    return {
+        "items_by_type": catalog.count_items_by_type(),
+        "available_items": len(catalog.get_available_items()),
+        "checked_out_items": len(catalog.get_checked_out_items()),
+        "active_reservations": len([r for r in reservations if r.status == "Active"])
+    }
+
+
+def _measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_views(students, items):
+    library = Library("Benchmark Library", "1 Bench St")
+    librarian = Librarian("Bench Librarian", "bench@library.com", "555-0000", "EMP000", "General")
+    library.register_librarian(librarian)
+    for record in synthetic_records(items):
+        library.add_item_to_catalog(Book(*record[1:4], *record[6:]))
+    for i in range(students):
+        student = Student(f"Student {i}", f"student{i}@university.edu", "555-0001", f"STU{i:06d}", "CS")
+        library.register_student(student)
+        for j in range(4):
+            library.process_checkout(librarian.id, student.id, f"B{(i * 4 + j) % items:08d}")
+        library.make_reservation(student.id, f"B{i % items:08d}")
+
+    print(f"{'path':<28} {'time':>10} {'peak alloc':>12}")
+    for name, func in [("overdue sweep (copies)", _copying_overdue_sweep),
+                       ("overdue sweep (views)", Library.send_overdue_notifications),
+                       ("statistics (copies)", _copying_statistics),
+                       ("statistics (views)", Library.get_library_statistics)]:
+        elapsed, peak = _measure(func, library)
+        print(f"{name:<28} {elapsed * 1000:>8.1f}ms {peak / 1024:>10.1f}KB")
+
+
+def synthetic_loan_events(count: int, students: int):
+    majors = ["Computer Science", "Literature", "Mathematics", "Physics", "History", "Biology"]
+    item_types = ["Book", "Magazine", "DVD"]
+    departments = ["Books", "Media", "General"]
+    start = datetime(2020, 1, 1)
+    two_years = 2 * 365 * 86400
+    for i in range(count):
+        student = (i // 2) % students
+        kind = "return" if i % 2 else "checkout"
+        yield LoanEvent(kind, start + timedelta(seconds=i * two_years // count), f"student-{student}",
+                        majors[student % len(majors)], f"item-{i % 100_000}", item_types[i % 3],
+                        departments[i % 3], (i % 30) + 0.5, float(i % 7 == 0) * (i % 5))
+
+
+def bench_reports(events, students, max_groups):
+    per_student = UsageReport("loans_per_student", ("student_id",), lambda event: (event.student_id,),
+                              {"events": ("count", None), "fines": ("sum", lambda event: event.fine)})
+    for report in [USAGE_REPORTS["loans_per_major"], USAGE_REPORTS["fines_per_department"], per_student]:
+        start = time.perf_counter()
+        groups = sum(1 for _ in report.run(synthetic_loan_events(events, students), max_groups=max_groups))
+        elapsed = time.perf_counter() - start
+        print(f"{report.name:<24} {events:>12,} events {groups:>10,} groups "
+              f"{elapsed:>8.1f}s {events / elapsed:>12,.0f} events/s")
+
+
+def bench_lookup(students, lookups):
+    allocator = TimeOrderedIdAllocator()
+    for name, factory in [("uuid4", lambda: str(uuid.uuid4())), ("time-ordered", allocator.next_str)]:
+        start = time.perf_counter()
+        for _ in range(students):
+            factory()
+        elapsed = time.perf_counter() - start
+        print(f"{name + ' ids':<26} {students / elapsed:>14,.0f} ids/s")
+
+    set_id_factory(allocator.next_str)
+    library = Library("Benchmark Library", "1 Bench St")
+    for i in range(students):
+        library.register_student(Student(f"Student {i}", f"student{i}@university.edu", "555-0001",
+                                         f"STU{i:07d}", "CS"))
+    keys = [f"STU{(i * 7919) % students:07d}" for i in range(lookups)]
+
+    start = time.perf_counter()
+    for key in keys:
+        library.find_student_by_student_id(key)
+    indexed = time.perf_counter() - start
+
+    scan_keys = keys[:max(1, lookups // 1000)]
+    start = time.perf_counter()
+    for key in scan_keys:
+        next(s for s in library._students.values() if s.student_id == key)
+    scanned = (time.perf_counter() - start) * len(keys) / len(scan_keys)
+
+    print(f"{'student_id index':<26} {lookups / indexed:>14,.0f} lookups/s")
+    print(f"{'linear scan':<26} {lookups / scanned:>14,.0f} lookups/s")
+
+    start = time.perf_counter()
+    window = list(library.scan_students_by_id(*allocator.id_range(datetime(2020, 1, 1), datetime.now())))
+    print(f"{'id range scan':<26} {len(window):>14,} students in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Library system benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="cold start: pickle vs mmap snapshot")
+    snapshot_parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 5_000_000, 10_000_000])
+
+    replicas_parser = subparsers.add_parser("replicas", help="read QPS scaling over forked replicas")
+    replicas_parser.add_argument("--items", type=int, default=20_000)
+    replicas_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    replicas_parser.add_argument("--seconds", type=float, default=3.0)
+
+    notifications_parser = subparsers.add_parser("notifications", help="batched notification delivery")
+    notifications_parser.add_argument("--count", type=int, default=200_000)
+    notifications_parser.add_argument("--recipients", type=int, default=50)
+    notifications_parser.add_argument("--max-queue", type=int, default=1_000)
+
+    views_parser = subparsers.add_parser("views", help="allocations of read-only views vs copies")
+    views_parser.add_argument("--students", type=int, default=50_000)
+    views_parser.add_argument("--items", type=int, default=500_000)
+
+    reports_parser = subparsers.add_parser("reports", help="streaming group-by over synthetic loan events")
+    reports_parser.add_argument("--events", type=int, default=50_000_000)
+    reports_parser.add_argument("--students", type=int, default=1_000_000)
+    reports_parser.add_argument("--max-groups", type=int, default=100_000)
+
+    lookup_parser = subparsers.add_parser("lookup", help="patron lookups by secondary key")
+    lookup_parser.add_argument("--students", type=int, default=200_000)
+    lookup_parser.add_argument("--lookups", type=int, default=100_000)
+
+    args = parser.parse_args()
+    if args.benchmark == "snapshot":
+        bench_snapshot(args.sizes)
+    elif args.benchmark == "replicas":
+        bench_replicas(args.items, args.max_workers, args.seconds)
+    elif args.benchmark == "notifications":
+        bench_notifications(args.count, args.recipients, args.max_queue)
+    elif args.benchmark == "views":
+        bench_views(args.students, args.items)
+    elif args.benchmark == "reports":
+        bench_reports(args.events, args.students, args.max_groups)
+    elif args.benchmark == "lookup":
+        bench_lookup(args.students, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,221 @@
 from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict, deque
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Mapping, Sequence
+from email.message import EmailMessage
+from operator import attrgetter
 from datetime import datetime, timedelta
-from typing import List, Dict, Generic, TypeVar, Optional
+from typing import (Any, Callable, Iterable, Iterator, List, Dict, Generic, NamedTuple, TypeVar,
+                    Optional, Tuple, Union, TextIO)
+import asyncio
+import csv
+import gc
+import json
+import mmap
+import os
+import pickle
+import shelve
+import signal
+import smtplib
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
 import uuid
+import weakref
+import zlib
 
 # Static polymorphism with generics
 T = TypeVar('T')
+K = TypeVar('K')
+
+
+class ReadOnlySequence(Sequence, Generic[T]):
+    # Zero-copy view of a list owned by another object. The owner bumps its
+    # _version (or the attribute named by version_attr, when it owns several
+    # collections) on every change; using a view taken before the change raises
+    # RuntimeError, the same way a dict does when it changes during iteration.
+    __slots__ = ("_items", "_owner", "_version_attr", "_version")
+    
+    def __init__(self, items: List[T], owner, version_attr: str = "_version"):
+        self._items = items
+        self._owner = owner
+        self._version_attr = version_attr
+        self._version = getattr(owner, version_attr)
+    
+    def _check(self) -> None:
+        if getattr(self._owner, self._version_attr) != self._version:
+            raise RuntimeError("View is no longer valid: the underlying collection changed")
+    
+    def __getitem__(self, index):
+        self._check()
+        return self._items[index]
+    
+    def __len__(self) -> int:
+        self._check()
+        return len(self._items)
+    
+    def __iter__(self) -> Iterator[T]:
+        self._check()
+        for item in self._items:
+            yield item
+            self._check()
+    
+    def __contains__(self, item) -> bool:
+        self._check()
+        return item in self._items
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, ReadOnlySequence)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"ReadOnlySequence({self._items!r})"
+
+
+class ReadOnlyMapping(Mapping, Generic[K, T]):
+    __slots__ = ("_mapping", "_owner", "_version_attr", "_version")
+    
+    def __init__(self, mapping: Dict[K, T], owner, version_attr: str = "_version"):
+        self._mapping = mapping
+        self._owner = owner
+        self._version_attr = version_attr
+        self._version = getattr(owner, version_attr)
+    
+    def _check(self) -> None:
+        if getattr(self._owner, self._version_attr) != self._version:
+            raise RuntimeError("View is no longer valid: the underlying mapping changed")
+    
+    def __getitem__(self, key: K) -> T:
+        self._check()
+        return self._mapping[key]
+    
+    def __len__(self) -> int:
+        self._check()
+        return len(self._mapping)
+    
+    def __iter__(self) -> Iterator[K]:
+        self._check()
+        for key in self._mapping:
+            yield key
+            self._check()
+    
+    def __contains__(self, key) -> bool:
+        self._check()
+        return key in self._mapping
+    
+    def __repr__(self) -> str:
+        return f"ReadOnlyMapping({self._mapping!r})"
+
 
 class Collection(Generic[T]):
     def __init__(self):
         self._items: List[T] = []
+        self._version = 0
     
     def add(self, item: T) -> None:
         self._items.append(item)
+        self._version += 1
     
     def remove(self, item: T) -> bool:
         if item in self._items:
             self._items.remove(item)
+            self._version += 1
             return True
         return False
     
-    def get_all(self) -> List[T]:
-        return self._items.copy()
+    def get_all(self) -> ReadOnlySequence[T]:
+        return ReadOnlySequence(self._items, self)
     
     def count(self) -> int:
         return len(self._items)
 
 
+class TimeOrderedIdAllocator:
+    # Compact 64-bit ids that sort by creation time: 42 bits of milliseconds since
+    # EPOCH, 10 bits of node number and a 12-bit per-millisecond sequence. The
+    # string form is 13 fixed-width Crockford base32 characters, so ids compare
+    # the same way as strings and as integers.
+    EPOCH = datetime(2020, 1, 1)
+    ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+    STR_LENGTH = 13
+    
+    def __init__(self, node: int = 0):
+        if not 0 <= node < 1024:
+            raise ValueError("Node must be between 0 and 1023")
+        self._node = node
+        self._epoch_ms = int(self.EPOCH.timestamp() * 1000)
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+    
+    def next_id(self) -> int:
+        with self._lock:
+            now_ms = max(int(time.time() * 1000) - self._epoch_ms, self._last_ms)
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & 0xFFF
+                if self._sequence == 0:
+                    # 4096 ids in one millisecond, wait for the next one
+                    while now_ms <= self._last_ms:
+                        now_ms = int(time.time() * 1000) - self._epoch_ms
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return (now_ms << 22) | (self._node << 12) | self._sequence
+    
+    def next_str(self) -> str:
+        return self.encode(self.next_id())
+    
+    @classmethod
+    def encode(cls, value: int) -> str:
+        chars = []
+        for _ in range(cls.STR_LENGTH):
+            chars.append(cls.ALPHABET[value & 31])
+            value >>= 5
+        return "".join(reversed(chars))
+    
+    @classmethod
+    def decode(cls, value: str) -> int:
+        result = 0
+        for char in value.upper():
+            result = (result << 5) | cls.ALPHABET.index(char)
+        return result
+    
+    def timestamp_of(self, value: Union[int, str]) -> datetime:
+        if isinstance(value, str):
+            value = self.decode(value)
+        return datetime.fromtimestamp(((value >> 22) + self._epoch_ms) / 1000)
+    
+    def id_range(self, start: datetime, end: datetime) -> Tuple[str, str]:
+        # Smallest and largest id string that can be allocated in [start, end)
+        low = max(int(start.timestamp() * 1000) - self._epoch_ms, 0) << 22
+        high = (max(int(end.timestamp() * 1000) - self._epoch_ms, 0) << 22) - 1
+        return self.encode(low), self.encode(max(high, low))
+
+
+_id_factory: Callable[[], str] = lambda: str(uuid.uuid4())
+
+
+def set_id_factory(factory: Callable[[], str]) -> None:
+    # e.g. set_id_factory(TimeOrderedIdAllocator().next_str) instead of uuid4 strings
+    global _id_factory
+    _id_factory = factory
+
+
 class Person:
     def __init__(self, name: str, email: str, phone: str):
-        self._id = str(uuid.uuid4())
+        self._id = _id_factory()
         self._name = name
         self._email = email
         self._phone = phone
         self._registration_date = datetime.now()
+        # Called with (person, new_email) before the email changes; may raise
+        # ValueError to reject it (used by the library's email index)
+        self._email_listeners: List[Callable[['Person', str], None]] = []
     
     @property
     def id(self) -> str:
@@ -49,10 +232,15 @@ class Person:
     @email.setter
     def email(self, value: str) -> None:
         if '@' in value:  # Simple validation
+            for listener in self._email_listeners:
+                listener(self, value)
             self._email = value
         else:
             raise ValueError("Invalid email format")
     
+    def add_email_listener(self, listener: Callable[['Person', str], None]) -> None:
+        self._email_listeners.append(listener)
+    
     @property
     def phone(self) -> str:
         return self._phone
@@ -77,7 +265,7 @@ class Student(Person):
         self._student_id = student_id
         self._major = major
         self._borrowed_items: List[LibraryItem] = []
-        self._max_items = 5
+        self._version = 0  # Invalidates borrowed_items views
         self._fine_balance = 0.0
     
     @property
@@ -89,28 +277,31 @@ class Student(Person):
         return self._major
     
     @property
-    def borrowed_items(self) -> List['LibraryItem']:
-        return self._borrowed_items.copy()
+    def borrowed_items(self) -> ReadOnlySequence['LibraryItem']:
+        return ReadOnlySequence(self._borrowed_items, self)
     
     @property
     def fine_balance(self) -> float:
         return self._fine_balance
     
-    def can_borrow(self) -> bool:
-        return len(self._borrowed_items) < self._max_items and self._fine_balance <= 10.0
+    def can_borrow(self, terms: 'LoanTerms' = None) -> bool:
+        terms = terms or default_policy().terms("*", type(self).__name__)
+        return len(self._borrowed_items) < terms.max_items and self._fine_balance <= terms.max_fine_balance
     
-    def borrow_item(self, item: 'LibraryItem') -> bool:
-        if not self.can_borrow():
+    def borrow_item(self, item: 'LibraryItem', terms: 'LoanTerms' = None) -> bool:
+        if not self.can_borrow(terms):
             return False
         if item.is_available():
             self._borrowed_items.append(item)
+            self._version += 1
             return True
         return False
     
-    def return_item(self, item: 'LibraryItem') -> float:
+    def return_item(self, item: 'LibraryItem', terms: 'LoanTerms' = None) -> float:
         if item in self._borrowed_items:
             self._borrowed_items.remove(item)
-            fine = item.calculate_fine()
+            self._version += 1
+            fine = item.calculate_fine(terms)
             self._fine_balance += fine
             return fine
         return 0.0
@@ -162,33 +353,23 @@ class Librarian(Person):
             return True
         return False
     
-    def can_manage_item(self, item: 'LibraryItem') -> bool:
-        # Different departments handle different types of items
-        if self._department == "Books" and isinstance(item, Book):
-            return True
-        elif self._department == "Media" and isinstance(item, (DVD, Magazine)):
-            return True
-        elif self._department == "General":
-            return True
-        return False
+    def can_manage_item(self, item: 'LibraryItem', policy: 'LoanPolicy' = None) -> bool:
+        # Which departments handle which types of items is part of the loan policy
+        policy = policy or default_policy()
+        return policy.can_manage(self._department, type(item).__name__)
     
-    def process_return(self, student: Student, item: 'LibraryItem') -> float:
-        fine = student.return_item(item)
+    def process_return(self, student: Student, item: 'LibraryItem', terms: 'LoanTerms' = None) -> float:
+        fine = student.return_item(item, terms)
         item.return_to_library()
-        if fine > 0:
-            notification = Notification(
-                student.id, 
-                f"Fine of ${fine:.2f} charged for late return of {item.title}"
-            )
-            return fine
-        return 0.0
+        return fine
     
-    def issue_item(self, student: Student, item: 'LibraryItem') -> bool:
-        if not student.can_borrow() or not item.is_available():
+    def issue_item(self, student: Student, item: 'LibraryItem', terms: 'LoanTerms' = None) -> bool:
+        terms = terms or item.get_loan_terms()
+        if not student.can_borrow(terms) or not item.is_available():
             return False
         
-        if student.borrow_item(item):
-            item.check_out()
+        if student.borrow_item(item, terms):
+            item.check_out(terms.loan_period)
             return True
         return False
 
@@ -200,7 +381,7 @@ class LibraryItem(ABC):
         self._location = location
         self._checked_out = False
         self._due_date = None
-        self._daily_fine = 1.0  # Default fine per day
+        self._dirty = False  # Set when state must be written back to a record store
     
     @property
     def title(self) -> str:
@@ -217,6 +398,7 @@ class LibraryItem(ABC):
     @location.setter
     def location(self, value: str) -> None:
         self._location = value
+        self._dirty = True
     
     @property
     def is_checked_out(self) -> bool:
@@ -226,33 +408,66 @@ class LibraryItem(ABC):
     def due_date(self) -> Optional[datetime]:
         return self._due_date
     
+    @property
+    def is_dirty(self) -> bool:
+        return self._dirty
+    
+    def mark_clean(self) -> None:
+        self._dirty = False
+    
     def is_available(self) -> bool:
         return not self._checked_out
     
-    def check_out(self) -> None:
+    def check_out(self, loan_period: timedelta = None) -> None:
         if not self._checked_out:
             self._checked_out = True
-            self._due_date = datetime.now() + self.get_loan_period()
+            self._due_date = datetime.now() + (loan_period or self.get_loan_period())
+            self._dirty = True
     
     def return_to_library(self) -> None:
         self._checked_out = False
         self._due_date = None
+        self._dirty = True
+    
+    def to_record(self) -> tuple:
+        due_date = self._due_date.timestamp() if self._due_date else None
+        return (type(self).__name__, self._title, self._item_id, self._location,
+                self._checked_out, due_date) + self._record_fields()
+    
+    @staticmethod
+    def from_record(record: tuple) -> 'LibraryItem':
+        item_type, title, item_id, location, checked_out, due_date = record[:6]
+        cls = ITEM_TYPES[item_type]
+        item = cls(title, item_id, location, *cls._decode_fields(record[6:]))
+        item._checked_out = checked_out
+        item._due_date = datetime.fromtimestamp(due_date) if due_date is not None else None
+        return item
     
     @abstractmethod
-    def get_loan_period(self) -> timedelta:
+    def _record_fields(self) -> tuple:
         pass
     
+    @classmethod
+    def _decode_fields(cls, fields: tuple) -> tuple:
+        return fields
+    
+    def get_loan_terms(self) -> 'LoanTerms':
+        return default_policy().terms(type(self).__name__)
+    
+    def get_loan_period(self) -> timedelta:
+        return self.get_loan_terms().loan_period
+    
     @abstractmethod
     def get_item_details(self) -> Dict:
         pass
     
-    def calculate_fine(self) -> float:
+    def calculate_fine(self, terms: 'LoanTerms' = None) -> float:
         if not self._checked_out or not self._due_date:
             return 0.0
         
         days_overdue = (datetime.now() - self._due_date).days
         if days_overdue > 0:
-            return days_overdue * self._daily_fine
+            return days_overdue * (terms or self.get_loan_terms()).daily_fine
         return 0.0
     
     def __str__(self) -> str:
@@ -267,7 +482,6 @@ class Book(LibraryItem):
         self._isbn = isbn
         self._publisher = publisher
         self._pages = pages
-        self._daily_fine = 0.5  # Lower fine for books
     
     @property
     def author(self) -> str:
@@ -285,8 +499,8 @@ class Book(LibraryItem):
     def pages(self) -> int:
         return self._pages
     
-    def get_loan_period(self) -> timedelta:
-        return timedelta(days=21)  # 3 weeks for books
+    def _record_fields(self) -> tuple:
+        return (self._author, self._isbn, self._publisher, self._pages)
     
     def get_item_details(self) -> Dict:
         return {
@@ -309,7 +523,6 @@ class Magazine(LibraryItem):
         self._publisher = publisher
         self._issue_number = issue_number
         self._publication_date = publication_date
-        self._daily_fine = 1.0
     
     @property
     def publisher(self) -> str:
@@ -323,8 +536,13 @@ class Magazine(LibraryItem):
     def publication_date(self) -> datetime:
         return self._publication_date
     
-    def get_loan_period(self) -> timedelta:
-        return timedelta(days=7)  # 1 week for magazines
+    def _record_fields(self) -> tuple:
+        return (self._publisher, self._issue_number, self._publication_date.timestamp())
+    
+    @classmethod
+    def _decode_fields(cls, fields: tuple) -> tuple:
+        publisher, issue_number, publication_date = fields
+        return (publisher, issue_number, datetime.fromtimestamp(publication_date))
     
     def get_item_details(self) -> Dict:
         return {
@@ -347,7 +565,6 @@ class DVD(LibraryItem):
         self._runtime = runtime
         self._genre = genre
         self._release_year = release_year
-        self._daily_fine = 2.0  # Higher fine for DVDs
     
     @property
     def director(self) -> str:
@@ -365,8 +582,8 @@ class DVD(LibraryItem):
     def release_year(self) -> int:
         return self._release_year
     
-    def get_loan_period(self) -> timedelta:
-        return timedelta(days=3)  # 3 days for DVDs
+    def _record_fields(self) -> tuple:
+        return (self._director, self._runtime, self._genre, self._release_year)
     
     def get_item_details(self) -> Dict:
         return {
@@ -383,46 +600,581 @@ class DVD(LibraryItem):
         }
 
 
+ITEM_TYPES: Dict[str, type] = {"Book": Book, "Magazine": Magazine, "DVD": DVD}
+
+
+class LoanTerms(NamedTuple):
+    loan_days: int
+    daily_fine: float
+    max_items: int
+    max_fine_balance: float
+    
+    @property
+    def loan_period(self) -> timedelta:
+        return timedelta(days=self.loan_days)
+
+
+# Rules match on item_type, patron_type and branch (the library name); a missing
+# key or "*" matches anything, and more specific rules override less specific ones
+DEFAULT_POLICY_CONFIG: Dict = {
+    "defaults": {"loan_days": 14, "daily_fine": 1.0, "max_items": 5, "max_fine_balance": 10.0},
+    "rules": [
+        {"item_type": "Book", "loan_days": 21, "daily_fine": 0.5},
+        {"item_type": "Magazine", "loan_days": 7, "daily_fine": 1.0},
+        {"item_type": "DVD", "loan_days": 3, "daily_fine": 2.0}
+    ],
+    "departments": {"Books": ["Book"], "Media": ["DVD", "Magazine"], "General": ["*"]}
+}
+
+_POLICY_KEYS = ("item_type", "patron_type", "branch")
+
+
+class LoanPolicy:
+    # Compiled once into flat tables: every (item type, patron type, branch)
+    # combination named in the config gets its resolved LoanTerms, so a lookup
+    # is a single dict access
+    def __init__(self, config: Dict):
+        self._check_shape(config)
+        defaults = config.get("defaults", {})
+        missing = [field for field in LoanTerms._fields if field not in defaults]
+        if missing:
+            raise ValueError(f"Policy defaults are missing: {', '.join(missing)}")
+        rules = config.get("rules", [])
+        for rule in rules:
+            unknown = set(rule) - set(_POLICY_KEYS) - set(LoanTerms._fields)
+            if unknown:
+                raise ValueError(f"Unknown policy rule field(s): {', '.join(sorted(unknown))}")
+        
+        self._item_types = {"*"} | set(ITEM_TYPES) | {r.get("item_type", "*") for r in rules}
+        self._patron_types = {"*", "Student"} | {r.get("patron_type", "*") for r in rules}
+        self._branches = {"*"} | {r.get("branch", "*") for r in rules}
+        
+        ordered = sorted(rules, key=lambda r: sum(r.get(k, "*") != "*" for k in _POLICY_KEYS))
+        self._terms: Dict[Tuple[str, str, str], LoanTerms] = {}
+        for item_type in self._item_types:
+            for patron_type in self._patron_types:
+                for branch in self._branches:
+                    key = (item_type, patron_type, branch)
+                    values = dict(defaults)
+                    for rule in ordered:
+                        if all(rule.get(k, "*") in ("*", v) for k, v in zip(_POLICY_KEYS, key)):
+                            values.update((f, rule[f]) for f in LoanTerms._fields if f in rule)
+                    self._terms[key] = LoanTerms(int(values["loan_days"]), float(values["daily_fine"]),
+                                                 int(values["max_items"]), float(values["max_fine_balance"]))
+        
+        departments = config.get("departments", {})
+        self._manage_all = {d for d, types in departments.items() if "*" in types}
+        self._managed = {(d, t) for d, types in departments.items() for t in types}
+    
+    @staticmethod
+    def _check_shape(config) -> None:
+        # Valid JSON of the wrong shape must fail with ValueError like any other bad policy
+        if not isinstance(config, dict):
+            raise ValueError("Policy config must be an object")
+        defaults = config.get("defaults", {})
+        rules = config.get("rules", [])
+        departments = config.get("departments", {})
+        if not isinstance(defaults, dict):
+            raise ValueError("Policy defaults must be an object")
+        if not isinstance(rules, list) or not all(isinstance(rule, dict) for rule in rules):
+            raise ValueError("Policy rules must be a list of objects")
+        if not isinstance(departments, dict) or not all(
+                isinstance(types, list) and all(isinstance(t, str) for t in types) for types in departments.values()):
+            raise ValueError("Policy departments must map department names to lists of item types")
+        for values in [defaults, *rules]:
+            for field, value in values.items():
+                if field in _POLICY_KEYS and not isinstance(value, str):
+                    raise ValueError(f"Policy field {field} must be a string")
+                if field in LoanTerms._fields and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                    raise ValueError(f"Policy field {field} must be a number")
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'LoanPolicy':
+        with open(path) as f:
+            return cls(json.load(f))
+    
+    def terms(self, item_type: str, patron_type: str = "Student", branch: str = "*") -> LoanTerms:
+        return self._terms[(item_type if item_type in self._item_types else "*",
+                            patron_type if patron_type in self._patron_types else "*",
+                            branch if branch in self._branches else "*")]
+    
+    def can_manage(self, department: str, item_type: str) -> bool:
+        return department in self._manage_all or (department, item_type) in self._managed
+
+
+class PolicyEngine:
+    # Holds the current LoanPolicy. When backed by a JSON file, the file is
+    # checked at most every check_interval seconds and recompiled when it
+    # changes; a broken file keeps the previous policy in force.
+    def __init__(self, path: str = None, check_interval: float = 1.0):
+        self._path = path
+        self._check_interval = check_interval
+        self._next_check = 0.0
+        self._mtime = None
+        self._last_error: Optional[str] = None
+        self._policy = LoanPolicy(DEFAULT_POLICY_CONFIG)
+        if path is not None:
+            self._mtime = os.stat(path).st_mtime_ns
+            self._policy = LoanPolicy.from_file(path)
+            self._next_check = time.monotonic() + check_interval
+    
+    @property
+    def policy(self) -> LoanPolicy:
+        if self._path is not None and time.monotonic() >= self._next_check:
+            self.reload_if_changed()
+        return self._policy
+    
+    @property
+    def last_error(self) -> Optional[str]:
+        return self._last_error
+    
+    def reload_if_changed(self) -> bool:
+        self._next_check = time.monotonic() + self._check_interval
+        try:
+            mtime = os.stat(self._path).st_mtime_ns
+            if mtime == self._mtime:
+                return False
+            self._policy = LoanPolicy.from_file(self._path)
+        except (OSError, ValueError) as e:
+            self._last_error = str(e)
+            return False
+        self._mtime = mtime
+        self._last_error = None
+        return True
+
+
+_default_policy_engine = PolicyEngine()
+
+
+def default_policy() -> LoanPolicy:
+    return _default_policy_engine.policy
+
+
+def set_default_policy_engine(engine: PolicyEngine) -> None:
+    global _default_policy_engine
+    _default_policy_engine = engine
+
+
+class DiskRecordStore:
+    # Item records are plain tuples (see LibraryItem.to_record), not pickled objects
+    def __init__(self, path: str):
+        self._db = shelve.open(path)
+    
+    def get(self, item_id: str) -> Optional[tuple]:
+        return self._db.get(item_id)
+    
+    def put(self, item_id: str, record: tuple) -> None:
+        self._db[item_id] = record
+    
+    def delete(self, item_id: str) -> bool:
+        if item_id in self._db:
+            del self._db[item_id]
+            return True
+        return False
+    
+    def keys(self) -> List[str]:
+        return list(self._db.keys())
+    
+    def __len__(self) -> int:
+        return len(self._db)
+    
+    def sync(self) -> None:
+        self._db.sync()
+    
+    def close(self) -> None:
+        self._db.close()
+
+
+# Binary snapshot layout (all integers little-endian):
+#   header | string offsets (u64 * (n_strings + 1)) | string blob (utf-8)
+#   | item records (fixed width) | hash index (u32 slots, record number + 1)
+SNAPSHOT_MAGIC = b"LIBSNAP\0"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<8sHHIQQQQQ")
+_SNAPSHOT_RECORD = struct.Struct("<B?2xIIIq4q")
+_SNAPSHOT_NO_DATE = -(2 ** 63)
+# Per item type: how the type-specific record fields are encoded
+# (s = interned string, i = integer, t = timestamp in microseconds)
+_SNAPSHOT_TYPES = [("Book", "sssi"), ("Magazine", "sst"), ("DVD", "sisi")]
+_SNAPSHOT_TYPE_CODES = {name: code for code, (name, _) in enumerate(_SNAPSHOT_TYPES)}
+
+
+def _hash_item_id(item_id: bytes) -> int:
+    return zlib.crc32(item_id)
+
+
+def write_snapshot(records: Iterable[tuple], path: str) -> int:
+    strings: Dict[str, int] = {}
+    string_list: List[str] = []
+    packed = bytearray()
+    item_hashes = array("I")
+
+    def intern(value: str) -> int:
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(string_list)
+            string_list.append(value)
+        return sid
+
+    for record in records:
+        item_type, title, item_id, location, checked_out, due_date = record[:6]
+        code = _SNAPSHOT_TYPE_CODES[item_type]
+        fields = [0, 0, 0, 0]
+        for slot, (kind, value) in enumerate(zip(_SNAPSHOT_TYPES[code][1], record[6:])):
+            if kind == "s":
+                fields[slot] = intern(value)
+            elif kind == "t":
+                fields[slot] = round(value * 1_000_000)
+            else:
+                fields[slot] = value
+        due = round(due_date * 1_000_000) if due_date is not None else _SNAPSHOT_NO_DATE
+        packed += _SNAPSHOT_RECORD.pack(code, checked_out, intern(title), intern(item_id),
+                                        intern(location), due, *fields)
+        item_hashes.append(_hash_item_id(item_id.encode()))
+
+    count = len(item_hashes)
+    slots = 8
+    while slots < count * 2:
+        slots *= 2
+    index = array("I", bytes(4 * slots))
+    for record_no, item_hash in enumerate(item_hashes):
+        slot = item_hash & (slots - 1)
+        while index[slot]:
+            slot = (slot + 1) & (slots - 1)
+        index[slot] = record_no + 1
+
+    blob = bytearray()
+    offsets = array("Q", [0])
+    for value in string_list:
+        blob += value.encode()
+        offsets.append(len(blob))
+
+    strings_offset = _SNAPSHOT_HEADER.size
+    records_offset = strings_offset + 8 * len(offsets) + len(blob)
+    index_offset = records_offset + len(packed)
+    header = _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, _SNAPSHOT_RECORD.size, 0,
+                                   count, len(string_list), records_offset, index_offset, slots)
+
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        index.byteswap()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(offsets.tobytes())
+        f.write(blob)
+        f.write(packed)
+        f.write(index.tobytes())
+    os.replace(tmp_path, path)
+    return count
+
+
+def save_snapshot(catalog: 'Catalog', path: str) -> int:
+    return write_snapshot(catalog.iter_records(), path)
+
+
+class SnapshotRecordStore:
+    # Opening only maps the file; records are decoded when they are looked up.
+    # The snapshot itself is read-only, changes are kept in an in-memory overlay
+    # until they are persisted with save_snapshot().
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, record_size, _, self._count, string_count,
+         self._records_offset, index_offset, self._slots) = _SNAPSHOT_HEADER.unpack_from(self._mm, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a library snapshot")
+        if version != SNAPSHOT_VERSION or record_size != _SNAPSHOT_RECORD.size:
+            self._mm.close()
+            raise ValueError(f"Unsupported snapshot version {version}")
+        view = memoryview(self._mm)
+        strings_offset = _SNAPSHOT_HEADER.size
+        blob_offset = strings_offset + 8 * (string_count + 1)
+        self._view = view
+        self._string_offsets = view[strings_offset:blob_offset].cast("Q")
+        self._blob_offset = blob_offset
+        self._index = view[index_offset:index_offset + 4 * self._slots].cast("I")
+        if sys.byteorder != "little":
+            self._string_offsets = array("Q", self._string_offsets)
+            self._string_offsets.byteswap()
+            self._index = array("I", self._index)
+            self._index.byteswap()
+        self._overlay: Dict[str, tuple] = {}
+        self._deleted: set = set()
+    
+    def _string(self, sid: int) -> str:
+        start = self._blob_offset + self._string_offsets[sid]
+        end = self._blob_offset + self._string_offsets[sid + 1]
+        return str(self._mm[start:end], "utf-8")
+    
+    def _unpack(self, record_no: int) -> tuple:
+        return _SNAPSHOT_RECORD.unpack_from(self._mm, self._records_offset + record_no * _SNAPSHOT_RECORD.size)
+    
+    def _find(self, item_id: str) -> int:
+        key = item_id.encode()
+        mask = self._slots - 1
+        slot = _hash_item_id(key) & mask
+        while True:
+            entry = self._index[slot]
+            if not entry:
+                return -1
+            if self._string(self._unpack(entry - 1)[3]) == item_id:
+                return entry - 1
+            slot = (slot + 1) & mask
+    
+    def _decode(self, record_no: int) -> tuple:
+        code, checked_out, title, item_id, location, due, *fields = self._unpack(record_no)
+        item_type, kinds = _SNAPSHOT_TYPES[code]
+        values = []
+        for kind, value in zip(kinds, fields):
+            if kind == "s":
+                values.append(self._string(value))
+            elif kind == "t":
+                values.append(value / 1_000_000)
+            else:
+                values.append(value)
+        due_date = due / 1_000_000 if due != _SNAPSHOT_NO_DATE else None
+        return (item_type, self._string(title), self._string(item_id), self._string(location),
+                checked_out, due_date) + tuple(values)
+    
+    def get(self, item_id: str) -> Optional[tuple]:
+        record = self._overlay.get(item_id)
+        if record is not None or item_id in self._deleted:
+            return record
+        record_no = self._find(item_id)
+        return self._decode(record_no) if record_no >= 0 else None
+    
+    def put(self, item_id: str, record: tuple) -> None:
+        self._overlay[item_id] = record
+        self._deleted.discard(item_id)
+    
+    def delete(self, item_id: str) -> bool:
+        if self.get(item_id) is None:
+            return False
+        self._overlay.pop(item_id, None)
+        self._deleted.add(item_id)
+        return True
+    
+    def _snapshot_ids(self) -> Iterator[str]:
+        for record_no in range(self._count):
+            yield self._string(self._unpack(record_no)[3])
+    
+    def keys(self) -> List[str]:
+        keys = [item_id for item_id in self._snapshot_ids()
+                if item_id not in self._deleted and item_id not in self._overlay]
+        keys.extend(self._overlay)
+        return keys
+    
+    def __len__(self) -> int:
+        return len(self.keys()) if self._overlay or self._deleted else self._count
+    
+    def sync(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        if isinstance(self._index, memoryview):
+            self._string_offsets.release()
+            self._index.release()
+        self._view.release()
+        self._mm.close()
+
+
+class LRUCache(Generic[T]):
+    def __init__(self, capacity: int, on_evict: Callable[[str, T], None] = None):
+        if capacity <= 0:
+            raise ValueError("Cache capacity must be positive")
+        self._capacity = capacity
+        self._entries: OrderedDict = OrderedDict()
+        self._on_evict = on_evict
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+    
+    def get(self, key: str) -> Optional[T]:
+        value = self._entries.get(key)
+        if value is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+    
+    def put(self, key: str, value: T) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._capacity:
+            old_key, old_value = self._entries.popitem(last=False)
+            self._evictions += 1
+            if self._on_evict:
+                self._on_evict(old_key, old_value)
+    
+    def pop(self, key: str) -> Optional[T]:
+        return self._entries.pop(key, None)
+    
+    def values(self) -> List[T]:
+        return list(self._entries.values())
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_stats(self) -> Dict:
+        lookups = self._hits + self._misses
+        return {
+            "capacity": self._capacity,
+            "size": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate": self._hits / lookups if lookups else 0.0
+        }
+
+
 class Catalog:
-    def __init__(self):
+    # store is a DiskRecordStore or a SnapshotRecordStore
+    def __init__(self, store=None, cache_size: int = 1024):
         self._items: Dict[str, LibraryItem] = {}
+        self._store = store
+        self._cache: Optional[LRUCache[LibraryItem]] = None
+        # Items evicted from the cache but still referenced elsewhere (e.g. by a
+        # student's loans) must not be hydrated a second time as a new object
+        self._live: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._hydrations = 0
+        self._write_backs = 0
+        self._read_only = False
+        if store is not None:
+            self._cache = LRUCache(cache_size, self._write_back)
+    
+    @property
+    def is_disk_backed(self) -> bool:
+        return self._store is not None
+    
+    def __getstate__(self) -> Dict:
+        if self._store is not None:
+            raise TypeError("A disk-backed Catalog cannot be pickled, use save_snapshot() instead")
+        state = self.__dict__.copy()
+        del state["_live"]
+        return state
+    
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._live = weakref.WeakValueDictionary()
+    
+    def iter_records(self) -> Iterator[tuple]:
+        if self._store is None:
+            for item in self._items.values():
+                yield item.to_record()
+            return
+        self.flush()
+        for item_id in self._store.keys():
+            yield self._store.get(item_id)
     
     def add_item(self, item: LibraryItem) -> None:
-        self._items[item.item_id] = item
+        if self._store is None:
+            self._items[item.item_id] = item
+            return
+        self._store.put(item.item_id, item.to_record())
+        item.mark_clean()
+        self._live[item.item_id] = item
+        self._cache.put(item.item_id, item)
     
     def remove_item(self, item_id: str) -> bool:
-        if item_id in self._items:
-            del self._items[item_id]
-            return True
-        return False
+        if self._store is None:
+            if item_id in self._items:
+                del self._items[item_id]
+                return True
+            return False
+        self._cache.pop(item_id)
+        self._live.pop(item_id, None)
+        return self._store.delete(item_id)
     
     def get_item(self, item_id: str) -> Optional[LibraryItem]:
-        return self._items.get(item_id)
+        if self._store is None:
+            return self._items.get(item_id)
+        item = self._cache.get(item_id)
+        if item is None:
+            item = self._live.get(item_id)
+            if item is None:
+                record = self._store.get(item_id)
+                if record is None:
+                    return None
+                item = LibraryItem.from_record(record)
+                self._live[item_id] = item
+                self._hydrations += 1
+            self._cache.put(item_id, item)
+        return item
+    
+    def iter_items(self) -> Iterator[LibraryItem]:
+        return self._iter_items()
+    
+    def _iter_items(self):
+        if self._store is None:
+            return iter(self._items.values())
+        return (self.get_item(item_id) for item_id in self._store.keys())
+    
+    def set_read_only(self) -> None:
+        # Used by read replicas: they share the record store with the primary
+        # and must never write to it
+        self._read_only = True
+    
+    def _write_back(self, item_id: str, item: LibraryItem) -> None:
+        if item.is_dirty and not self._read_only:
+            self._store.put(item_id, item.to_record())
+            item.mark_clean()
+            self._write_backs += 1
+    
+    def flush(self) -> int:
+        if self._store is None or self._read_only:
+            return 0
+        written = self._write_backs
+        for item in list(self._live.values()):
+            self._write_back(item.item_id, item)
+        self._store.sync()
+        return self._write_backs - written
+    
+    def cache_stats(self) -> Optional[Dict]:
+        if self._cache is None:
+            return None
+        stats = self._cache.get_stats()
+        stats["hydrations"] = self._hydrations
+        stats["write_backs"] = self._write_backs
+        stats["resident"] = len(self._live)
+        return stats
     
     def search_by_title(self, title: str) -> List[LibraryItem]:
-        return [item for item in self._items.values() if title.lower() in item.title.lower()]
+        return [item for item in self._iter_items() if title.lower() in item.title.lower()]
     
     def get_available_items(self) -> List[LibraryItem]:
-        return [item for item in self._items.values() if item.is_available()]
+        return [item for item in self._iter_items() if item.is_available()]
     
     def get_checked_out_items(self) -> List[LibraryItem]:
-        return [item for item in self._items.values() if item.is_checked_out]
+        return [item for item in self._iter_items() if item.is_checked_out]
+    
+    def count_available_items(self) -> int:
+        return sum(map(LibraryItem.is_available, self._iter_items()))
+    
+    def count_checked_out_items(self) -> int:
+        return sum(map(attrgetter("is_checked_out"), self._iter_items()))
     
     def count_items_by_type(self) -> Dict[str, int]:
-        result = {"Book": 0, "Magazine": 0, "DVD": 0}
+        result = dict.fromkeys(ITEM_TYPES, 0)
+        if self._store is not None:
+            # The item type is the first record field, no need to hydrate
+            for item_id in self._store.keys():
+                result[self._store.get(item_id)[0]] += 1
+            return result
         for item in self._items.values():
-            if isinstance(item, Book):
-                result["Book"] += 1
-            elif isinstance(item, Magazine):
-                result["Magazine"] += 1
-            elif isinstance(item, DVD):
-                result["DVD"] += 1
+            result[type(item).__name__] += 1
         return result
 
 
 class Reservation:
     def __init__(self, student: Student, item: LibraryItem, reservation_date: datetime = None):
-        self._id = str(uuid.uuid4())
+        self._id = _id_factory()
         self._student = student
         self._item = item
         self._reservation_date = reservation_date or datetime.now()
@@ -479,7 +1231,7 @@ class Reservation:
 
 class Notification:
     def __init__(self, recipient_id: str, message: str, created_at: datetime = None):
-        self._id = str(uuid.uuid4())
+        self._id = _id_factory()
         self._recipient_id = recipient_id
         self._message = message
         self._created_at = created_at or datetime.now()
@@ -516,15 +1268,42 @@ class Notification:
         return f"[{status}] [{self._created_at.strftime('%Y-%m-%d %H:%M')}] {self._message}"
 
 
+class LoanEvent(NamedTuple):
+    kind: str  # "checkout" or "return"
+    timestamp: datetime
+    student_id: str
+    major: str
+    item_id: str
+    item_type: str
+    department: str  # Department of the librarian who processed the loan
+    loan_days: float = 0.0  # Returns only
+    fine: float = 0.0  # Returns only
+
+
 class Library:
-    def __init__(self, name: str, address: str):
+    def __init__(self, name: str, address: str, catalog: Catalog = None, policy_engine: PolicyEngine = None):
         self._name = name
         self._address = address
-        self._catalog = Catalog()
+        self._catalog = catalog if catalog is not None else Catalog()
+        self._policy_engine = policy_engine
         self._students: Dict[str, Student] = {}
         self._librarians: Dict[str, Librarian] = {}
         self._reservations: Collection[Reservation] = Collection[Reservation]()
         self._notifications: List[Notification] = []
+        self._outbox: deque = deque()  # Notifications not yet handed to a dispatcher
+        # Each collection has its own version, so that a view of one is not
+        # invalidated by changes to the others
+        self._students_version = 0
+        self._librarians_version = 0
+        self._notifications_version = 0
+        self._loan_history_version = 0
+        self._loan_history: List[LoanEvent] = []
+        self._open_loans: Dict[str, datetime] = {}
+        # Unique secondary indexes for kiosk lookups
+        self._students_by_student_id: Dict[str, Student] = {}
+        self._librarians_by_employee_id: Dict[str, Librarian] = {}
+        self._people_by_email: Dict[str, Person] = {}
+        self._student_ids_sorted: List[str] = []  # For range scans over time-ordered ids
     
     @property
     def name(self) -> str:
@@ -534,11 +1313,80 @@ class Library:
     def address(self) -> str:
         return self._address
     
+    @property
+    def students(self) -> ReadOnlyMapping[str, Student]:
+        return ReadOnlyMapping(self._students, self, "_students_version")
+    
+    @property
+    def librarians(self) -> ReadOnlyMapping[str, Librarian]:
+        return ReadOnlyMapping(self._librarians, self, "_librarians_version")
+    
+    @property
+    def notifications(self) -> ReadOnlySequence[Notification]:
+        return ReadOnlySequence(self._notifications, self, "_notifications_version")
+    
+    @property
+    def loan_history(self) -> ReadOnlySequence[LoanEvent]:
+        return ReadOnlySequence(self._loan_history, self, "_loan_history_version")
+    
+    def iter_items(self) -> Iterator[LibraryItem]:
+        return self._catalog.iter_items()
+    
+    def _check_unique(self, index: Dict[str, Person], key: str, person: Person, field: str) -> None:
+        owner = index.get(key)
+        if owner is not None and owner is not person:
+            raise ValueError(f"{field} {key} is already registered")
+    
+    def _reindex_email(self, person: Person, new_email: str) -> None:
+        new_key = new_email.lower()
+        self._check_unique(self._people_by_email, new_key, person, "Email")
+        old_key = person.email.lower()
+        if self._people_by_email.get(old_key) is person:
+            del self._people_by_email[old_key]
+        self._people_by_email[new_key] = person
+    
     def register_student(self, student: Student) -> None:
+        if student.id in self._students:
+            return
+        self._check_unique(self._students_by_student_id, student.student_id, student, "Student ID")
+        self._check_unique(self._people_by_email, student.email.lower(), student, "Email")
         self._students[student.id] = student
+        self._students_by_student_id[student.student_id] = student
+        self._people_by_email[student.email.lower()] = student
+        student.add_email_listener(self._reindex_email)
+        if not self._student_ids_sorted or student.id > self._student_ids_sorted[-1]:
+            self._student_ids_sorted.append(student.id)
+        else:
+            insort(self._student_ids_sorted, student.id)
+        self._students_version += 1
     
     def register_librarian(self, librarian: Librarian) -> None:
+        if librarian.id in self._librarians:
+            return
+        self._check_unique(self._librarians_by_employee_id, librarian.employee_id, librarian, "Employee ID")
+        self._check_unique(self._people_by_email, librarian.email.lower(), librarian, "Email")
         self._librarians[librarian.id] = librarian
+        self._librarians_by_employee_id[librarian.employee_id] = librarian
+        self._people_by_email[librarian.email.lower()] = librarian
+        librarian.add_email_listener(self._reindex_email)
+        self._librarians_version += 1
+    
+    def find_student_by_student_id(self, student_id: str) -> Optional[Student]:
+        return self._students_by_student_id.get(student_id)
+    
+    def find_librarian_by_employee_id(self, employee_id: str) -> Optional[Librarian]:
+        return self._librarians_by_employee_id.get(employee_id)
+    
+    def find_person_by_email(self, email: str) -> Optional[Person]:
+        return self._people_by_email.get(email.lower())
+    
+    def scan_students_by_id(self, low: str, high: str) -> Iterator[Student]:
+        # With time-ordered ids (see TimeOrderedIdAllocator.id_range) this
+        # returns the students registered in a time window
+        start = bisect_left(self._student_ids_sorted, low)
+        end = bisect_right(self._student_ids_sorted, high)
+        for person_id in self._student_ids_sorted[start:end]:
+            yield self._students[person_id]
     
     def add_item_to_catalog(self, item: LibraryItem) -> None:
         self._catalog.add_item(item)
@@ -549,9 +1397,30 @@ class Library:
     def get_librarian(self, librarian_id: str) -> Optional[Librarian]:
         return self._librarians.get(librarian_id)
     
+    @property
+    def policy(self) -> LoanPolicy:
+        if self._policy_engine is None:
+            return default_policy()
+        return self._policy_engine.policy
+    
+    def get_loan_terms(self, student: Student, item: LibraryItem) -> LoanTerms:
+        return self.policy.terms(type(item).__name__, type(student).__name__, self._name)
+    
+    def get_person(self, person_id: str) -> Optional[Person]:
+        return self._students.get(person_id) or self._librarians.get(person_id)
+    
     def get_item(self, item_id: str) -> Optional[LibraryItem]:
         return self._catalog.get_item(item_id)
     
+    def search_by_title(self, title: str) -> List[LibraryItem]:
+        return self._catalog.search_by_title(title)
+    
+    def get_available_items(self) -> List[LibraryItem]:
+        return self._catalog.get_available_items()
+    
+    def set_read_only(self) -> None:
+        self._catalog.set_read_only()
+    
     def make_reservation(self, student_id: str, item_id: str) -> Optional[Reservation]:
         student = self.get_student(student_id)
         item = self.get_item(item_id)
@@ -567,7 +1436,7 @@ class Library:
             student_id, 
             f"Reservation created for {item.title}. It will be held for 3 days."
         )
-        self._notifications.append(notification)
+        self._add_notification(notification)
         
         return reservation
     
@@ -579,12 +1448,16 @@ class Library:
         if not librarian or not student or not item:
             return False
         
-        if librarian.issue_item(student, item):
+        if librarian.issue_item(student, item, self.get_loan_terms(student, item)):
+            now = datetime.now()
+            self._open_loans[item_id] = now
+            self._record_loan_event(LoanEvent("checkout", now, student_id, student.major, item_id,
+                                              type(item).__name__, librarian.department))
             notification = Notification(
                 student_id,
                 f"You have checked out {item.title}. Due date: {item.due_date.strftime('%Y-%m-%d')}"
             )
-            self._notifications.append(notification)
+            self._add_notification(notification)
             return True
         return False
     
@@ -596,7 +1469,43 @@ class Library:
         if not librarian or not student or not item:
             return 0.0
         
-        return librarian.process_return(student, item)
+        fine = librarian.process_return(student, item, self.get_loan_terms(student, item))
+        checked_out_at = self._open_loans.pop(item_id, None)
+        if checked_out_at is not None:
+            now = datetime.now()
+            loan_days = (now - checked_out_at).total_seconds() / 86400
+            self._record_loan_event(LoanEvent("return", now, student_id, student.major, item_id,
+                                              type(item).__name__, librarian.department, loan_days, fine))
+        if fine > 0:
+            notification = Notification(
+                student_id,
+                f"Fine of ${fine:.2f} charged for late return of {item.title}"
+            )
+            self._add_notification(notification)
+        return fine
+    
+    def _record_loan_event(self, event: LoanEvent) -> None:
+        self._loan_history.append(event)
+        self._loan_history_version += 1
+    
+    def _add_notification(self, notification: Notification) -> None:
+        self._notifications.append(notification)
+        self._outbox.append(notification)
+        self._notifications_version += 1
+    
+    @property
+    def pending_delivery(self) -> int:
+        return len(self._outbox)
+    
+    async def deliver_notifications(self, dispatcher: 'NotificationDispatcher') -> int:
+        # Hands queued notifications to the dispatcher; waits whenever its
+        # queue is full, so a slow transport throttles the producer
+        count = 0
+        while self._outbox:
+            await dispatcher.submit(self._outbox[0])
+            self._outbox.popleft()
+            count += 1
+        return count
     
     def send_overdue_notifications(self) -> int:
         count = 0
@@ -608,23 +1517,620 @@ class Library:
                     days_overdue = (current_date - item.due_date).days
                     notification = Notification(
                         student.id,
-                        f"OVERDUE: {item.title} was due {days_overdue} days ago. Current fine: ${item.calculate_fine():.2f}"
+                        f"OVERDUE: {item.title} was due {days_overdue} days ago. Current fine: ${item.calculate_fine(self.get_loan_terms(student, item)):.2f}"
                     )
-                    self._notifications.append(notification)
+                    self._add_notification(notification)
                     count += 1
         
         return count
     
     def get_library_statistics(self) -> Dict:
-        return {
+        stats = {
             "total_students": len(self._students),
             "total_librarians": len(self._librarians),
             "items_by_type": self._catalog.count_items_by_type(),
-            "available_items": len(self._catalog.get_available_items()),
-            "checked_out_items": len(self._catalog.get_checked_out_items()),
-            "active_reservations": len([r for r in self._reservations.get_all() if r.status == "Active"]),
+            "available_items": self._catalog.count_available_items(),
+            "checked_out_items": self._catalog.count_checked_out_items(),
+            "active_reservations": sum(1 for r in self._reservations.get_all() if r.status == "Active"),
             "total_notifications": len(self._notifications)
         }
+        if self._catalog.is_disk_backed:
+            stats["catalog_cache"] = self._catalog.cache_stats()
+        return stats
+
+
+# Aggregates: name -> (initial state, update(state, value), merge(state, other), result(state))
+_AGGREGATES: Dict[str, Tuple[Callable, Callable, Callable, Callable]] = {
+    "count": (lambda: 0, lambda state, value: state + 1, lambda a, b: a + b, lambda state: state),
+    "sum": (lambda: 0.0, lambda state, value: state + value, lambda a, b: a + b, lambda state: state),
+    "min": (lambda: None, lambda state, value: value if state is None or value < state else state,
+            lambda a, b: b if a is None or (b is not None and b < a) else a, lambda state: state),
+    "max": (lambda: None, lambda state, value: value if state is None or value > state else state,
+            lambda a, b: b if a is None or (b is not None and b > a) else a, lambda state: state),
+    "avg": (lambda: (0.0, 0), lambda state, value: (state[0] + value, state[1] + 1),
+            lambda a, b: (a[0] + b[0], a[1] + b[1]), lambda state: state[0] / state[1] if state[1] else 0.0),
+}
+
+
+class GroupByAggregator:
+    # Hash aggregation. When more than max_groups groups are held in memory the
+    # partial states are spilled to hash-partitioned files on disk and merged
+    # partition by partition when the results are read.
+    def __init__(self, key: Callable[[Any], tuple], aggregates: Dict[str, Tuple[str, Optional[Callable]]],
+                 max_groups: int = 100_000, spill_dir: str = None, partitions: int = 16):
+        unknown = [kind for kind, _ in aggregates.values() if kind not in _AGGREGATES]
+        if unknown:
+            raise ValueError(f"Unknown aggregate(s): {', '.join(unknown)}")
+        self._key = key
+        self._names = list(aggregates)
+        self._values = [value for _, value in aggregates.values()]
+        self._functions = [_AGGREGATES[kind] for kind, _ in aggregates.values()]
+        self._max_groups = max_groups
+        self._spill_dir = spill_dir
+        self._partitions = partitions
+        self._groups: Dict[tuple, list] = {}
+        self._spill_tmp: Optional[tempfile.TemporaryDirectory] = None
+        self._spill_files: List = []
+        self._spills = 0
+    
+    @property
+    def spills(self) -> int:
+        return self._spills
+    
+    def add(self, row: Any) -> None:
+        key = self._key(row)
+        state = self._groups.get(key)
+        if state is None:
+            if len(self._groups) >= self._max_groups:
+                self._spill()
+            state = self._groups[key] = [init() for init, _, _, _ in self._functions]
+        for i, (_, update, _, _) in enumerate(self._functions):
+            value = self._values[i]
+            state[i] = update(state[i], value(row) if value is not None else None)
+    
+    def feed(self, rows: Iterable) -> 'GroupByAggregator':
+        add = self.add
+        for row in rows:
+            add(row)
+        return self
+    
+    def _spill(self) -> None:
+        if not self._spill_files:
+            self._spill_tmp = tempfile.TemporaryDirectory(dir=self._spill_dir, prefix="report-spill-")
+            self._spill_files = [open(os.path.join(self._spill_tmp.name, f"part-{i}"), "w+b")
+                                 for i in range(self._partitions)]
+        for key, state in self._groups.items():
+            pickle.dump((key, state), self._spill_files[hash(key) % self._partitions],
+                        pickle.HIGHEST_PROTOCOL)
+        self._groups.clear()
+        self._spills += 1
+    
+    def _finish(self, groups: Dict[tuple, list]) -> Iterator[Tuple[tuple, Dict]]:
+        for key in sorted(groups):
+            state = groups[key]
+            yield key, {name: result(state[i])
+                        for i, (name, (_, _, _, result)) in enumerate(zip(self._names, self._functions))}
+    
+    def results(self) -> Iterator[Tuple[tuple, Dict]]:
+        # Groups come out sorted by key; after a spill they are sorted within
+        # each partition only
+        if not self._spill_files:
+            yield from self._finish(self._groups)
+            return
+        self._spill()
+        try:
+            for spill_file in self._spill_files:
+                spill_file.seek(0)
+                groups: Dict[tuple, list] = {}
+                while True:
+                    try:
+                        key, state = pickle.load(spill_file)
+                    except EOFError:
+                        break
+                    current = groups.get(key)
+                    if current is None:
+                        groups[key] = state
+                    else:
+                        for i, (_, _, merge, _) in enumerate(self._functions):
+                            current[i] = merge(current[i], state[i])
+                yield from self._finish(groups)
+        finally:
+            for spill_file in self._spill_files:
+                spill_file.close()
+            self._spill_files = []
+            self._spill_tmp.cleanup()
+
+
+class UsageReport:
+    def __init__(self, name: str, key_names: Tuple[str, ...], key: Callable[[Any], tuple],
+                 aggregates: Dict[str, Tuple[str, Optional[Callable]]], where: Callable[[Any], bool] = None):
+        self._name = name
+        self._key_names = key_names
+        self._key = key
+        self._aggregates = aggregates
+        self._where = where
+    
+    @property
+    def name(self) -> str:
+        return self._name
+    
+    @property
+    def columns(self) -> List[str]:
+        return list(self._key_names) + list(self._aggregates)
+    
+    def run(self, rows: Iterable, max_groups: int = 100_000, spill_dir: str = None) -> Iterator[Dict]:
+        aggregator = GroupByAggregator(self._key, self._aggregates, max_groups, spill_dir)
+        aggregator.feed(rows if self._where is None else filter(self._where, rows))
+        for key, values in aggregator.results():
+            row = dict(zip(self._key_names, key))
+            row.update(values)
+            yield row
+    
+    def write_csv(self, rows: Iterable, fp: TextIO, **run_options) -> int:
+        writer = csv.DictWriter(fp, fieldnames=self.columns)
+        writer.writeheader()
+        count = 0
+        for row in self.run(rows, **run_options):
+            writer.writerow(row)
+            count += 1
+        return count
+    
+    def write_json(self, rows: Iterable, fp: TextIO, **run_options) -> int:
+        # Streams a JSON array without building the whole result in memory
+        count = 0
+        fp.write("[")
+        for row in self.run(rows, **run_options):
+            fp.write(",\n" if count else "\n")
+            json.dump(row, fp)
+            count += 1
+        fp.write("\n]\n")
+        return count
+
+
+def _event_month(event: LoanEvent) -> str:
+    return f"{event.timestamp.year}-{event.timestamp.month:02d}"
+
+
+USAGE_REPORTS: Dict[str, UsageReport] = {
+    "loans_per_major": UsageReport(
+        "loans_per_major", ("month", "major"),
+        lambda event: (_event_month(event), event.major),
+        {"loans": ("count", None)},
+        where=lambda event: event.kind == "checkout"
+    ),
+    "loan_duration_per_item_type": UsageReport(
+        "loan_duration_per_item_type", ("month", "item_type"),
+        lambda event: (_event_month(event), event.item_type),
+        {"returns": ("count", None), "avg_loan_days": ("avg", attrgetter("loan_days")),
+         "max_loan_days": ("max", attrgetter("loan_days"))},
+        where=lambda event: event.kind == "return"
+    ),
+    "fines_per_department": UsageReport(
+        "fines_per_department", ("month", "department"),
+        lambda event: (_event_month(event), event.department),
+        {"fined_returns": ("count", None), "total_fines": ("sum", attrgetter("fine"))},
+        where=lambda event: event.kind == "return" and event.fine > 0
+    ),
+    # Runs over the live catalog (Library.iter_items()) rather than loan history
+    "items_by_type_and_status": UsageReport(
+        "items_by_type_and_status", ("item_type", "status"),
+        lambda item: (type(item).__name__, "Checked Out" if item.is_checked_out else "Available"),
+        {"items": ("count", None)}
+    ),
+}
+
+
+class NotificationTransport(ABC):
+    @abstractmethod
+    async def send_batch(self, recipient_id: str, notifications: List[Notification]) -> None:
+        pass
+
+
+class InMemoryTransport(NotificationTransport):
+    def __init__(self):
+        self._batches: List[Tuple[str, List[Notification]]] = []
+        self._version = 0
+    
+    @property
+    def batches(self) -> ReadOnlySequence[Tuple[str, List[Notification]]]:
+        return ReadOnlySequence(self._batches, self)
+    
+    async def send_batch(self, recipient_id: str, notifications: List[Notification]) -> None:
+        self._batches.append((recipient_id, notifications))
+        self._version += 1
+
+
+class SMTPTransport(NotificationTransport):
+    def __init__(self, host: str, port: int, sender: str,
+                 resolve_address: Callable[[str], Optional[str]]):
+        self._host = host
+        self._port = port
+        self._sender = sender
+        self._resolve_address = resolve_address
+    
+    async def send_batch(self, recipient_id: str, notifications: List[Notification]) -> None:
+        address = self._resolve_address(recipient_id)
+        if not address:
+            raise LookupError(f"No email address for recipient {recipient_id}")
+        message = EmailMessage()
+        message["From"] = self._sender
+        message["To"] = address
+        message["Subject"] = f"Library notifications ({len(notifications)})"
+        message.set_content("\n".join(n.format_notification() for n in notifications))
+        # smtplib is blocking, keep it off the event loop
+        await asyncio.to_thread(self._send, message)
+    
+    def _send(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self._host, self._port) as smtp:
+            smtp.send_message(message)
+
+
+class NotificationDispatcher:
+    # A batch the transport rejects is retried in the background with exponential
+    # backoff, so a failing recipient does not hold up the queue. Batches that still
+    # fail after max_retries are kept in undelivered.
+    def __init__(self, transport: NotificationTransport, max_queue: int = 1000,
+                 batch_size: int = 100, batch_window: float = 0.05,
+                 max_retries: int = 3, retry_delay: float = 0.5):
+        self._transport = transport
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._batch_window = batch_window
+        self._max_retries = max_retries
+        self._retry_delay = retry_delay
+        self._task: Optional[asyncio.Task] = None
+        self._retries: set = set()
+        self._undelivered: List[Notification] = []
+        self._version = 0
+        self._started_at = 0.0
+        self._delivered = 0
+        self._failed = 0
+        self._retried = 0
+        self._batches = 0
+        self._max_queue_depth = 0
+    
+    @property
+    def undelivered(self) -> ReadOnlySequence[Notification]:
+        return ReadOnlySequence(self._undelivered, self)
+    
+    async def submit(self, notification: Notification) -> None:
+        await self._queue.put(notification)
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+    
+    def submit_nowait(self, notification: Notification) -> None:
+        self._queue.put_nowait(notification)
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+    
+    def start(self) -> None:
+        if self._task is None:
+            self._started_at = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        # Waits for everything already queued to be delivered or to run out of retries
+        if self._task is None:
+            return
+        await self._queue.join()
+        while self._retries:
+            await asyncio.gather(*self._retries)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    async def __aenter__(self) -> 'NotificationDispatcher':
+        self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+    
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() < self._batch_size - 1:
+                # Give producers a moment to fill the batch
+                await asyncio.sleep(self._batch_window)
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._deliver(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _deliver(self, batch: List[Notification]) -> None:
+        by_recipient: Dict[str, List[Notification]] = {}
+        for notification in batch:
+            by_recipient.setdefault(notification.recipient_id, []).append(notification)
+        results = await asyncio.gather(
+            *(self._transport.send_batch(recipient_id, notifications)
+              for recipient_id, notifications in by_recipient.items()),
+            return_exceptions=True
+        )
+        for (recipient_id, notifications), result in zip(by_recipient.items(), results):
+            if isinstance(result, Exception):
+                retry = asyncio.create_task(self._retry(recipient_id, notifications))
+                self._retries.add(retry)
+                retry.add_done_callback(self._retries.discard)
+            else:
+                self._delivered += len(notifications)
+                self._batches += 1
+    
+    async def _retry(self, recipient_id: str, notifications: List[Notification]) -> None:
+        for attempt in range(self._max_retries):
+            await asyncio.sleep(self._retry_delay * 2 ** attempt)
+            self._retried += len(notifications)
+            try:
+                await self._transport.send_batch(recipient_id, notifications)
+            except Exception:
+                continue
+            self._delivered += len(notifications)
+            self._batches += 1
+            return
+        self._failed += len(notifications)
+        self._undelivered.extend(notifications)
+        self._version += 1
+    
+    def get_stats(self) -> Dict:
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "delivered": self._delivered,
+            "failed": self._failed,
+            "retried": self._retried,
+            "batches": self._batches,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self._max_queue_depth,
+            "throughput": self._delivered / elapsed if elapsed > 0 else 0.0
+        }
+
+
+class ReadReplicaPool:
+    # Forked workers serve read queries from a copy-on-write snapshot of the
+    # primary. A worker that serves a read from a snapshot older than
+    # max_staleness asks the primary for a refresh over a pipe, and a watcher
+    # thread in the primary re-forks the workers. refresh()/maybe_refresh() can
+    # still be called directly; a snapshot forked in the middle of a write is
+    # replaced by the next refresh.
+    READ_QUERIES = ("search_by_title", "get_available_items", "get_library_statistics")
+    
+    def __init__(self, library: Library, address: Union[str, Tuple[str, int]] = ("127.0.0.1", 0),
+                 workers: int = None, max_staleness: float = 5.0):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Read replicas require os.fork()")
+        self._library = library
+        self._requested_address = address
+        self._workers = workers or os.cpu_count() or 1
+        self._max_staleness = max_staleness
+        self._sock: Optional[socket.socket] = None
+        self._pids: List[int] = []
+        self._generation = 0
+        self._forked_at = 0.0
+        self._refresh_lock = threading.RLock()
+        self._refresh_pipe: Optional[Tuple[int, int]] = None
+        self._refresh_requested = False
+        self._watcher: Optional[threading.Thread] = None
+    
+    @property
+    def address(self) -> Union[str, Tuple[str, int]]:
+        if self._sock is None:
+            return self._requested_address
+        return self._sock.getsockname()
+    
+    @property
+    def generation(self) -> int:
+        return self._generation
+    
+    @property
+    def staleness(self) -> float:
+        return time.monotonic() - self._forked_at
+    
+    def start(self) -> None:
+        if self._sock is not None:
+            return
+        family = socket.AF_UNIX if isinstance(self._requested_address, str) else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(self._requested_address)
+        sock.listen(128)
+        # Workers poll the shared socket so that they can notice SIGTERM
+        sock.settimeout(0.2)
+        self._sock = sock
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(write_fd, False)
+        self._refresh_pipe = (read_fd, write_fd)
+        self.refresh()
+        self._watcher = threading.Thread(target=self._watch, name="replica-refresh", daemon=True)
+        self._watcher.start()
+    
+    def refresh(self) -> None:
+        with self._refresh_lock:
+            old_pids = self._pids
+            self._generation += 1
+            self._forked_at = time.monotonic()
+            # Keep the primary's objects out of the cyclic GC so that collections
+            # in the workers do not touch (and copy) every shared page
+            gc.freeze()
+            try:
+                self._pids = [self._fork_worker() for _ in range(self._workers)]
+            finally:
+                gc.unfreeze()
+            self._stop_workers(old_pids)
+    
+    def maybe_refresh(self) -> bool:
+        with self._refresh_lock:
+            if self._sock is not None and self.staleness >= self._max_staleness:
+                self.refresh()
+                return True
+            return False
+    
+    def _watch(self) -> None:
+        read_fd = self._refresh_pipe[0]
+        while True:
+            try:
+                os.read(read_fd, 4096)
+            except OSError:
+                return
+            with self._refresh_lock:
+                if self._sock is None:
+                    return
+                self.maybe_refresh()
+    
+    def _request_refresh(self) -> None:
+        # Called in a worker; one request per snapshot is enough
+        if self._refresh_requested or self.staleness < self._max_staleness:
+            return
+        self._refresh_requested = True
+        try:
+            os.write(self._refresh_pipe[1], b"r")
+        except BlockingIOError:
+            pass
+    
+    def stop(self) -> None:
+        with self._refresh_lock:
+            self._stop_workers(self._pids)
+            self._pids = []
+            if self._sock is not None:
+                address = self._sock.getsockname()
+                self._sock.close()
+                self._sock = None
+                if isinstance(address, str) and os.path.exists(address):
+                    os.unlink(address)
+        if self._refresh_pipe is not None:
+            read_fd, write_fd = self._refresh_pipe
+            # Wake the watcher so that it sees the pool has stopped
+            os.write(write_fd, b"s")
+            if self._watcher is not threading.current_thread():
+                self._watcher.join()
+            os.close(read_fd)
+            os.close(write_fd)
+            self._refresh_pipe = None
+            self._watcher = None
+    
+    def __enter__(self) -> 'ReadReplicaPool':
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+    
+    def _stop_workers(self, pids: List[int]) -> None:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in pids:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+    
+    def _fork_worker(self) -> int:
+        pid = os.fork()
+        if pid:
+            return pid
+        exit_code = 0
+        try:
+            self._serve()
+        except BaseException:
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+    
+    def _serve(self) -> None:
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        self._library.set_read_only()
+        self._refresh_requested = False
+        while not stopping:
+            try:
+                conn, _ = self._sock.accept()
+            except (socket.timeout, BlockingIOError):
+                continue
+            with conn:
+                self._handle_connection(conn, stopping)
+    
+    def _handle_connection(self, conn: socket.socket, stopping: List[int]) -> None:
+        conn.settimeout(0.2)
+        buffer = b""
+        while not stopping:
+            try:
+                chunk = conn.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if not chunk:
+                return
+            buffer += chunk
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                conn.sendall(self._respond(line))
+    
+    def _respond(self, line: bytes) -> bytes:
+        try:
+            request = json.loads(line)
+            query = request.get("query")
+            if query not in self.READ_QUERIES:
+                raise ValueError(f"Unknown read query: {query}")
+            result = getattr(self._library, query)(*request.get("args", []))
+            if isinstance(result, list):
+                result = [item.get_item_details() for item in result]
+            response = {"ok": True, "result": result, "generation": self._generation,
+                        "staleness": self.staleness}
+            self._request_refresh()
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        return json.dumps(response).encode() + b"\n"
+
+
+class ReplicaClient:
+    def __init__(self, address: Union[str, Tuple[str, int]], timeout: float = 5.0):
+        self._address = address
+        self._timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+    
+    def _connect(self) -> None:
+        family = socket.AF_UNIX if isinstance(self._address, str) else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(self._timeout)
+        self._sock.connect(self._address)
+        self._file = self._sock.makefile("rb")
+    
+    def query(self, query: str, *args):
+        request = json.dumps({"query": query, "args": list(args)}).encode() + b"\n"
+        # A refresh closes connections to retired workers; queries are
+        # read-only, so it is safe to retry once on a fresh connection
+        for attempt in range(2):
+            try:
+                if self._sock is None:
+                    self._connect()
+                self._sock.sendall(request)
+                line = self._file.readline()
+                if not line:
+                    raise ConnectionError("Replica closed the connection")
+                break
+            except OSError:
+                self.close()
+                if attempt:
+                    raise
+        response = json.loads(line)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+    
+    def close(self) -> None:
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = None
+            self._file = None
 
 
 if __name__ == "__main__":
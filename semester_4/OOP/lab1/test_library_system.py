@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import smtplib
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from library_system import (DEFAULT_POLICY_CONFIG, Book, GroupByAggregator, Librarian, Library, LoanEvent,
+                            Notification, NotificationDispatcher, PolicyEngine, ReadReplicaPool, ReplicaClient,
+                            SMTPTransport, Student, USAGE_REPORTS)
+
+
+def make_book(number: int) -> Book:
+    return Book(f"Book {number}", f"B{number:03}", "Floor 1", "Author", f"978-{number:010}", "Press", 100)
+
+
+class LibraryViewTest(unittest.TestCase):
+    def setUp(self):
+        self.library = Library("Test Library", "1 Test St")
+        self.librarian = Librarian("John Smith", "john@library.com", "555-1234", "EMP001", "Books")
+        self.library.register_librarian(self.librarian)
+        self.students = [Student(f"Student {i}", f"student{i}@university.edu", "555-0000", f"STU{i:03}", "History")
+                         for i in range(3)]
+        for student in self.students:
+            self.library.register_student(student)
+        for number in range(3):
+            self.library.add_item_to_catalog(make_book(number))
+    
+    def test_student_view_survives_checkout(self):
+        seen = []
+        for student_id in self.library.students:
+            # Adds a loan event and a notification, but no student
+            self.assertTrue(self.library.process_checkout(self.librarian.id, student_id, f"B{len(seen):03}"))
+            seen.append(student_id)
+        self.assertEqual(seen, [student.id for student in self.students])
+    
+    def test_student_view_invalidated_by_registration(self):
+        students = self.library.students
+        self.library.register_student(Student("New", "new@university.edu", "555-0001", "STU999", "History"))
+        with self.assertRaises(RuntimeError):
+            len(students)
+    
+    def test_notification_view_invalidated_by_checkout(self):
+        notifications = self.library.notifications
+        self.library.process_checkout(self.librarian.id, self.students[0].id, "B000")
+        with self.assertRaises(RuntimeError):
+            list(notifications)
+
+
+class PolicyEngineTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "policy.json")
+        self.write(DEFAULT_POLICY_CONFIG)
+        self.engine = PolicyEngine(self.path, check_interval=0)
+    
+    def write(self, config) -> None:
+        with open(self.path, "w") as f:
+            json.dump(config, f)
+        # Make every write visible to the mtime check, however coarse the clock
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    
+    def test_reload_picks_up_changes(self):
+        config = json.loads(json.dumps(DEFAULT_POLICY_CONFIG))
+        config["rules"][0]["loan_days"] = 28
+        self.write(config)
+        self.assertEqual(self.engine.policy.terms("Book").loan_days, 28)
+        self.assertIsNone(self.engine.last_error)
+    
+    def test_malformed_reload_keeps_previous_policy(self):
+        policy = self.engine.policy
+        for config in [[DEFAULT_POLICY_CONFIG],
+                       dict(DEFAULT_POLICY_CONFIG, rules={"item_type": "Book"}),
+                       dict(DEFAULT_POLICY_CONFIG, rules=["Book"]),
+                       dict(DEFAULT_POLICY_CONFIG, departments=["Books"]),
+                       dict(DEFAULT_POLICY_CONFIG, defaults=dict(DEFAULT_POLICY_CONFIG["defaults"], loan_days=[14]))]:
+            self.write(config)
+            self.assertIs(self.engine.policy, policy)
+            self.assertIsNotNone(self.engine.last_error)
+        self.assertEqual(policy.terms("Book").loan_days, 21)
+
+
+def loan_events(count: int):
+    majors = ["Computer Science", "Literature", "Mathematics"]
+    start = datetime(2020, 1, 1)
+    for i in range(count):
+        yield LoanEvent("return" if i % 2 else "checkout", start + timedelta(days=i % 400), f"student-{i % 37}",
+                        majors[i % 3], f"item-{i % 11}", "Book", "Books", (i % 30) + 0.5, float(i % 4))
+
+
+class GroupByAggregatorTest(unittest.TestCase):
+    def test_spilled_results_match_in_memory(self):
+        aggregates = {"events": ("count", None), "fines": ("sum", lambda event: event.fine),
+                      "avg_days": ("avg", lambda event: event.loan_days),
+                      "min_days": ("min", lambda event: event.loan_days),
+                      "max_days": ("max", lambda event: event.loan_days)}
+        key = lambda event: (event.student_id, event.timestamp.month)
+        in_memory = GroupByAggregator(key, aggregates).feed(loan_events(5000))
+        spilled = GroupByAggregator(key, aggregates, max_groups=10, partitions=4).feed(loan_events(5000))
+        expected = list(in_memory.results())
+        self.assertEqual(in_memory.spills, 0)
+        self.assertEqual(sorted(spilled.results()), expected)
+        self.assertGreater(spilled.spills, 1)
+    
+    def test_spilled_report_matches_full_recompute(self):
+        report = USAGE_REPORTS["fines_per_department"]
+        events = list(loan_events(2000))
+        expected = {}
+        for event in events:
+            if event.kind == "return" and event.fine > 0:
+                month = f"{event.timestamp.year}-{event.timestamp.month:02d}"
+                count, total = expected.get((month, event.department), (0, 0.0))
+                expected[(month, event.department)] = (count + 1, total + event.fine)
+        rows = {(row["month"], row["department"]): (row["fined_returns"], row["total_fines"])
+                for row in report.run(events, max_groups=2)}
+        self.assertEqual(rows, expected)
+
+
+class ReadReplicaPoolTest(unittest.TestCase):
+    @unittest.skipUnless(hasattr(os, "fork"), "read replicas require os.fork()")
+    def test_stale_read_refreshes_replicas(self):
+        library = Library("Test Library", "1 Test St")
+        library.add_item_to_catalog(make_book(1))
+        with ReadReplicaPool(library, workers=1, max_staleness=0.2) as pool:
+            client = ReplicaClient(pool.address)
+            self.assertEqual(len(client.query("search_by_title", "book")), 1)
+            library.add_item_to_catalog(make_book(2))
+            time.sleep(0.3)
+            # Nobody calls maybe_refresh(); the stale read asks for a refresh itself
+            deadline = time.monotonic() + 5
+            while len(client.query("search_by_title", "book")) < 2:
+                self.assertLess(time.monotonic(), deadline, "replicas were never refreshed")
+                time.sleep(0.05)
+            self.assertGreater(pool.generation, 1)
+            client.close()
+
+
+class FlakySMTPTransport(SMTPTransport):
+    # SMTP stand-in whose server drops the first few connections
+    def __init__(self, failures: int):
+        super().__init__("localhost", 8025, "library@example.com", lambda person_id: f"{person_id}@example.com")
+        self.failures = failures
+        self.sent = []
+    
+    def _send(self, message) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.sent.append(message)
+
+
+class NotificationDispatcherTest(unittest.TestCase):
+    def deliver(self, transport: SMTPTransport, max_retries: int) -> NotificationDispatcher:
+        async def run():
+            async with NotificationDispatcher(transport, batch_window=0, max_retries=max_retries,
+                                              retry_delay=0.01) as dispatcher:
+                await dispatcher.submit(Notification("student-1", "Your book is due"))
+            return dispatcher
+        return asyncio.run(run())
+    
+    def test_failed_delivery_is_retried(self):
+        transport = FlakySMTPTransport(failures=2)
+        dispatcher = self.deliver(transport, max_retries=3)
+        self.assertEqual(len(transport.sent), 1)
+        self.assertEqual(transport.sent[0]["To"], "student-1@example.com")
+        stats = dispatcher.get_stats()
+        self.assertEqual((stats["delivered"], stats["failed"], stats["retried"]), (1, 0, 2))
+        self.assertEqual(len(dispatcher.undelivered), 0)
+    
+    def test_delivery_kept_after_last_retry(self):
+        transport = FlakySMTPTransport(failures=10)
+        dispatcher = self.deliver(transport, max_retries=2)
+        self.assertEqual(transport.sent, [])
+        self.assertEqual(dispatcher.get_stats()["failed"], 1)
+        self.assertEqual([n.message for n in dispatcher.undelivered], ["Your book is due"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,724 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta
+
+from src.models.task import Task, Priority
+from src.models.recurrence import Recurrence
+from src.models.task_manager import TaskManager
+from src.models.task_store import SAVE_SQL, TaskStore
+from src.models.task_io import FORMATS, export_tasks, import_tasks, read_tasks
+from src.models.undo import UndoStack
+
+
+PRIORITIES = list(Priority)
+
+
+def make_tasks(count):
+    now = datetime.now()
+    for i in range(count):
+        yield Task(
+            title=f"Task {i}",
+            description=f"Description for task {i}",
+            due_date=now + timedelta(days=(i % 60) - 20),
+            priority=PRIORITIES[i % 3],
+            completed=i % 4 == 0
+        )
+
+
+def seeded_manager(count):
+    task_manager = TaskManager()
+    for task in make_tasks(count):
+        task_manager.add_task(task)
+    return task_manager
+
+
+def timed(operation, task_ids):
+    start = time.perf_counter()
+    for task_id in task_ids:
+        operation(task_id)
+    return (time.perf_counter() - start) / len(task_ids) * 1e6
+
+
+def bench_lookup(sizes, operations):
+    print(f"{'tasks':>10} {'lookup':>10} {'update':>10} {'complete':>10} {'delete':>10}   (µs/op)")
+    for size in sizes:
+        task_manager = seeded_manager(size)
+        rng = random.Random(size)
+        task_ids = rng.sample(range(1, size + 1), min(operations, size))
+
+        lookup = timed(task_manager.get_task_by_id, task_ids)
+        update = timed(lambda task_id: task_manager.update_task(task_id, title="Renamed"), task_ids)
+        complete = timed(task_manager.complete_task, task_ids)
+        delete = timed(task_manager.delete_task, task_ids)
+        print(f"{size:>10,} {lookup:>10.2f} {update:>10.2f} {complete:>10.2f} {delete:>10.2f}")
+
+
+def bench_stats(sizes, operations):
+    print(f"{'tasks':>10} {'incremental':>14} {'full scan':>14}")
+    for size in sizes:
+        task_manager = seeded_manager(size)
+        rng = random.Random(size)
+        now = datetime.now()
+        # Mix of edits so that every aggregate is exercised before comparing
+        for _ in range(operations):
+            task_id = rng.randrange(1, task_manager.next_id)
+            action = rng.randrange(4)
+            if action == 0:
+                task_manager.complete_task(task_id)
+            elif action == 1:
+                task_manager.update_task(task_id, priority=rng.choice(PRIORITIES),
+                                         due_date=now + timedelta(days=rng.randint(-30, 30)))
+            elif action == 2:
+                task_manager.delete_task(task_id)
+            else:
+                task_manager.add_task(next(make_tasks(1)))
+
+        start = time.perf_counter()
+        stats = task_manager.get_tasks_stats()
+        incremental = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = task_manager.recompute_tasks_stats()
+        full_scan = time.perf_counter() - start
+        if stats != expected:
+            raise AssertionError(f"Incremental stats {stats} differ from recomputed {expected}")
+        print(f"{size:>10,} {incremental * 1000:>12.3f}ms {full_scan * 1000:>12.1f}ms")
+
+
+def bench_changes(sizes, edits):
+    # Runs the real window and controller on the offscreen platform
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from src.views.main_window import MainWindow
+    from src.controllers.task_controller import TaskController
+
+    app = QApplication.instance() or QApplication([])
+    print(f"{'tasks':>10} {'full rebuild':>14} {'change events':>14}   (ms/edit)")
+    for size in sizes:
+        task_manager = seeded_manager(size)
+        main_window = MainWindow()
+        controller = TaskController(task_manager, main_window)
+        rng = random.Random(size)
+        task_ids = rng.sample(range(1, size + 1), min(edits, size))
+
+        # The old path: apply the edit, then reload and rebuild the whole table
+        start = time.perf_counter()
+        for task_id in task_ids:
+            task_manager.update_task(task_id, title="Rebuilt")
+            controller.pending_changes.clear()
+            main_window.update_tasks(task_manager.get_all_tasks())
+        app.processEvents()
+        rebuild = (time.perf_counter() - start) / len(task_ids) * 1000
+
+        start = time.perf_counter()
+        for task_id in task_ids:
+            task_manager.update_task(task_id, title="Changed")
+            app.processEvents()
+        changes = (time.perf_counter() - start) / len(task_ids) * 1000
+
+        print(f"{size:>10,} {rebuild:>14.3f} {changes:>14.3f}")
+        task_manager.remove_listener(controller._on_task_event)
+        main_window.deleteLater()
+        app.processEvents()
+
+
+def bench_switch(sizes):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from src.models.task_manager import FILTERS, SORT_KEYS
+    from src.views.task_table_model import TaskTableModel
+    from src.views.task_proxy_model import TaskProxyModel
+
+    app = QApplication.instance() or QApplication([])
+    print(f"{'tasks':>10} {'first sort':>12} {'filter switch':>14} {'sort switch':>12}   (ms, mean)")
+    for size in sizes:
+        task_manager = seeded_manager(size)
+        source = TaskTableModel(task_manager)
+        source.set_tasks(task_manager.get_all_tasks())
+        proxy = TaskProxyModel(task_manager)
+        proxy.setSourceModel(source)
+
+        # The first use of each sort key builds its index
+        start = time.perf_counter()
+        for sort_by in SORT_KEYS:
+            proxy.set_view("All", sort_by)
+        first_sort = (time.perf_counter() - start) / len(SORT_KEYS) * 1000
+
+        start = time.perf_counter()
+        for filter_name in FILTERS:
+            proxy.set_view(filter_name, "due_date")
+        filter_switch = (time.perf_counter() - start) / len(FILTERS) * 1000
+
+        start = time.perf_counter()
+        for sort_by in SORT_KEYS:
+            proxy.set_view("Pending", sort_by)
+        sort_switch = (time.perf_counter() - start) / len(SORT_KEYS) * 1000
+        print(f"{size:>10,} {first_sort:>12.1f} {filter_switch:>14.1f} {sort_switch:>12.1f}")
+
+
+def bench_persist(sizes, updates):
+    print(f"{'tasks':>10} {'startup':>10} {'save (queued)':>14} {'save (sync)':>12}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tasks.db")
+            write_database(path, size)
+
+            start = time.perf_counter()
+            store = TaskStore(path)
+            task_manager = TaskManager(store)
+            startup = time.perf_counter() - start
+
+            # What a UI action pays: queueing the write vs committing it in place
+            task_ids = random.Random(size).sample(range(1, size + 1), min(updates, size))
+            start = time.perf_counter()
+            for task_id in task_ids:
+                task_manager.update_task(task_id, title="Queued")
+            queued = (time.perf_counter() - start) / len(task_ids) * 1e6
+            store.flush()
+
+            connection = sqlite3.connect(path)
+            start = time.perf_counter()
+            for task_id in task_ids:
+                task = task_manager.get_task_by_id(task_id)
+                with connection:
+                    connection.execute(SAVE_SQL, task.to_record())
+            sync = (time.perf_counter() - start) / len(task_ids) * 1e6
+            connection.close()
+            store.close()
+            print(f"{size:>10,} {startup:>9.2f}s {queued:>12.1f}µs {sync:>10.1f}µs")
+
+
+def write_database(path, size):
+    store = TaskStore(path)
+    tasks = []
+    for task_id, task in enumerate(make_tasks(size), start=1):
+        task.id = task_id
+        tasks.append(task)
+    store.save_all(tasks)
+    store.close()
+
+
+def bench_frames(size):
+    # How long the event loop is blocked while loading and indexing run on workers
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    from src.views.main_window import MainWindow
+    from src.controllers.task_controller import TaskController
+
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tasks.db")
+        write_database(path, size)
+        store = TaskStore(path)
+        task_manager = TaskManager(store, load=False)
+        main_window = MainWindow()
+        controller = TaskController(task_manager, main_window)
+
+        ticks = []
+        timer = QTimer()
+        timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+        timer.start(1)
+
+        def run(name, start_job):
+            ticks.clear()
+            start = time.perf_counter()
+            start_job()
+            while controller.job is not None:
+                app.processEvents()
+            elapsed = time.perf_counter() - start
+            # Include the frames spent applying the result
+            settle = time.perf_counter() + 0.2
+            while time.perf_counter() < settle:
+                app.processEvents()
+            gaps = sorted((b - a) * 1000 for a, b in zip(ticks, ticks[1:]))
+            print(f"{name:<10} {elapsed:>8.2f}s {len(gaps):>8,} {gaps[int(len(gaps) * 0.99)]:>9.1f}ms "
+                  f"{gaps[-1]:>9.1f}ms")
+
+        print(f"{size:,} tasks")
+        print(f"{'job':<10} {'time':>9} {'frames':>8} {'p99 gap':>11} {'max gap':>11}")
+        run("load", controller.load_tasks)
+        run("index", lambda: main_window.search_edit.setText("task 4242"))
+        timer.stop()
+        store.close()
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {"median_ms": round(statistics.median(samples), 3),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+            "runs": len(samples)}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def bench_ui(sizes, repeat, output, baseline):
+    # Round trips through the real window and controller, timed until the event loop is idle
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import QTimer, QT_VERSION_STR
+    from PyQt6.QtWidgets import QApplication
+    from src.models.task_manager import FILTERS
+    from src.views.main_window import MainWindow
+    from src.controllers.task_controller import TaskController
+
+    app = QApplication.instance() or QApplication([])
+
+    def settle():
+        # Change events are flushed by a zero timer, so give it its turn
+        app.processEvents()
+        app.processEvents()
+
+    def timed_ms(action):
+        start = time.perf_counter()
+        action()
+        settle()
+        return (time.perf_counter() - start) * 1000
+
+    def close_dialog():
+        dialog = app.activeModalWidget()
+        if dialog is not None:
+            dialog.reject()
+
+    def timed_dialog_ms(open_dialog):
+        # exec() returns once the dialog has been shown and the queued reject has run
+        QTimer.singleShot(0, close_dialog)
+        return timed_ms(open_dialog)
+
+    results = {}
+    print(f"{'tasks':>10} {'metric':<18} {'median':>10} {'p95':>10}   (ms)")
+    for size in sizes:
+        task_manager = TaskManager()
+        task_manager.bulk_add(make_tasks(size))
+        main_window = MainWindow()
+        main_window.show()
+        controller = TaskController(task_manager, main_window)
+        settle()
+        rng = random.Random(size)
+
+        samples = {"refresh": [], "filter switch": [], "add": [], "complete": [], "delete": [],
+                   "task dialog": [], "settings dialog": [], "statistics dialog": []}
+        for _ in range(repeat):
+            samples["refresh"].append(timed_ms(lambda: (
+                main_window.update_tasks(task_manager.get_all_tasks()), controller.update_task_list())))
+            for filter_name in list(FILTERS)[1:] + ["All"]:
+                samples["filter switch"].append(timed_ms(lambda: main_window.filter_combo.setCurrentText(filter_name)))
+
+            task_ids = []
+            for task in make_tasks(10):
+                samples["add"].append(timed_ms(lambda: task_ids.append(task_manager.add_task(task))))
+            pending = [task_id for task_id in rng.sample(sorted(task_manager.tasks), 20)
+                       if not task_manager.tasks[task_id].completed][:10]
+            for task_id in pending:
+                samples["complete"].append(timed_ms(lambda: task_manager.complete_task(task_id)))
+            for task_id in task_ids:
+                samples["delete"].append(timed_ms(lambda: task_manager.delete_task(task_id)))
+
+            task = task_manager.get_task_by_id(next(iter(task_manager.tasks)))
+            samples["task dialog"].append(timed_dialog_ms(lambda: main_window.open_task_dialog(task)))
+            samples["settings dialog"].append(timed_dialog_ms(controller.open_settings))
+            samples["statistics dialog"].append(timed_dialog_ms(controller.open_statistics))
+
+        results[str(size)] = {metric: summarize(values) for metric, values in samples.items()}
+        for metric, summary in results[str(size)].items():
+            change = ""
+            if baseline and metric in baseline.get(str(size), {}):
+                before = baseline[str(size)][metric]["median_ms"]
+                change = f"  {(summary['median_ms'] / before - 1) * 100:+.0f}% vs baseline" if before else ""
+            print(f"{size:>10,} {metric:<18} {summary['median_ms']:>10.2f} {summary['p95_ms']:>10.2f}{change}")
+
+        task_manager.remove_listener(controller._on_task_event)
+        main_window.close()
+        main_window.deleteLater()
+        settle()
+
+    if output:
+        report = {"revision": git_revision(), "date": datetime.now().isoformat(timespec="seconds"),
+                  "python": platform.python_version(), "qt": QT_VERSION_STR,
+                  "platform": os.environ["QT_QPA_PLATFORM"], "repeat": repeat, "results": results}
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"results written to {output}")
+
+
+# Run in a fresh interpreter by bench_startup: imports what main.py imports, then
+# starts the app as main() does and reports when the window is first painted
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+from PyQt6.QtCore import QEvent, QObject
+imported = time.perf_counter()
+painted = []
+
+class PaintWatcher(QObject):
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and not painted:
+            painted.append(time.perf_counter())
+        return False
+
+app = main.QApplication(sys.argv[:1])
+store = main.TaskStore(sys.argv[1])
+task_manager = main.TaskManager(store, load=False)
+main_window = main.MainWindow()
+watcher = PaintWatcher()
+main_window.installEventFilter(watcher)
+controller = main.TaskController(task_manager, main_window)
+main_window.show()
+controller.load_tasks()
+while not painted:
+    app.processEvents()
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_paint_ms": (painted[0] - start) * 1000,
+                  "charts_loaded": "PyQt6.QtCharts" in sys.modules}))
+controller.workers.wait()
+store.close()
+"""
+
+
+def bench_startup(runs, output, baseline, tolerance):
+    # Time from the first import to the first paint of the main window, each run in a new process.
+    # Fails when QtCharts is loaded at startup or the median is slower than the baseline allows.
+    environment = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    samples = {"import_ms": [], "first_paint_ms": []}
+    charts_loaded = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(runs):
+            probe = subprocess.run([sys.executable, "-c", STARTUP_PROBE, os.path.join(tmp, "tasks.db")],
+                                   capture_output=True, text=True, env=environment,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+            if probe.returncode != 0:
+                raise RuntimeError(f"Startup probe failed:\n{probe.stderr}")
+            result = json.loads(probe.stdout.strip().splitlines()[-1])
+            samples["import_ms"].append(result["import_ms"])
+            samples["first_paint_ms"].append(result["first_paint_ms"])
+            charts_loaded = charts_loaded or result["charts_loaded"]
+
+    results = {metric: summarize(values) for metric, values in samples.items()}
+    print(f"{'metric':<16} {'median':>10} {'p95':>10}   (ms, {runs} runs)")
+    for metric, summary in results.items():
+        print(f"{metric:<16} {summary['median_ms']:>10.1f} {summary['p95_ms']:>10.1f}")
+    print(f"QtCharts loaded at startup: {'yes' if charts_loaded else 'no'}")
+
+    if output:
+        report = {"revision": git_revision(), "date": datetime.now().isoformat(timespec="seconds"),
+                  "python": platform.python_version(), "runs": runs, "charts_loaded": charts_loaded,
+                  "results": results}
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"results written to {output}")
+
+    failures = []
+    if charts_loaded:
+        failures.append("QtCharts is imported before the first paint")
+    if baseline:
+        limit = baseline["first_paint_ms"]["median_ms"] * (1 + tolerance)
+        if results["first_paint_ms"]["median_ms"] > limit:
+            failures.append(f"first paint took {results['first_paint_ms']['median_ms']:.1f}ms, "
+                            f"more than {limit:.1f}ms (baseline + {tolerance:.0%})")
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return not failures
+
+
+def peak_memory_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_io(size):
+    # Files are written from a generator and read back without keeping the tasks,
+    # so the peak memory of those two steps is what streaming costs
+    def numbered_tasks():
+        for task_id, task in enumerate(make_tasks(size), start=1):
+            task.id = task_id
+            yield task
+
+    print(f"{'format':<8} {'size':>9} {'export':>12} {'parse':>12} {'import':>12} {'parse peak':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for extension in FORMATS:
+            path = os.path.join(tmp, "tasks" + extension)
+            start = time.perf_counter()
+            export_tasks(numbered_tasks(), path)
+            export_rate = size / (time.perf_counter() - start)
+
+            baseline = peak_memory_mb()
+            start = time.perf_counter()
+            for _ in read_tasks(path):
+                pass
+            parse_rate = size / (time.perf_counter() - start)
+            parse_peak = peak_memory_mb() - baseline
+
+            task_manager = TaskManager()
+            start = time.perf_counter()
+            import_tasks(task_manager, path)
+            import_rate = size / (time.perf_counter() - start)
+            del task_manager
+            print(f"{extension:<8} {os.path.getsize(path) / 2 ** 20:>7.0f}MB {export_rate:>8,.0f}/s "
+                  f"{parse_rate:>8,.0f}/s {import_rate:>8,.0f}/s {parse_peak:>9.1f}MB")
+
+
+def bench_memory(size):
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    tasks = list(make_tasks(size))
+    created = tracemalloc.get_traced_memory()[0] - start
+    # Titles and descriptions are the same whatever the task looks like
+    text = sum(sys.getsizeof(task.title) + sys.getsizeof(task.description) for task in tasks)
+
+    start = tracemalloc.get_traced_memory()[0]
+    task_manager = TaskManager()
+    task_manager.bulk_add(tasks)
+    indexed = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    print(f"{size:,} tasks, bytes per task:")
+    print(f"  task objects {(created - text) / size:>8.0f}   (plus {text / size:.0f} of title and description)")
+    print(f"  manager      {indexed / size:>8.0f}   (id map, aggregates, due index)")
+
+
+def bench_undo(size, batch):
+    task_manager = TaskManager()
+    task_manager.bulk_add(list(make_tasks(size)))
+    undo_stack = UndoStack(task_manager)
+    rng = random.Random(size)
+    task_ids = rng.sample(range(1, size + 1), batch)
+
+    def step(name, change):
+        start = time.perf_counter()
+        change()
+        done = time.perf_counter() - start
+        start = time.perf_counter()
+        undo_stack.undo()
+        undone = time.perf_counter() - start
+        start = time.perf_counter()
+        undo_stack.redo()
+        redone = time.perf_counter() - start
+        print(f"{name:<24} {done * 1000:>9.1f} {undone * 1000:>9.1f} {redone * 1000:>9.1f}")
+
+    print(f"{size:,} tasks, {batch:,} per bulk operation")
+    print(f"{'':<24} {'change':>9} {'undo':>9} {'redo':>9}   (ms)")
+    step("edit one task", lambda: task_manager.update_task(task_ids[0], title="Renamed", priority=Priority.HIGH))
+    step("complete tasks", lambda: task_manager.bulk_set({task_id: {"completed": True} for task_id in task_ids}))
+    step("move due dates", lambda: task_manager.bulk_set(
+        {task_id: {"due_timestamp": task_manager.tasks[task_id].due_timestamp + 86_400_000_000}
+         for task_id in task_ids}))
+    step("delete tasks", lambda: task_manager.bulk_remove(task_ids))
+    step("add tasks", lambda: task_manager.bulk_add(list(make_tasks(batch))))
+    print(f"history: {len(undo_stack.undo_commands)} steps, about {undo_stack.size / 2 ** 20:.1f}MB")
+
+
+def bench_recurrence(size, series):
+    # Repeating tasks started up to a year ago and left undone, so each has missed
+    # up to a year of occurrences; none of them is ever materialized as a task
+    now = datetime.now()
+    rules = ["FREQ=DAILY", "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR", "FREQ=WEEKLY;INTERVAL=2", "FREQ=MONTHLY"]
+    rng = random.Random(size)
+    task_manager = TaskManager()
+    task_manager.bulk_add(make_tasks(size - series))
+    task_manager.bulk_add(Task(title=f"Series {i}", recurrence=Recurrence.from_rule(
+        rng.choice(rules), now - timedelta(days=rng.uniform(0, 365)))) for i in range(series))
+    year_ahead = sum(task.recurrence.count_between(now, now + timedelta(days=365))
+                     for task in map(task_manager.tasks.get, task_manager.recurring_ids))
+
+    def measure(operation):
+        start = time.perf_counter()
+        result = operation()
+        return result, (time.perf_counter() - start) * 1000
+
+    print(f"{size:,} tasks, {series:,} of them repeating, {year_ahead:,} occurrences in the next year")
+    overdue, analytic = measure(task_manager.count_overdue_occurrences)
+    recomputed, enumerated = measure(lambda: task_manager.recompute_tasks_stats()["overdue_occurrences"])
+    print(f"overdue occurrences   {overdue:>12,}  from rules {analytic:>9.1f}ms   enumerated {enumerated:>9.1f}ms"
+          + ("" if overdue == recomputed else f"   MISMATCH {recomputed:,}"))
+    for days in (1, 7, 30):
+        window, elapsed = measure(lambda: sum(1 for _ in task_manager.get_occurrences(now, now + timedelta(days=days))))
+        print(f"next {days:>2} days           {window:>12,}  expanded in {elapsed:>8.1f}ms")
+
+
+def bench_categories(size, categories):
+    # Tasks spread over categories by a long tail, as real category lists are
+    names = [f"Category {i}" for i in range(categories)]
+    weights = [1 / (rank + 1) for rank in range(categories)]
+    rng = random.Random(size)
+    tasks = list(make_tasks(size))
+    for task, category in zip(tasks, rng.choices(names + [""], weights + [1], k=size)):
+        task.category = category
+    task_manager = TaskManager()
+    task_manager.bulk_add(tasks)
+    undo_stack = UndoStack(task_manager)
+    task_manager.get_sort_index("due_date")
+
+    def measure(operation, repeat=1):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            operation()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    print(f"{size:,} tasks in {categories} categories")
+    indexed = measure(task_manager.category_counts, 100)
+    scanned = measure(lambda: Counter(task.category for task in task_manager.tasks.values()))
+    print(f"counts                 {indexed:>9.3f}ms   full scan {scanned:>9.1f}ms")
+    for name in (names[0], names[categories // 2], names[-1]):
+        count = len(task_manager.category_ids[name])
+        indexed = measure(lambda: task_manager.get_sorted_entries("due_date", "Pending", name))
+        scanned = measure(lambda: [entry for entry in task_manager.get_sorted_entries("due_date", "Pending")
+                                   if task_manager.tasks[entry[1]].category == name])
+        print(f"show {name:<12} {count:>9,}  {indexed:>9.1f}ms   full scan {scanned:>9.1f}ms")
+    count = len(task_manager.category_ids[names[1]])
+    merged = measure(lambda: task_manager.remove_category(names[1], names[0]))
+    undone = measure(undo_stack.undo)
+    print(f"merge {count:,} tasks into another category {merged:>9.1f}ms   undo {undone:>9.1f}ms")
+
+
+def make_vocabulary(size, rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 10))) for _ in range(size)]
+
+
+def bench_search(size, words, queries):
+    rng = random.Random(size)
+    vocabulary = make_vocabulary(30_000, rng)
+    # Zipf-like word frequencies; descriptions come from a pool to keep generation fast
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    pool = [" ".join(rng.choices(vocabulary, weights, k=words)) for _ in range(20_000)]
+    task_manager = TaskManager()
+    for i in range(size):
+        task_manager.add_task(Task(title=" ".join(rng.choices(vocabulary, weights, k=4)),
+                                   description=pool[i % len(pool)], priority=PRIORITIES[i % 3]))
+
+    start = time.perf_counter()
+    index = task_manager.get_search_index()
+    print(f"indexed {size:,} tasks ({words} words each) in {time.perf_counter() - start:.1f}s, "
+          f"{len(index.terms):,} terms")
+
+    # Type each query one character at a time, as search-as-you-type would
+    latencies = []
+    for _ in range(queries):
+        query = " ".join(rng.choices(vocabulary[:5_000], k=2))
+        for end in range(2, len(query) + 1):
+            start = time.perf_counter()
+            task_manager.search(query[:end], limit=1_000)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    print(f"{len(latencies):,} keystrokes: p50 {latencies[len(latencies) // 2]:.2f}ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:.2f}ms, max {latencies[-1]:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task manager model benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    lookup_parser = subparsers.add_parser("lookup", help="lookup/update/complete/delete by id")
+    lookup_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    lookup_parser.add_argument("--operations", type=int, default=10_000)
+
+    stats_parser = subparsers.add_parser("stats", help="incremental stats vs full recompute")
+    stats_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    stats_parser.add_argument("--operations", type=int, default=20_000)
+
+    changes_parser = subparsers.add_parser("changes", help="table refresh per edit: rebuild vs change events")
+    changes_parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    changes_parser.add_argument("--edits", type=int, default=200)
+
+    switch_parser = subparsers.add_parser("switch", help="filter and sort key switching on the proxy model")
+    switch_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+
+    persist_parser = subparsers.add_parser("persist", help="startup from SQLite and cost of saving an edit")
+    persist_parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    persist_parser.add_argument("--updates", type=int, default=1_000)
+
+    search_parser = subparsers.add_parser("search", help="search-as-you-type latency over the inverted index")
+    search_parser.add_argument("--size", type=int, default=500_000)
+    search_parser.add_argument("--words", type=int, default=60)
+    search_parser.add_argument("--queries", type=int, default=200)
+
+    frames_parser = subparsers.add_parser("frames", help="UI event loop gaps while jobs run on workers")
+    frames_parser.add_argument("--size", type=int, default=200_000)
+
+    io_parser = subparsers.add_parser("io", help="streaming export, parse and import throughput per file format")
+    io_parser.add_argument("--size", type=int, default=1_000_000)
+
+    memory_parser = subparsers.add_parser("memory", help="bytes per task, objects and manager indexes")
+    memory_parser.add_argument("--size", type=int, default=1_000_000)
+
+    undo_parser = subparsers.add_parser("undo", help="bulk changes and undoing or redoing them")
+    undo_parser.add_argument("--size", type=int, default=1_000_000)
+    undo_parser.add_argument("--batch", type=int, default=10_000)
+
+    categories_parser = subparsers.add_parser("categories", help="per-category counts, views and merging")
+    categories_parser.add_argument("--size", type=int, default=1_000_000)
+    categories_parser.add_argument("--categories", type=int, default=50)
+
+    recurrence_parser = subparsers.add_parser("recurrence", help="overdue counts and date windows of repeating tasks")
+    recurrence_parser.add_argument("--size", type=int, default=1_000_000)
+    recurrence_parser.add_argument("--series", type=int, default=100_000)
+
+    ui_parser = subparsers.add_parser("ui", help="window round trips and dialog latency, as JSON for comparisons")
+    ui_parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    ui_parser.add_argument("--repeat", type=int, default=5)
+    ui_parser.add_argument("--output", help="JSON file to write the results to")
+    ui_parser.add_argument("--baseline", help="JSON file of an earlier run to compare the medians against")
+
+    startup_parser = subparsers.add_parser("startup", help="import and first paint time; fails on regressions")
+    startup_parser.add_argument("--runs", type=int, default=7)
+    startup_parser.add_argument("--output", help="JSON file to write the results to")
+    startup_parser.add_argument("--baseline", help="JSON file of an earlier run; slower medians fail the check")
+    startup_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown over the baseline")
+
+    args = parser.parse_args()
+    if args.benchmark == "lookup":
+        bench_lookup(args.sizes, args.operations)
+    elif args.benchmark == "stats":
+        bench_stats(args.sizes, args.operations)
+    elif args.benchmark == "changes":
+        bench_changes(args.sizes, args.edits)
+    elif args.benchmark == "switch":
+        bench_switch(args.sizes)
+    elif args.benchmark == "persist":
+        bench_persist(args.sizes, args.updates)
+    elif args.benchmark == "search":
+        bench_search(args.size, args.words, args.queries)
+    elif args.benchmark == "frames":
+        bench_frames(args.size)
+    elif args.benchmark == "io":
+        bench_io(args.size)
+    elif args.benchmark == "memory":
+        bench_memory(args.size)
+    elif args.benchmark == "undo":
+        bench_undo(args.size, args.batch)
+    elif args.benchmark == "categories":
+        bench_categories(args.size, args.categories)
+    elif args.benchmark == "recurrence":
+        bench_recurrence(args.size, args.series)
+    elif args.benchmark == "ui":
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as file:
+                baseline = json.load(file)["results"]
+        bench_ui(args.sizes, args.repeat, args.output, baseline)
+    elif args.benchmark == "startup":
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as file:
+                baseline = json.load(file)["results"]
+        if not bench_startup(args.runs, args.output, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,21 @@
+import os
 import sys
+from datetime import datetime, timedelta
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import Qt
 
+from src.models.task import Task, Priority
+from src.models.recurrence import Recurrence
 from src.models.task_manager import TaskManager
+from src.models.task_store import StoreError, TaskStore
 from src.views.main_window import MainWindow
 from src.controllers.task_controller import TaskController
 
 
-def main():
-    # Create the application
-    app = QApplication(sys.argv)
-    
-    # Create model
-    task_manager = TaskManager()
-    
-    # Add some sample tasks
-    from src.models.task import Task, Priority
-    from datetime import datetime, timedelta
-    
+DATABASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tasks.db")
+
+
+def add_sample_tasks(task_manager):
     # Sample task 1: Due today, high priority
     task1 = Task(
         title="Complete Python project",
@@ -64,17 +62,54 @@ def main():
     )
     task_manager.add_task(task5)
     
+    # Sample task 6: Repeats every weekday, started last week
+    start = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0) - timedelta(days=7)
+    task6 = Task(
+        title="Daily stand-up",
+        description="Share progress with the team",
+        priority=Priority.MEDIUM,
+        recurrence=Recurrence.from_rule("FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR", start)
+    )
+    task_manager.add_task(task6)
+
+
+def main():
+    # Create the application
+    app = QApplication(sys.argv)
+    
+    # Create model, backed by the database next to this file
+    new_database = not os.path.exists(DATABASE_PATH)
+    store = TaskStore(DATABASE_PATH)
+    task_manager = TaskManager(store, load=False)
+    
     # Create main window
     main_window = MainWindow()
     
     # Create controller
     controller = TaskController(task_manager, main_window)
     
-    # Show the main window
+    # Seed a few sample tasks on the first launch only; a user who deletes every
+    # task does not get them back
+    def on_loaded():
+        if new_database:
+            add_sample_tasks(task_manager)
+            # Not something to undo
+            controller.undo_stack.clear()
+    
+    # Show the main window, then load the tasks in the background
     main_window.show()
+    controller.load_tasks(on_loaded)
     
-    # Start the event loop
-    return app.exec()
+    # Start the event loop; running jobs are stopped and pending writes committed before exiting
+    result = app.exec()
+    controller.workers.cancel_all()
+    controller.workers.wait()
+    try:
+        store.close()
+    except StoreError as error:
+        print(error, file=sys.stderr)
+        return 1
+    return result
 
 
 if __name__ == "__main__":
@@ -1,84 +1,327 @@
 from PyQt6.QtWidgets import QMessageBox, QDialog
+from PyQt6.QtCore import QTimer
 from datetime import datetime
+from src.controllers.workers import WorkerPool
+from src.models.search_index import SearchIndex
+from src.models.task_store import StoreError
+from src.models.undo import UndoStack
 
 
 class TaskController:
+    SEARCH_LIMIT = 1000  # best matches shown while searching
+    ROW_CHANGES = 1000  # bulk changes up to this size update rows, larger ones rebuild the table
+    
     def __init__(self, task_manager, main_window):
         self.task_manager = task_manager
         self.main_window = main_window
         
+        # Model changes are collected here and applied once per event loop tick
+        self.pending_changes = {}  # task id -> "inserted" | "updated" | "removed"
+        self.reset_pending = False  # too many changes for row updates, rebuild the table
+        self.flush_scheduled = False
+        self.task_manager.add_listener(self._on_task_event)
+        self.search_text = ""
+        self.undo_stack = UndoStack(self.task_manager)
+        
+        # Slow operations run on a thread pool; at most one of them drives the progress bar
+        self.workers = WorkerPool()
+        self.job = None
+        self.busy = False  # a job is changing the task manager on its worker thread
+        
+        # One timer, always armed for the next task to become overdue
+        self.overdue_timer = QTimer(self.main_window)
+        self.overdue_timer.setSingleShot(True)
+        self.overdue_timer.timeout.connect(self._update_overdue)
+        
         # Connect signals from main window to controller methods
         self.main_window.add_task_requested.connect(self.add_task)
         self.main_window.edit_task_requested.connect(self.edit_task)
         self.main_window.complete_task_requested.connect(self.complete_task)
         self.main_window.delete_task_requested.connect(self.delete_task)
         self.main_window.filter_changed.connect(self.filter_tasks)
+        self.main_window.category_changed.connect(self.update_task_list)
+        self.main_window.search_changed.connect(self.search_tasks)
         self.main_window.open_settings_requested.connect(self.open_settings)
         self.main_window.open_statistics_requested.connect(self.open_statistics)
+        self.main_window.cancel_requested.connect(self.cancel_job)
+        self.main_window.import_tasks_requested.connect(self.import_tasks)
+        self.main_window.export_tasks_requested.connect(self.export_tasks)
+        self.main_window.undo_requested.connect(self.undo)
+        self.main_window.redo_requested.connect(self.redo)
         
         # Initial data load
+        self.main_window.set_task_manager(self.task_manager)
+        self.main_window.update_tasks(self.task_manager.get_all_tasks())
+        self._update_categories()
         self.update_task_list()
+        self._update_overdue()
+    
+    def _start_job(self, message, function, *args, on_result, on_cancelled=None, on_error=None, **kwargs):
+        # function runs on a worker thread; the callbacks run back on this one.
+        # Only jobs with an on_cancelled callback can be cancelled from the window.
+        self.main_window.show_progress(message, cancellable=on_cancelled is not None)
+        job = self.workers.start(function, *args,
+                                 on_progress=self.main_window.update_progress,
+                                 on_result=lambda result: self._finish_job(job, on_result, result),
+                                 on_error=lambda error: self._finish_job(job, on_error or self._show_error, error),
+                                 on_cancelled=lambda: self._finish_job(job, on_cancelled),
+                                 **kwargs)
+        self.job = job
+    
+    def _start_exclusive_job(self, message, function, *args, on_result, on_cancelled=None, **kwargs):
+        # For jobs that change the task manager on the worker thread. Until they finish the
+        # window leaves the manager alone and change events are only recorded, then applied.
+        self.busy = True
+        
+        def finish(callback, *result):
+            self.busy = False
+            self.flush_changes()
+            callback(*result)
+        
+        self._start_job(message, function, *args,
+                        on_result=lambda result: finish(on_result, result),
+                        on_cancelled=on_cancelled and (lambda: finish(on_cancelled)),
+                        on_error=lambda error: finish(self._show_error, error),
+                        **kwargs)
+    
+    def _check_idle(self, exclusive=False):
+        # exclusive: the action starts a job of its own, so no other job may be running
+        idle = not self.busy and not (exclusive and self.job is not None)
+        if not idle:
+            self.main_window.update_status("Please wait for the current operation to finish")
+        return idle
+    
+    def _finish_job(self, job, callback, *args):
+        if job is self.job:
+            self.job = None
+            self.main_window.hide_progress()
+        if callback is not None:
+            callback(*args)
+    
+    def _show_error(self, message):
+        self.main_window.update_status("Operation failed")
+        QMessageBox.warning(self.main_window, "Error", message)
+    
+    def cancel_job(self):
+        if self.job is not None:
+            self.job.cancel()
+    
+    def load_tasks(self, on_loaded=None):
+        # Reads and indexes the stored tasks in the background; the window stays
+        # responsive but ignores edits until they are in
+        def loaded(tasks):
+            self.main_window.update_tasks(tasks)
+            if on_loaded is not None:
+                on_loaded()
+            self.update_task_list()
+        
+        self._start_exclusive_job("Loading tasks...", self.task_manager.load_store, on_result=loaded)
+    
+    def import_tasks(self):
+        if not self._check_idle(exclusive=True):
+            return
+        path = self.main_window.get_import_path()
+        if not path:
+            return
+        from src.models.task_io import import_tasks  # only needed once a file is chosen
+        self._start_exclusive_job(
+            "Importing tasks...", import_tasks, self.task_manager, path,
+            on_result=lambda task_ids: self.main_window.update_status(f"Imported {len(task_ids)} tasks"),
+            on_cancelled=lambda: self.main_window.update_status("Import cancelled"))
+    
+    def export_tasks(self):
+        if not self._check_idle(exclusive=True):
+            return
+        path = self.main_window.get_export_path()
+        if not path:
+            return
+        from src.models.task_io import export_tasks
+        # Reads a snapshot, so tasks can still be edited while it is written
+        try:
+            tasks, total = self.task_manager.export_snapshot()
+        except StoreError as error:
+            self._show_error(str(error))
+            return
+        self._start_job(
+            "Exporting tasks...", export_tasks, tasks, path, total=total,
+            on_result=lambda count: self.main_window.update_status(f"Exported {count} tasks"),
+            on_cancelled=lambda: self.main_window.update_status("Export cancelled"))
+    
+    def _build_search_index(self):
+        if self.task_manager.search_backlog is not None:
+            return  # already being built
+        try:
+            documents, total = self.task_manager.start_search_index_build()
+        except StoreError as error:
+            self._show_error(str(error))
+            return
+        self._start_job("Indexing tasks for search...", SearchIndex().build, documents, total=total,
+                        on_result=self._on_search_index_built,
+                        on_cancelled=self._on_search_index_cancelled)
+    
+    def _on_search_index_built(self, index):
+        self.task_manager.finish_search_index_build(index)
+        self.update_task_list()
+    
+    def _on_search_index_cancelled(self):
+        self.task_manager.cancel_search_index_build()
+        self.main_window.update_status("Indexing cancelled")
     
     def update_task_list(self):
         current_filter = self.main_window.filter_combo.currentText()
         self.filter_tasks(current_filter)
     
+    def _on_task_event(self, event, task_id):
+        if event.startswith("bulk_"):
+            if len(task_id) > self.ROW_CHANGES or self.reset_pending:
+                self.reset_pending = True
+            else:
+                event = event[len("bulk_"):]
+                for changed_id in task_id:
+                    self._record_change(event, changed_id)
+        else:
+            if event == "overdue":
+                # Nothing changed in the task itself, only how it is shown
+                event = "updated"
+            self._record_change(event, task_id)
+        
+        if self.busy:
+            return  # on the worker thread, flushed when the job finishes
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            QTimer.singleShot(0, self.flush_changes)
+    
+    def _record_change(self, event, task_id):
+        previous = self.pending_changes.get(task_id)
+        if previous == "inserted" and event == "removed":
+            del self.pending_changes[task_id]
+        elif previous == "removed" and event == "inserted":
+            # Removed and put back, as by undo: the row is still there
+            self.pending_changes[task_id] = "updated"
+        elif previous != "inserted":
+            self.pending_changes[task_id] = event
+    
+    def flush_changes(self):
+        self.flush_scheduled = False
+        changes, self.pending_changes = self.pending_changes, {}
+        self._update_undo_actions()
+        self._update_categories()
+        if self.reset_pending:
+            self.reset_pending = False
+            self.main_window.update_tasks(self.task_manager.get_all_tasks())
+            self.update_task_list()
+            self._update_overdue()
+            return
+        
+        inserted, updated, removed = [], [], []
+        for task_id, event in changes.items():
+            task = self.task_manager.get_task_by_id(task_id)
+            if event == "removed" or task is None:
+                removed.append(task_id)
+            elif event == "inserted":
+                inserted.append(task)
+            else:
+                updated.append(task)
+        
+        self.main_window.apply_task_changes(inserted, updated, removed)
+        self._update_overdue()
+        if self.search_text:
+            # Edited text can change which tasks match and how they rank
+            self.update_task_list()
+    
+    def _update_categories(self):
+        # Counts are the sizes of the category index, so this is cheap on every change
+        self.main_window.update_categories(self.task_manager.category_counts())
+    
+    def _update_undo_actions(self):
+        self.main_window.update_undo_actions(self.undo_stack.undo_label(), self.undo_stack.redo_label())
+    
+    def undo(self):
+        if not self._check_idle():
+            return
+        label = self.undo_stack.undo()
+        if label is not None:
+            self.main_window.update_status(f"Undone: {label}")
+    
+    def redo(self):
+        if not self._check_idle():
+            return
+        label = self.undo_stack.redo()
+        if label is not None:
+            self.main_window.update_status(f"Redone: {label}")
+    
+    def _update_overdue(self):
+        if self.busy:
+            return  # re-armed by flush_changes once the job finishes
+        # Counting also flags tasks that fell due since the last check
+        self.main_window.update_overdue_count(self.task_manager.count_overdue_tasks())
+        
+        deadline = self.task_manager.next_overdue_deadline()
+        if deadline is None:
+            self.overdue_timer.stop()
+            return
+        # A task is overdue once the clock has passed its due date
+        milliseconds = int((deadline - datetime.now()).total_seconds() * 1000) + 1
+        self.overdue_timer.start(min(max(milliseconds, 0), 2 ** 31 - 1))
+    
     def filter_tasks(self, filter_text):
-        tasks = []
-        
-        if filter_text == "All":
-            tasks = self.task_manager.get_all_tasks()
-        elif filter_text == "Pending":
-            tasks = self.task_manager.get_pending_tasks()
-        elif filter_text == "Completed":
-            tasks = self.task_manager.get_completed_tasks()
-        elif filter_text == "High Priority":
-            from src.models.task import Priority
-            tasks = self.task_manager.get_tasks_by_priority(Priority.HIGH)
-        elif filter_text == "Medium Priority":
-            from src.models.task import Priority
-            tasks = self.task_manager.get_tasks_by_priority(Priority.MEDIUM)
-        elif filter_text == "Low Priority":
-            from src.models.task import Priority
-            tasks = self.task_manager.get_tasks_by_priority(Priority.LOW)
-        elif filter_text == "Overdue":
-            tasks = self.task_manager.get_overdue_tasks()
-        
-        self.main_window.update_tasks(tasks)
-        self.main_window.update_status(f"Showing {len(tasks)} tasks")
+        if self.busy:
+            return  # shown once the job finishes
+        sort_by = self.task_manager.get_setting("sort_by")
+        category = self.main_window.current_category()
+        if self.search_text and self.task_manager.search_index is None:
+            # Searched again once the index is built
+            self._build_search_index()
+        elif self.search_text:
+            ranked_ids = self.task_manager.search(self.search_text, filter_text, self.SEARCH_LIMIT, category)
+            count = self.main_window.set_task_view(filter_text, sort_by, ranked_ids, category)
+            self.main_window.update_status(f"Found {count} matching tasks")
+        else:
+            count = self.main_window.set_task_view(filter_text, sort_by, category=category)
+            self.main_window.update_status(f"Showing {count} tasks")
+    
+    def search_tasks(self, text):
+        # A trailing space means the last word is complete, so keep the text as typed
+        self.search_text = text if text.strip() else ""
+        self.update_task_list()
     
     def add_task(self):
-        result = self.main_window.open_task_dialog()
+        if not self._check_idle():
+            return
+        result = self.main_window.open_task_dialog(categories=self.task_manager.categories)
         
         if result == QDialog.DialogCode.Accepted:
             task = self.main_window.task_dialog.get_task()
             if task:
                 self.task_manager.add_task(task)
-                self.update_task_list()
                 self.main_window.update_status("Task added successfully")
     
     def edit_task(self, task_id):
+        if not self._check_idle():
+            return
         task = self.task_manager.get_task_by_id(task_id)
         if not task:
             return
         
-        result = self.main_window.open_task_dialog(task)
+        result = self.main_window.open_task_dialog(task, self.task_manager.categories)
         
         if result == QDialog.DialogCode.Accepted:
-            self.update_task_list()
             self.main_window.update_status("Task updated successfully")
     
     def complete_task(self, task_id):
+        if not self._check_idle():
+            return
         task = self.task_manager.get_task_by_id(task_id)
         if not task:
             return
         
         if not task.completed:
             self.task_manager.complete_task(task_id)
-            self.update_task_list()
             self.main_window.update_status("Task marked as completed")
     
     def delete_task(self, task_id):
+        if not self._check_idle():
+            return
         task = self.task_manager.get_task_by_id(task_id)
         if not task:
             return
@@ -94,25 +337,38 @@ class TaskController:
         
         if reply == QMessageBox.StandardButton.Yes:
             self.task_manager.delete_task(task_id)
-            self.update_task_list()
             self.main_window.update_status("Task deleted successfully")
     
     def open_settings(self):
+        if not self._check_idle():
+            return
         settings = self.task_manager.settings
         categories = self.task_manager.categories
         
-        result = self.main_window.open_settings_dialog(settings, categories)
+        result = self.main_window.open_settings_dialog(settings, categories, self.task_manager.category_counts())
         
         if result == QDialog.DialogCode.Accepted:
             # Update task manager with new settings
             new_settings = self.main_window.settings_dialog.get_settings()
             new_categories = self.main_window.settings_dialog.get_categories()
+            merges = self.main_window.settings_dialog.get_category_merges()
             
             self.task_manager.settings = new_settings
-            self.task_manager.categories = new_categories
+            # Tasks of removed categories are moved in one bulk change per category
+            for category in categories:
+                if category not in new_categories:
+                    self.task_manager.remove_category(category, merges.get(category, ""))
+            for category in new_categories:
+                self.task_manager.add_category(category)
+            self._update_categories()
             
+            # Re-sort in case the sort_by setting changed
+            self.update_task_list()
             self.main_window.update_status("Settings updated successfully")
     
     def open_statistics(self):
+        if not self._check_idle():
+            return
+        # Cheap enough for this thread: every figure comes from an aggregate
         stats = self.task_manager.get_tasks_stats()
         self.main_window.open_statistics_dialog(stats) 
\ No newline at end of file
@@ -0,0 +1,82 @@
+import time
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class Cancelled(Exception):
+    pass
+
+
+class WorkerSignals(QObject):
+    # Created on the UI thread, so connected slots run there
+    progress = pyqtSignal(int, int)  # done, total (0 when unknown)
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+
+
+class Worker(QRunnable):
+    PROGRESS_INTERVAL = 0.05  # seconds between progress signals
+
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        # function is called as function(*args, progress=..., **kwargs)
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.is_cancelled = False
+        self._last_progress = 0.0
+
+    def cancel(self):
+        self.is_cancelled = True
+
+    def report_progress(self, done, total=0):
+        # Passed to the job as its progress callback; also where cancellation is noticed
+        if self.is_cancelled:
+            raise Cancelled()
+        now = time.monotonic()
+        if now - self._last_progress >= self.PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.signals.progress.emit(done, total)
+
+    def run(self):
+        try:
+            result = self.function(*self.args, progress=self.report_progress, **self.kwargs)
+        except Cancelled:
+            self.signals.cancelled.emit()
+        except Exception as error:
+            self.signals.error.emit(str(error))
+        else:
+            if self.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class WorkerPool:
+    def __init__(self, thread_pool=None):
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self.workers = set()  # keeps running workers and their signals alive
+
+    def start(self, function, *args, on_result=None, on_progress=None, on_error=None,
+              on_cancelled=None, on_finished=None, **kwargs):
+        worker = Worker(function, *args, **kwargs)
+        for signal, slot in [(worker.signals.result, on_result), (worker.signals.progress, on_progress),
+                             (worker.signals.error, on_error), (worker.signals.cancelled, on_cancelled),
+                             (worker.signals.finished, on_finished)]:
+            if slot is not None:
+                signal.connect(slot)
+        worker.signals.finished.connect(lambda: self.workers.discard(worker))
+        self.workers.add(worker)
+        self.thread_pool.start(worker)
+        return worker
+
+    def cancel_all(self):
+        for worker in self.workers:
+            worker.cancel()
+
+    def wait(self):
+        self.thread_pool.waitForDone()
@@ -0,0 +1,65 @@
+import gc
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from heapq import merge
+
+
+RUN_LENGTH = 8192
+# Each single insert or delete moves half the list, so past this many changes
+# one filtering pass and a merge is cheaper, whatever the length of the list
+BULK_CHANGES = 64
+
+
+@contextmanager
+def gc_paused():
+    # Creating millions of long-lived objects would otherwise trigger many full
+    # GC passes, which find nothing to free and block every thread meanwhile
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def sort_in_runs(items):
+    # Same as sorted(items), but sorts short runs and merges them in Python code.
+    # A single large sort holds the GIL throughout, which would freeze the UI
+    # thread while a worker thread sorts a million tasks.
+    items = list(items)
+    if len(items) <= RUN_LENGTH:
+        return sorted(items)
+    runs = [sorted(items[start:start + RUN_LENGTH]) for start in range(0, len(items), RUN_LENGTH)]
+    return list(merge(*runs))
+
+
+def update_sorted(entries, removed=(), added=()):
+    # Removes and inserts entries of a sorted list; returns the updated list,
+    # which is the same list object when it was changed in place
+    if len(removed) + len(added) <= BULK_CHANGES:
+        for entry in removed:
+            del entries[bisect_left(entries, entry)]
+        for entry in added:
+            insort(entries, entry)
+        return entries
+    # Otherwise the list is rebuilt from slices between the changed positions, found by
+    # bisection, so the untouched entries are copied without being compared
+    if removed:
+        kept, start = [], 0
+        for entry in sort_in_runs(removed):
+            position = bisect_left(entries, entry, start)
+            kept += entries[start:position]
+            start = position + 1
+        kept += entries[start:]
+        entries = kept
+    if added:
+        merged, start = [], 0
+        for entry in sort_in_runs(added):
+            position = bisect_left(entries, entry, start)
+            merged += entries[start:position]
+            merged.append(entry)
+            start = position
+        merged += entries[start:]
+        entries = merged
+    return entries
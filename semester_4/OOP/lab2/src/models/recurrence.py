@@ -0,0 +1,147 @@
+from calendar import monthrange
+from datetime import datetime, timedelta
+
+
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+DATETIME_FORMAT = "%Y%m%dT%H%M%S"
+INSTANT = timedelta(microseconds=1)
+
+
+class Recurrence:
+    # A repeating series: every interval days, weeks (on some weekdays) or months from
+    # start, optionally ending after count occurrences or at until. Occurrences are numbered
+    # from 0 and computed from their number, so counting the ones in a range, or finding
+    # the next one, takes constant time however long the series has been running.
+    # Monthly series on the 29th-31st fall on the last day of shorter months.
+    FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+
+    def __init__(self, start, frequency, interval=1, weekdays=None, count=None, until=None):
+        if frequency not in self.FREQUENCIES:
+            raise ValueError(f"Unsupported frequency '{frequency}', expected one of {', '.join(self.FREQUENCIES)}")
+        if interval < 1 or (count is not None and count < 1):
+            raise ValueError("Interval and count must be positive")
+        self.start = start.replace(microsecond=0)
+        self.frequency = frequency
+        self.interval = interval
+        self.weekdays = tuple(sorted(set(weekdays or [start.weekday()]))) if frequency == "WEEKLY" else ()
+        self.count = count
+        self.until = until
+
+        if frequency == "WEEKLY":
+            # Weeks are counted from the Monday of the first one; days of it before start are skipped
+            self._week_start = self.start - timedelta(days=self.start.weekday())
+            self._skipped = sum(1 for weekday in self.weekdays if weekday < self.start.weekday())
+        # Occurrences in the series, None when it does not end
+        self.length = count
+        if until is not None:
+            until_length = self._raw_count_before(until + INSTANT)
+            self.length = until_length if count is None else min(count, until_length)
+
+    def _raw_occurrence(self, number):
+        if self.frequency == "DAILY":
+            return self.start + timedelta(days=number * self.interval)
+        if self.frequency == "WEEKLY":
+            number += self._skipped
+            week, day = divmod(number, len(self.weekdays))
+            return self._week_start + timedelta(weeks=week * self.interval, days=self.weekdays[day])
+        year, month = divmod(self.start.month - 1 + number * self.interval, 12)
+        year += self.start.year
+        return self.start.replace(year=year, month=month + 1,
+                                  day=min(self.start.day, monthrange(year, month + 1)[1]))
+
+    def _raw_count_before(self, moment):
+        # Occurrences before moment, as if the series did not end
+        if moment <= self.start:
+            return 0
+        if self.frequency == "DAILY":
+            return -((self.start - moment) // timedelta(days=self.interval))
+        if self.frequency == "WEEKLY":
+            week = (moment - self._week_start) // timedelta(weeks=1)
+            weeks = -(-week // self.interval)  # weeks with occurrences before this one
+            number = weeks * len(self.weekdays)
+            if week % self.interval == 0:
+                week_start = self._week_start + timedelta(weeks=week)
+                number += sum(1 for weekday in self.weekdays if week_start + timedelta(days=weekday) < moment)
+            return number - self._skipped
+        months = (moment.year - self.start.year) * 12 + moment.month - self.start.month
+        last = months // self.interval
+        return last if self._raw_occurrence(last) >= moment else last + 1
+
+    def occurrence(self, number):
+        # The occurrence with this number, or None past the end of the series
+        if number < 0 or (self.length is not None and number >= self.length):
+            return None
+        return self._raw_occurrence(number)
+
+    def count_before(self, moment):
+        number = self._raw_count_before(moment)
+        return number if self.length is None else min(number, self.length)
+
+    def count_between(self, start, end):
+        # Occurrences at or after start and before end
+        return max(0, self.count_before(end) - self.count_before(start))
+
+    def next_after(self, moment):
+        return self.occurrence(self.count_before(moment + INSTANT))
+
+    def occurrences(self, start, end=None):
+        # Lazily yields the occurrences at or after start and before end
+        number = self.count_before(start)
+        while True:
+            moment = self.occurrence(number)
+            if moment is None or (end is not None and moment >= end):
+                return
+            yield moment
+            number += 1
+
+    def rule(self):
+        # iCalendar RRULE value
+        parts = [f"FREQ={self.frequency}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.frequency == "WEEKLY":
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[weekday] for weekday in self.weekdays))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime(DATETIME_FORMAT)}")
+        return ";".join(parts)
+
+    @classmethod
+    def from_rule(cls, rule, start):
+        # Parses an RRULE value; BYDAY is only used by weekly rules
+        values = dict(part.split("=", 1) for part in rule.upper().replace("RRULE:", "").split(";") if "=" in part)
+        try:
+            weekdays = [WEEKDAYS.index(day.strip()[-2:]) for day in values["BYDAY"].split(",")] \
+                if "BYDAY" in values else None
+            return cls(start, values.get("FREQ", ""), int(values.get("INTERVAL", 1)), weekdays,
+                       int(values["COUNT"]) if "COUNT" in values else None,
+                       datetime.strptime(values["UNTIL"].rstrip("Z")[:15], DATETIME_FORMAT)
+                       if "UNTIL" in values else None)
+        except (KeyError, ValueError) as error:
+            raise ValueError(f"Invalid recurrence rule '{rule}': {error}") from None
+
+    def to_string(self):
+        # Stored form: the start of the series, then its rule
+        return f"DTSTART={self.start.strftime(DATETIME_FORMAT)};{self.rule()}"
+
+    @classmethod
+    def from_string(cls, value):
+        start, _, rule = value.partition(";")
+        return cls.from_rule(rule, datetime.strptime(start.partition("=")[2], DATETIME_FORMAT))
+
+    def describe(self):
+        unit = {"DAILY": "day", "WEEKLY": "week", "MONTHLY": "month"}[self.frequency]
+        text = f"Every {unit}" if self.interval == 1 else f"Every {self.interval} {unit}s"
+        if self.frequency == "WEEKLY" and self.weekdays != (self.start.weekday(),):
+            text += " on " + ", ".join(WEEKDAYS[weekday].title() for weekday in self.weekdays)
+        return text
+
+    def __eq__(self, other):
+        return isinstance(other, Recurrence) and self.to_string() == other.to_string()
+
+    def __hash__(self):
+        return hash(self.to_string())
+
+    def __repr__(self):
+        return f"Recurrence({self.to_string()!r})"
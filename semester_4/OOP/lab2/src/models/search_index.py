@@ -0,0 +1,153 @@
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import nlargest
+from src.models.bulk import gc_paused, sort_in_runs
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.casefold()) if text else []
+
+
+class SearchIndex:
+    # BM25 parameters
+    K1 = 1.2
+    B = 0.75
+    TITLE_WEIGHT = 2  # a word in the title counts as this many occurrences
+    MAX_EXPANSIONS = 64  # most frequent terms a prefix is expanded to
+    MIN_PREFIX_LENGTH = 3  # shorter words are only matched exactly
+
+    def __init__(self):
+        self.postings = {}  # term -> {task id: term frequency}
+        self.terms = []  # sorted vocabulary, for prefix lookups
+        self.lengths = {}  # task id -> document length in tokens
+        self.total_length = 0
+        # BM25 length normalisation per task, valid while the average length stays close
+        self._norms = {}
+        self._norms_average = None
+
+    def _term_counts(self, title, description):
+        counts = Counter(tokenize(description))
+        for token in tokenize(title):
+            counts[token] += self.TITLE_WEIGHT
+        return counts
+
+    def _index(self, task_id, title, description):
+        # Returns the terms that were not in the vocabulary yet
+        new_terms = []
+        counts = self._term_counts(title, description)
+        for term, count in counts.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                new_terms.append(term)
+            postings[task_id] = count
+        length = sum(counts.values())
+        self.lengths[task_id] = length
+        self.total_length += length
+        if self._norms_average is not None:
+            self._norms[task_id] = self._norm(length, self._norms_average)
+        return new_terms
+
+    def _norm(self, length, average_length):
+        return self.K1 * (1 - self.B + self.B * length / average_length)
+
+    def _current_norms(self):
+        average_length = self.total_length / len(self.lengths)
+        if self._norms_average is None or abs(average_length - self._norms_average) > 0.01 * self._norms_average:
+            self._norms = {task_id: self._norm(length, average_length) for task_id, length in self.lengths.items()}
+            self._norms_average = average_length
+        return self._norms
+
+    def build(self, documents, progress=None, total=0):
+        # documents: (task id, title, description); the vocabulary is sorted once at the end
+        with gc_paused():
+            for count, (task_id, title, description) in enumerate(documents, start=1):
+                self.terms.extend(self._index(task_id, title, description))
+                if progress is not None and count % 1000 == 0:
+                    progress(count, total)
+        self.terms = sort_in_runs(self.terms)
+        if self.lengths:
+            self._current_norms()
+        return self
+
+    def add(self, task_id, title, description):
+        for term in self._index(task_id, title, description):
+            insort(self.terms, term)
+
+    def remove(self, task_id, title, description):
+        # Needs the text the task was indexed with
+        for term in self._term_counts(title, description):
+            postings = self.postings.get(term)
+            if postings is None or postings.pop(task_id, None) is None:
+                continue
+            if not postings:
+                del self.postings[term]
+                del self.terms[bisect_left(self.terms, term)]
+        self.total_length -= self.lengths.pop(task_id, 0)
+        self._norms.pop(task_id, None)
+
+    def _expand(self, prefix):
+        start = bisect_left(self.terms, prefix)
+        end = bisect_left(self.terms, prefix + "\uffff", start)
+        if end - start > self.MAX_EXPANSIONS:
+            return nlargest(self.MAX_EXPANSIONS, self.terms[start:end],
+                            key=lambda term: len(self.postings[term]))
+        return self.terms[start:end]
+
+    def search(self, query, limit=None, accepts=None):
+        # Every word must match; the last one also matches as a prefix while it
+        # is being typed. accepts(task_id) can narrow the results further.
+        # Returns task ids, best match first.
+        tokens = tokenize(query)
+        if not tokens or not self.lengths:
+            return []
+        groups = [[token] for token in tokens[:-1]]
+        last = tokens[-1]
+        if query[-1:].isalnum() and len(last) >= self.MIN_PREFIX_LENGTH:
+            groups.append(self._expand(last))
+        else:
+            # Expanding one or two letters would match most of the index
+            groups.append([last])
+        groups = [[self.postings[term] for term in group if term in self.postings] for group in groups]
+        if not all(groups):
+            return []
+
+        # Start from the rarest word and only check the others for those candidates
+        groups.sort(key=lambda group: sum(map(len, group)))
+        first = groups[0]
+        candidates = first[0].keys() if len(first) == 1 else set().union(*first)
+        if accepts is not None:
+            candidates = [task_id for task_id in candidates if accepts(task_id)]
+        for group in groups[1:]:
+            if len(group) == 1:
+                candidates = [task_id for task_id in candidates if task_id in group[0]]
+            else:
+                candidates = [task_id for task_id in candidates
+                              if any(task_id in postings for postings in group)]
+            if not candidates:
+                return []
+
+        total = len(self.lengths)
+        norms = self._current_norms()
+        saturation = self.K1 + 1
+        scores = dict.fromkeys(candidates, 0.0)
+        for group in groups:
+            for postings in group:
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                if len(postings) < len(scores):
+                    matches = [(task_id, frequency) for task_id, frequency in postings.items()
+                               if task_id in scores]
+                else:
+                    matches = [(task_id, postings[task_id]) for task_id in scores if task_id in postings]
+                weight = idf * saturation
+                for task_id, frequency in matches:
+                    scores[task_id] += weight * frequency / (frequency + norms[task_id])
+
+        if limit is not None and limit < len(scores):
+            return nlargest(limit, scores, key=scores.get)
+        return sorted(scores, key=scores.get, reverse=True)
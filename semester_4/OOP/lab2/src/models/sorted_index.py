@@ -0,0 +1,46 @@
+from bisect import bisect_left, insort
+from src.models.bulk import sort_in_runs, update_sorted
+
+
+class SortedIndex:
+    def __init__(self, key, tasks=()):
+        self.key = key
+        self.keys = {task.id: key(task) for task in tasks}  # task id -> key it is stored under
+        self.entries = sort_in_runs((value, task_id) for task_id, value in self.keys.items())
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, task):
+        value = self.key(task)
+        self.keys[task.id] = value
+        insort(self.entries, (value, task.id))
+
+    def add_many(self, tasks):
+        new_keys = {task.id: self.key(task) for task in tasks}
+        self.keys.update(new_keys)
+        self.entries = update_sorted(self.entries, added=[(value, task_id) for task_id, value in new_keys.items()])
+
+    def remove_many(self, task_ids):
+        removed = [(self.keys.pop(task_id), task_id) for task_id in task_ids]
+        self.entries = update_sorted(self.entries, removed=removed)
+
+    def update_many(self, tasks):
+        removed, added = [], []
+        for task in tasks:
+            value = self.key(task)
+            old_value = self.keys[task.id]
+            if old_value != value:
+                removed.append((old_value, task.id))
+                added.append((value, task.id))
+                self.keys[task.id] = value
+        self.entries = update_sorted(self.entries, removed, added)
+
+    def remove(self, task_id):
+        value = self.keys.pop(task_id)
+        del self.entries[bisect_left(self.entries, (value, task_id))]
+
+    def update(self, task):
+        if self.keys[task.id] != self.key(task):
+            self.remove(task.id)
+            self.add(task)
@@ -1,5 +1,8 @@
+import sys
+import time
 from datetime import datetime
 from enum import Enum
+from src.models.recurrence import Recurrence
 
 
 class Priority(Enum):
@@ -8,31 +11,164 @@ class Priority(Enum):
     HIGH = 3
 
 
+PRIORITY_BY_VALUE = {priority.value: priority for priority in Priority}
+
+
+def to_timestamp(value):
+    # Microseconds since the Unix epoch; exact for the naive local datetimes used here
+    return int(value.replace(microsecond=0).timestamp()) * 1_000_000 + value.microsecond
+
+
+def from_timestamp(value):
+    seconds, microseconds = divmod(value, 1_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=microseconds)
+
+
+def now_timestamp():
+    return time.time_ns() // 1000
+
+
+_UNCHANGED = object()  # default of Task.update's recurrence, for which None means "does not repeat"
+
+
 class Task:
-    def __init__(self, title="", description="", due_date=None, priority=Priority.MEDIUM, completed=False):
+    # No per-task __dict__; times are kept as timestamps (see to_timestamp),
+    # which take less room than datetimes and compare faster in the indexes
+    __slots__ = ("id", "title", "_description", "due_timestamp", "priority", "completed",
+                 "created_timestamp", "updated_timestamp", "recurrence", "category", "listener",
+                 "description_loader")
+    
+    def __init__(self, title="", description="", due_date=None, priority=Priority.MEDIUM, completed=False,
+                 recurrence=None, category=""):
         self.id = None  # Will be set when added to the task list
         self.title = title
         self.description = description
-        self.due_date = due_date
+        # A repeating task is one task for the whole series, due at its first pending occurrence
+        self.recurrence = recurrence
+        self.due_date = due_date if due_date is not None or recurrence is None else recurrence.occurrence(0)
         self.priority = priority
         self.completed = completed
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        # "" for no category; interned, so tasks of a category share one string
+        self.category = sys.intern(category)
+        # Both times start as the same int object
+        self.created_timestamp = self.updated_timestamp = now_timestamp()
+        self.listener = None  # Set by the TaskManager that owns the task
+        self.description_loader = None  # Set for tasks loaded without their description
+    
+    @property
+    def description(self):
+        if self._description is None and self.description_loader is not None:
+            self._description = self.description_loader(self.id)
+        return self._description
+    
+    @description.setter
+    def description(self, description):
+        self._description = description
+    
+    @property
+    def due_date(self):
+        return from_timestamp(self.due_timestamp) if self.due_timestamp is not None else None
+    
+    @due_date.setter
+    def due_date(self, due_date):
+        self.due_timestamp = to_timestamp(due_date) if due_date is not None else None
+    
+    @property
+    def created_at(self):
+        return from_timestamp(self.created_timestamp)
+    
+    @created_at.setter
+    def created_at(self, created_at):
+        self.created_timestamp = to_timestamp(created_at)
+    
+    @property
+    def updated_at(self):
+        return from_timestamp(self.updated_timestamp)
+    
+    @updated_at.setter
+    def updated_at(self, updated_at):
+        self.updated_timestamp = to_timestamp(updated_at)
+    
+    def to_record(self):
+        # Description is None when it was never loaded, so storage keeps its copy
+        return (self.id, self.title, self._description,
+                self.due_timestamp / 1e6 if self.due_timestamp is not None else None,
+                self.priority.value, int(self.completed),
+                self.created_timestamp / 1e6, self.updated_timestamp / 1e6,
+                self.recurrence.to_string() if self.recurrence is not None else None, self.category)
+    
+    @classmethod
+    def from_record(cls, record):
+        (task_id, title, description, due_date, priority, completed, created_at, updated_at,
+         recurrence, category) = record
+        task = cls.__new__(cls)
+        task.id = task_id
+        task.title = title
+        task._description = description
+        task.due_timestamp = round(due_date * 1e6) if due_date is not None else None
+        task.priority = PRIORITY_BY_VALUE[priority]
+        task.completed = bool(completed)
+        task.created_timestamp = round(created_at * 1e6)
+        task.updated_timestamp = task.created_timestamp if updated_at == created_at else round(updated_at * 1e6)
+        task.recurrence = Recurrence.from_string(recurrence) if recurrence is not None else None
+        task.category = sys.intern(category)
+        task.listener = None
+        task.description_loader = None
+        return task
     
     def complete(self):
+        # A repeating task moves on to its next occurrence, and is completed after its last one
+        if self.recurrence is not None and not self.completed and self.due_timestamp is not None:
+            next_due = self.recurrence.next_after(self.due_date)
+            if next_due is not None:
+                old_values = {"due_date": self.due_date}
+                self.due_date = next_due
+                self.updated_timestamp = now_timestamp()
+                self._notify(old_values)
+                return
+        old_values = {} if self.completed else {"completed": False}
         self.completed = True
-        self.updated_at = datetime.now()
+        self.updated_timestamp = now_timestamp()
+        self._notify(old_values)
     
-    def update(self, title=None, description=None, due_date=None, priority=None):
+    def update(self, title=None, description=None, due_date=None, priority=None, recurrence=_UNCHANGED,
+               category=None):
+        # Remember the previous values so that the owner can update its indexes
+        old_values = {}
         if title is not None:
+            old_values["title"] = self.title
             self.title = title
         if description is not None:
+            old_values["description"] = self.description
             self.description = description
         if due_date is not None:
+            old_values["due_date"] = self.due_date
             self.due_date = due_date
         if priority is not None:
+            old_values["priority"] = self.priority
             self.priority = priority
-        self.updated_at = datetime.now()
+        if recurrence is not _UNCHANGED and recurrence != self.recurrence:
+            old_values["recurrence"] = self.recurrence
+            self.recurrence = recurrence
+        if category is not None and category != self.category:
+            old_values["category"] = self.category
+            self.category = sys.intern(category)
+        self.updated_timestamp = now_timestamp()
+        self._notify(old_values)
+    
+    def assign(self, **values):
+        # Sets fields to exactly these values, None and False included, and returns the
+        # previous ones. Unlike update, the owner is not notified; it reindexes the task itself.
+        old_values = {}
+        for field, value in values.items():
+            old_values[field] = getattr(self, field)
+            setattr(self, field, value)
+        self.updated_timestamp = now_timestamp()
+        return old_values
+    
+    def _notify(self, old_values):
+        if self.listener is not None and old_values:
+            self.listener(self, old_values)
     
     def __str__(self):
         return f"{self.title} - {self.priority.name} - {'Completed' if self.completed else 'Pending'}" 
\ No newline at end of file
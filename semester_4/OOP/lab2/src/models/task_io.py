@@ -0,0 +1,294 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime, timezone
+from src.models.task import Task, Priority
+from src.models.recurrence import Recurrence
+
+
+# Columns of the CSV format and keys of the JSON-lines format
+FIELDS = ["title", "description", "due_date", "priority", "completed", "created_at", "updated_at", "recurrence",
+          "category"]
+
+# iCalendar priorities run from 1 (highest) to 9 (lowest)
+ICAL_PRIORITIES = {Priority.HIGH: 1, Priority.MEDIUM: 5, Priority.LOW: 9}
+ICAL_DATETIME = "%Y%m%dT%H%M%S"
+ICAL_LINE_LENGTH = 75  # octets, longer lines are folded
+
+PROGRESS_INTERVAL = 1000  # tasks between progress reports
+
+
+def _format_datetime(value):
+    return value.isoformat(timespec="seconds") if value else ""
+
+
+def _parse_datetime(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _parse_priority(value):
+    if isinstance(value, int) or value.isdigit():
+        return Priority(int(value))
+    return Priority[value.upper()]
+
+
+def _parse_completed(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes")
+
+
+def _make_task(title, description, due_date, priority, completed, created_at, updated_at, recurrence=None,
+               category=""):
+    task = Task(title=title, description=description, due_date=due_date,
+                priority=priority, completed=completed, recurrence=recurrence, category=category)
+    if created_at is not None:
+        task.created_at = created_at
+    if updated_at is not None and updated_at != created_at:
+        task.updated_at = updated_at
+    else:
+        task.updated_timestamp = task.created_timestamp
+    return task
+
+
+def _to_row(task):
+    return [task.title, task.description or "", _format_datetime(task.due_date), task.priority.name,
+            int(task.completed), _format_datetime(task.created_at), _format_datetime(task.updated_at),
+            task.recurrence.to_string() if task.recurrence is not None else "", task.category]
+
+
+def _from_row(row):
+    return _make_task(row["title"], row.get("description") or "", _parse_datetime(row.get("due_date")),
+                      _parse_priority(row.get("priority") or "MEDIUM"),
+                      _parse_completed(row.get("completed") or ""),
+                      _parse_datetime(row.get("created_at")), _parse_datetime(row.get("updated_at")),
+                      Recurrence.from_string(row["recurrence"]) if row.get("recurrence") else None,
+                      row.get("category") or "")
+
+
+def write_csv(tasks, file):
+    writer = csv.writer(file)
+    writer.writerow(FIELDS)
+    for task in tasks:
+        writer.writerow(_to_row(task))
+        yield
+
+
+def read_csv(file):
+    reader = csv.DictReader(file)
+    if reader.fieldnames is not None and "title" not in reader.fieldnames:
+        raise ValueError(f"Missing column 'title' in the CSV header, expected columns {', '.join(FIELDS)}")
+    for row in reader:
+        yield _from_row(row)
+
+
+def write_jsonl(tasks, file):
+    for task in tasks:
+        file.write(json.dumps(dict(zip(FIELDS, _to_row(task))), ensure_ascii=False))
+        file.write("\n")
+        yield
+
+
+def read_jsonl(file):
+    for number, line in enumerate(file, start=1):
+        if line.strip():
+            row = json.loads(line)
+            if not isinstance(row, dict) or "title" not in row:
+                raise ValueError(f"Missing key 'title' on line {number}, expected an object with keys "
+                                 f"{', '.join(FIELDS)}")
+            yield _from_row(row)
+
+
+def _ical_escape(text):
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _ical_unescape(text):
+    if "\\" not in text:
+        return text
+    result = []
+    characters = iter(text)
+    for character in characters:
+        if character == "\\":
+            character = next(characters, "")
+            result.append("\n" if character in "nN" else character)
+        else:
+            result.append(character)
+    return "".join(result)
+
+
+def _ical_split(text):
+    # Splits a list value on its unescaped commas
+    parts, start, escaped = [], 0, False
+    for position, character in enumerate(text):
+        if escaped:
+            escaped = False
+        elif character == "\\":
+            escaped = True
+        elif character == ",":
+            parts.append(text[start:position])
+            start = position + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _ical_fold(line):
+    if len(line) < ICAL_LINE_LENGTH // 4 or len(line.encode("utf-8")) <= ICAL_LINE_LENGTH:
+        return line + "\r\n"
+    # Continuation lines start with a space, which counts towards their length
+    parts = []
+    start, length = 0, 0
+    for position, character in enumerate(line):
+        size = len(character.encode("utf-8"))
+        if length + size > ICAL_LINE_LENGTH:
+            parts.append(line[start:position])
+            start, length = position, 1
+        length += size
+    parts.append(line[start:])
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ical_datetime(value):
+    # Floating local time, as the app keeps naive datetimes
+    return value.strftime(ICAL_DATETIME)
+
+
+def _parse_ical_datetime(value, parameters):
+    # Sliced by hand: strptime would dominate the time spent reading a file
+    date = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+    if "VALUE=DATE" in parameters or len(value) == 8:
+        return date
+    result = date.replace(hour=int(value[9:11]), minute=int(value[11:13]), second=int(value[13:15]))
+    if value.endswith("Z"):
+        return result.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return result
+
+
+def write_ical(tasks, file):
+    file.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Task Manager//EN\r\n")
+    stamp = datetime.now(timezone.utc).strftime(ICAL_DATETIME) + "Z"
+    for task in tasks:
+        lines = ["BEGIN:VTODO",
+                 f"UID:task-{task.id}-{task.created_timestamp}@task-manager",
+                 f"DTSTAMP:{stamp}",
+                 f"CREATED:{_ical_datetime(task.created_at)}",
+                 f"LAST-MODIFIED:{_ical_datetime(task.updated_at)}",
+                 f"SUMMARY:{_ical_escape(task.title)}"]
+        if task.description:
+            lines.append(f"DESCRIPTION:{_ical_escape(task.description)}")
+        if task.due_date:
+            lines.append(f"DUE:{_ical_datetime(task.due_date)}")
+        if task.recurrence is not None:
+            # The series starts at DTSTART; DUE is its next pending occurrence
+            lines.append(f"DTSTART:{_ical_datetime(task.recurrence.start)}")
+            lines.append(f"RRULE:{task.recurrence.rule()}")
+        if task.category:
+            lines.append(f"CATEGORIES:{_ical_escape(task.category)}")
+        lines.append(f"PRIORITY:{ICAL_PRIORITIES[task.priority]}")
+        lines.append("STATUS:COMPLETED" if task.completed else "STATUS:NEEDS-ACTION")
+        lines.append("END:VTODO")
+        file.write("".join(map(_ical_fold, lines)))
+        yield
+    file.write("END:VCALENDAR\r\n")
+
+
+def _ical_properties(file):
+    # Unfolded "NAME;PARAMETERS:value" lines
+    pending = None
+    for line in file:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if pending is not None:
+                pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending:
+        yield pending
+
+
+def read_ical(file):
+    todo = None
+    for line in _ical_properties(file):
+        name, _, value = line.partition(":")
+        name, _, parameters = name.partition(";")
+        name = name.upper()
+        if name == "BEGIN" and value.upper() == "VTODO":
+            todo = {}
+        elif name == "END" and value.upper() == "VTODO" and todo is not None:
+            priority = todo.get("PRIORITY", 0)
+            start = todo.get("DTSTART") or todo.get("DUE")
+            yield _make_task(todo.get("SUMMARY", ""), todo.get("DESCRIPTION", ""), todo.get("DUE"),
+                             # 1-4 high, 5 medium, 6-9 low, 0 undefined
+                             Priority.HIGH if 1 <= priority <= 4 else
+                             Priority.LOW if priority >= 6 else Priority.MEDIUM,
+                             todo.get("STATUS") == "COMPLETED",
+                             todo.get("CREATED"), todo.get("LAST-MODIFIED"),
+                             Recurrence.from_rule(todo["RRULE"], start) if "RRULE" in todo and start else None,
+                             todo.get("CATEGORIES", ""))
+            todo = None
+        elif todo is None:
+            continue
+        elif name in ("SUMMARY", "DESCRIPTION"):
+            todo[name] = _ical_unescape(value)
+        elif name == "CATEGORIES" and "CATEGORIES" not in todo:
+            # A task has one category: the first one listed
+            todo[name] = _ical_unescape(_ical_split(value)[0]).strip()
+        elif name in ("DUE", "DTSTART", "CREATED", "LAST-MODIFIED"):
+            todo[name] = _parse_ical_datetime(value, parameters.upper())
+        elif name == "PRIORITY":
+            todo[name] = int(value or 0)
+        elif name in ("STATUS", "RRULE"):
+            todo[name] = value.upper()
+
+
+# File extension -> (reader, writer)
+FORMATS = {
+    ".csv": (read_csv, write_csv),
+    ".jsonl": (read_jsonl, write_jsonl),
+    ".ics": (read_ical, write_ical),
+}
+
+
+def _format_of(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported file type '{extension}', expected one of {', '.join(FORMATS)}")
+    return FORMATS[extension]
+
+
+def read_tasks(path, progress=None):
+    # Yields the tasks in a file one at a time; progress is reported in kilobytes read
+    reader, _ = _format_of(path)
+    with open(path, "rb") as raw:
+        size = os.fstat(raw.fileno()).st_size // 1024
+        file = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        for count, task in enumerate(reader(file), start=1):
+            if progress is not None and count % PROGRESS_INTERVAL == 0:
+                progress(raw.tell() // 1024, size)
+            yield task
+
+
+def import_tasks(task_manager, path, progress=None):
+    # bulk_add takes the tasks a chunk at a time, so the file is never held in memory whole
+    return task_manager.bulk_add(read_tasks(path, progress))
+
+
+def export_tasks(tasks, path, progress=None, total=0):
+    # Written next to the target first, so a failed or cancelled export leaves no partial file
+    _, writer = _format_of(path)
+    partial_path = path + ".part"
+    count = 0
+    try:
+        with open(partial_path, "w", encoding="utf-8", newline="") as file:
+            for count, _ in enumerate(writer(tasks, file), start=1):
+                if progress is not None and count % PROGRESS_INTERVAL == 0:
+                    progress(count, total)
+        os.replace(partial_path, path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    return count
@@ -1,30 +1,383 @@
-from datetime import datetime
-from src.models.task import Task, Priority
+from bisect import bisect_left, insort
+from heapq import merge
+from itertools import islice
+from operator import attrgetter
+from src.models.task import Task, Priority, to_timestamp, from_timestamp, now_timestamp
+from src.models.bulk import BULK_CHANGES, gc_paused, sort_in_runs, update_sorted
+from src.models.sorted_index import SortedIndex
+from src.models.search_index import SearchIndex
+from src.models.time_series import TaskTrends
+from src.models.recurrence import INSTANT
+
+
+# Sort orders offered by the "sort_by" setting; ties are broken by task id.
+# Times are compared as timestamps, which sort the same as the datetimes.
+SORT_KEYS = {
+    "due_date": lambda task: (task.due_timestamp is None, task.due_timestamp or 0),
+    "priority": lambda task: -task.priority.value,
+    "title": lambda task: task.title.casefold(),
+    "created_at": lambda task: task.created_timestamp,
+}
+
+FILTERS = {
+    "All": None,
+    "Pending": lambda task: not task.completed,
+    "Completed": lambda task: task.completed,
+    "High Priority": lambda task: task.priority == Priority.HIGH,
+    "Medium Priority": lambda task: task.priority == Priority.MEDIUM,
+    "Low Priority": lambda task: task.priority == Priority.LOW,
+    "Overdue": None,  # depends on when overdue tasks were last checked, see TaskManager.is_overdue
+    "Repeating": lambda task: task.recurrence is not None,
+}
+
+
+# Tasks added by bulk_add at a time; bounds the memory of importing a large file
+BULK_ADD_CHUNK = 50_000
+
+
+# Categories with fewer than 1/CATEGORY_SORT_SHARE of the tasks are shown by sorting
+# their own tasks, larger ones by filtering the full sort order
+CATEGORY_SORT_SHARE = 8
 
 
 class TaskManager:
-    def __init__(self):
-        self.tasks = []
+    def __init__(self, store=None, load=True):
+        self.tasks = {}  # task id -> task, kept in id order
         self.next_id = 1
-        self.categories = ["Work", "Personal", "Shopping", "Health", "Education"]
+        
+        # Aggregates kept up to date on every change, so stats need no full scan
+        self.completed_ids = set()
+        self.priority_ids = {priority: set() for priority in Priority}
+        self.trends = TaskTrends()  # tasks created, completed and overdue per day
+        self.due_index = []  # sorted (due timestamp, task id) of pending tasks
+        # Tasks that repeat; each is one entry in the other indexes, due at its next occurrence
+        self.recurring_ids = set()
+        # Pending tasks due before this timestamp are overdue; advanced by refresh_overdue
+        self.overdue_checked_at = now_timestamp()
+        self.sort_indexes = {}  # sort key name -> SortedIndex, built on first use
+        self.search_index = None  # SearchIndex over titles and descriptions, built on first search
+        # While a SearchIndex is built in the background: task id -> (title, description)
+        # it had when the build started, or None for tasks added since
+        self.search_backlog = None
+        # Called with ("inserted" | "updated" | "removed" | "overdue", task id) or
+        # ("bulk_inserted" | "bulk_updated" | "bulk_removed", list of task ids)
+        self.listeners = []
+        self.undo_stack = None  # UndoStack that records every change, if set
+        self._task_listener = self._on_task_changed  # one bound method shared by every task
+        # Category -> ids of its tasks, in the order the categories were added; tasks
+        # without a category are not indexed, they are what the categories leave over
+        self.category_ids = {category: set() for category in ["Work", "Personal", "Shopping", "Health", "Education"]}
         self.settings = {
             "dark_mode": False,
             "show_completed": True,
             "default_priority": Priority.MEDIUM,
             "sort_by": "due_date"
         }
+        
+        # Optional TaskStore: tasks are loaded from it and every change is written back.
+        # With load=False the caller loads them, e.g. from store.read_tasks on a worker thread.
+        self.store = store
+        if store is not None:
+            if load:
+                self.load_tasks(store.load_tasks())
+            self.add_listener(self._save_change)
+    
+    def load_tasks(self, tasks):
+        # Bulk load without change events
+        with gc_paused():
+            due_entries = self._insert_all(tasks)
+        self.due_index = sort_in_runs(self.due_index + due_entries)
+        if self.tasks:
+            self.next_id = max(self.next_id, max(self.tasks) + 1)
+        self.sort_indexes.clear()
+        self.search_index = None
+    
+    def _insert_all(self, tasks):
+        # Aggregates of many tasks at once; returns their due index entries, for the
+        # caller to merge in one go
+        tasks = list(tasks)
+        listener = self._task_listener
+        due_entries = []
+        for task in tasks:
+            self.tasks[task.id] = task
+            task.listener = listener
+            if task.completed:
+                self.completed_ids.add(task.id)
+            elif task.due_timestamp is not None:
+                due_entries.append((task.due_timestamp, task.id))
+            self.priority_ids[task.priority].add(task.id)
+            if task.recurrence is not None:
+                self.recurring_ids.add(task.id)
+            if task.category:
+                self._index_category(task.id, task.category)
+        self.trends.add_many(tasks)
+        return due_entries
+    
+    def load_store(self, progress=None):
+        # Loads every stored task and sorts them for the current sort setting. Safe to
+        # run on a worker thread as long as nothing else uses the manager until it returns.
+        with gc_paused():
+            tasks = self.store.read_tasks(progress)
+            self.load_tasks(tasks)
+        self.get_sort_index(self.settings["sort_by"])
+        return tasks
+    
+    def _save_change(self, event, task_id):
+        if event == "removed":
+            self.store.delete(task_id)
+        elif event == "bulk_removed":
+            self.store.delete_all(task_id)
+        elif event in ("bulk_inserted", "bulk_updated"):
+            self.store.save_all([self.tasks[changed_id] for changed_id in task_id])
+        elif event != "overdue":
+            self.store.save(self.tasks[task_id])
     
     def add_task(self, task):
         task.id = self.next_id
         self.next_id += 1
-        self.tasks.append(task)
+        self.tasks[task.id] = task
+        self._index_task(task.id, task.completed, task.priority, task.due_timestamp)
+        self._index_recurrence(task)
+        self._index_category(task.id, task.category)
+        self.trends.add(task)
+        for index in self.sort_indexes.values():
+            index.add(task)
+        if self.search_index is not None:
+            self.search_index.add(task.id, task.title, task.description)
+        if self.search_backlog is not None:
+            self.search_backlog.setdefault(task.id, None)
+        task.listener = self._task_listener
+        if self.undo_stack is not None:
+            self.undo_stack.record_added([task])
+        self._emit("inserted", task.id)
         return task.id
     
+    def bulk_add(self, tasks):
+        # Adds many tasks with one "bulk_inserted" event per BULK_ADD_CHUNK of them, so an
+        # iterator such as a file being imported is never held in memory whole. The chunks
+        # are one undo step, and an iterator that fails leaves nothing added.
+        tasks = iter(tasks)
+        task_ids = []
+        undo_stack, self.undo_stack = self.undo_stack, None
+        try:
+            while chunk := list(islice(tasks, BULK_ADD_CHUNK)):
+                task_ids += self._add_chunk(chunk)
+        except BaseException:
+            self.bulk_remove(task_ids)
+            raise
+        finally:
+            self.undo_stack = undo_stack
+        if undo_stack is not None:
+            undo_stack.record_added([self.tasks[task_id] for task_id in task_ids])
+        return task_ids
+    
+    def _add_chunk(self, tasks):
+        task_ids = list(range(self.next_id, self.next_id + len(tasks)))
+        for task_id, task in zip(task_ids, tasks):
+            task.id = task_id
+        self.next_id += len(tasks)
+        
+        with gc_paused():
+            due_entries = self._insert_all(tasks)
+        self.due_index = update_sorted(self.due_index, added=due_entries)
+        for index in self.sort_indexes.values():
+            index.add_many(tasks)
+        if self.search_index is not None:
+            self.search_index.build((task.id, task.title, task.description) for task in tasks)
+        if self.search_backlog is not None:
+            self.search_backlog.update(dict.fromkeys(task_ids))
+        self._emit("bulk_inserted", task_ids)
+        return task_ids
+    
+    def restore_tasks(self, tasks):
+        # Puts removed tasks back under their own ids, with one "bulk_inserted" event
+        if not tasks:
+            return []
+        tasks = sorted(tasks, key=attrgetter("id"))
+        # Tasks keep id order: the ones with higher ids than the first restored task
+        # are moved behind it, so restoring recent tasks only touches those
+        later_ids = []
+        for task_id in reversed(self.tasks):
+            if task_id < tasks[0].id:
+                break
+            later_ids.append(task_id)
+        due_entries = self._insert_all(tasks)
+        if later_ids:
+            for task_id in merge(reversed(later_ids), (task.id for task in tasks)):
+                self.tasks[task_id] = self.tasks.pop(task_id)
+        self.due_index = update_sorted(self.due_index, added=due_entries)
+        self.next_id = max(self.next_id, tasks[-1].id + 1)
+        for index in self.sort_indexes.values():
+            index.add_many(tasks)
+        if self.search_index is not None:
+            if len(tasks) > BULK_CHANGES:
+                self.search_index.build((task.id, task.title, task.description) for task in tasks)
+            else:
+                for task in tasks:
+                    self.search_index.add(task.id, task.title, task.description)
+        if self.search_backlog is not None:
+            self.search_backlog.update(dict.fromkeys(task.id for task in tasks))
+        
+        if self.undo_stack is not None:
+            self.undo_stack.record_added(tasks)
+        task_ids = [task.id for task in tasks]
+        self._emit("bulk_inserted", task_ids)
+        return task_ids
+    
+    def bulk_remove(self, task_ids):
+        # Removes many tasks with one "bulk_removed" event; returns the removed tasks
+        tasks = [self.tasks.pop(task_id) for task_id in task_ids if task_id in self.tasks]
+        due_removed = []
+        for task in tasks:
+            if task.completed:
+                self.completed_ids.discard(task.id)
+            elif task.due_timestamp is not None:
+                due_removed.append((task.due_timestamp, task.id))
+            self.priority_ids[task.priority].discard(task.id)
+            self.recurring_ids.discard(task.id)
+            self._unindex_category(task.id, task.category)
+            self.trends.remove(task, task.due_timestamp, task.completed)
+            if self.search_index is not None:
+                self.search_index.remove(task.id, task.title, task.description)
+            if self.search_backlog is not None:
+                self.search_backlog.setdefault(task.id, (task.title, task.description))
+            task.listener = None
+        self.due_index = update_sorted(self.due_index, removed=due_removed)
+        task_ids = [task.id for task in tasks]
+        for index in self.sort_indexes.values():
+            index.remove_many(task_ids)
+        
+        if self.undo_stack is not None:
+            self.undo_stack.record_removed(tasks)
+        self._emit("bulk_removed", task_ids)
+        return tasks
+    
+    def bulk_set(self, changes):
+        # changes: task id -> {field: value}, set with Task.assign. One "bulk_updated"
+        # event, and each sorted index is updated once for all the tasks.
+        tasks, updates, due_removed, due_added = [], [], [], []
+        for task_id, values in changes.items():
+            task = self.tasks.get(task_id)
+            if task is None:
+                continue
+            old_due_entry = self._due_entry(task)
+            old_completed, old_priority, old_due = task.completed, task.priority, task.due_timestamp
+            old_category = task.category
+            old_values = task.assign(**values)
+            if task.completed != old_completed or task.due_timestamp != old_due:
+                self.trends.update(task, old_due, old_completed)
+            if task.completed != old_completed:
+                if task.completed:
+                    self.completed_ids.add(task_id)
+                else:
+                    self.completed_ids.discard(task_id)
+            if task.priority != old_priority:
+                self.priority_ids[old_priority].discard(task_id)
+                self.priority_ids[task.priority].add(task_id)
+            self._index_recurrence(task)
+            if task.category != old_category:
+                self._unindex_category(task_id, old_category)
+                self._index_category(task_id, task.category)
+            due_entry = self._due_entry(task)
+            if due_entry != old_due_entry:
+                if old_due_entry is not None:
+                    due_removed.append(old_due_entry)
+                if due_entry is not None:
+                    due_added.append(due_entry)
+            self._reindex_text(task, old_values)
+            updates.append((task, old_values))
+            tasks.append(task)
+        self.due_index = update_sorted(self.due_index, due_removed, due_added)
+        for index in self.sort_indexes.values():
+            index.update_many(tasks)
+        
+        if self.undo_stack is not None:
+            self.undo_stack.record_updated(updates)
+        task_ids = [task.id for task in tasks]
+        self._emit("bulk_updated", task_ids)
+        return task_ids
+    
+    def _due_entry(self, task):
+        # The task's entry in the due index, if it has one
+        if task.completed or task.due_timestamp is None:
+            return None
+        return (task.due_timestamp, task.id)
+    
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+    
+    def _emit(self, event, task_id):
+        for listener in self.listeners:
+            listener(event, task_id)
+    
+    def _index_task(self, task_id, completed, priority, due_timestamp):
+        if completed:
+            self.completed_ids.add(task_id)
+        elif due_timestamp is not None:
+            insort(self.due_index, (due_timestamp, task_id))
+        self.priority_ids[priority].add(task_id)
+    
+    def _unindex_task(self, task_id, completed, priority, due_timestamp):
+        if completed:
+            self.completed_ids.discard(task_id)
+        elif due_timestamp is not None:
+            position = bisect_left(self.due_index, (due_timestamp, task_id))
+            del self.due_index[position]
+        self.priority_ids[priority].discard(task_id)
+    
+    def _index_recurrence(self, task):
+        if task.recurrence is not None:
+            self.recurring_ids.add(task.id)
+        else:
+            self.recurring_ids.discard(task.id)
+    
+    def _index_category(self, task_id, category):
+        # A task may bring a category that is not listed yet, e.g. from an import
+        if category:
+            self.category_ids.setdefault(category, set()).add(task_id)
+    
+    def _unindex_category(self, task_id, category):
+        task_ids = self.category_ids.get(category)
+        if task_ids is not None:
+            task_ids.discard(task_id)
+    
+    def _on_task_changed(self, task, old_values):
+        if {"completed", "priority", "due_date"} & old_values.keys():
+            if "due_date" in old_values:
+                old_due = old_values["due_date"] and to_timestamp(old_values["due_date"])
+            else:
+                old_due = task.due_timestamp
+            old_completed = old_values.get("completed", task.completed)
+            self._unindex_task(task.id, old_completed, old_values.get("priority", task.priority), old_due)
+            self._index_task(task.id, task.completed, task.priority, task.due_timestamp)
+            self.trends.update(task, old_due, old_completed)
+        if "recurrence" in old_values:
+            self._index_recurrence(task)
+        if "category" in old_values:
+            self._unindex_category(task.id, old_values["category"])
+            self._index_category(task.id, task.category)
+        for index in self.sort_indexes.values():
+            index.update(task)
+        self._reindex_text(task, old_values)
+        if self.undo_stack is not None:
+            self.undo_stack.record_updated([(task, old_values)])
+        self._emit("updated", task.id)
+    
+    def _reindex_text(self, task, old_values):
+        if {"title", "description"} & old_values.keys():
+            old_text = (old_values.get("title", task.title), old_values.get("description", task.description))
+            if self.search_index is not None:
+                self.search_index.remove(task.id, *old_text)
+                self.search_index.add(task.id, task.title, task.description)
+            if self.search_backlog is not None:
+                self.search_backlog.setdefault(task.id, old_text)
+    
     def get_task_by_id(self, task_id):
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
+        return self.tasks.get(task_id)
     
     def update_task(self, task_id, **kwargs):
         task = self.get_task_by_id(task_id)
@@ -34,9 +387,22 @@ class TaskManager:
         return False
     
     def delete_task(self, task_id):
-        task = self.get_task_by_id(task_id)
+        task = self.tasks.pop(task_id, None)
         if task:
-            self.tasks.remove(task)
+            self._unindex_task(task_id, task.completed, task.priority, task.due_timestamp)
+            self.recurring_ids.discard(task_id)
+            self._unindex_category(task_id, task.category)
+            self.trends.remove(task, task.due_timestamp, task.completed)
+            for index in self.sort_indexes.values():
+                index.remove(task_id)
+            if self.search_index is not None:
+                self.search_index.remove(task_id, task.title, task.description)
+            if self.search_backlog is not None:
+                self.search_backlog.setdefault(task_id, (task.title, task.description))
+            task.listener = None
+            if self.undo_stack is not None:
+                self.undo_stack.record_removed([task])
+            self._emit("removed", task_id)
             return True
         return False
     
@@ -48,30 +414,207 @@ class TaskManager:
         return False
     
     def get_all_tasks(self):
-        return self.tasks.copy()
+        return list(self.tasks.values())
     
     def get_pending_tasks(self):
-        return [task for task in self.tasks if not task.completed]
+        return [task for task in self.tasks.values() if not task.completed]
     
     def get_completed_tasks(self):
-        return [task for task in self.tasks if task.completed]
+        return [task for task in self.tasks.values() if task.completed]
     
     def get_tasks_by_priority(self, priority):
-        return [task for task in self.tasks if task.priority == priority]
+        return [task for task in self.tasks.values() if task.priority == priority]
+    
+    def is_overdue(self, task):
+        return (not task.completed and task.due_timestamp is not None
+                and task.due_timestamp < self.overdue_checked_at)
+    
+    def refresh_overdue(self, now=None):
+        # Emits "overdue" for the pending tasks that fell due since the last check
+        now = to_timestamp(now) if now is not None else now_timestamp()
+        if now <= self.overdue_checked_at:
+            return []
+        start = bisect_left(self.due_index, (self.overdue_checked_at,))
+        end = bisect_left(self.due_index, (now,))
+        self.overdue_checked_at = now
+        task_ids = [task_id for _, task_id in self.due_index[start:end]]
+        for task_id in task_ids:
+            self._emit("overdue", task_id)
+        return task_ids
+    
+    def next_overdue_deadline(self):
+        # Due date of the next pending task to become overdue, or None
+        position = bisect_left(self.due_index, (self.overdue_checked_at,))
+        if position < len(self.due_index):
+            return from_timestamp(self.due_index[position][0])
+        return None
+    
+    def count_overdue_tasks(self):
+        # Pending tasks due before the last check form a prefix of the due index
+        self.refresh_overdue()
+        return bisect_left(self.due_index, (self.overdue_checked_at,))
+    
+    def count_overdue_occurrences(self):
+        # Overdue tasks, with a repeating one counted once for every occurrence it missed.
+        # The missed ones are counted from the rule, so a daily task left undone for a
+        # year costs no more than one left undone since yesterday.
+        overdue = self.count_overdue_tasks()
+        checked_at = from_timestamp(self.overdue_checked_at)
+        for task_id in self.recurring_ids:
+            task = self.tasks[task_id]
+            if self.is_overdue(task):
+                overdue += task.recurrence.count_between(task.due_date + INSTANT, checked_at)
+        return overdue
+    
+    def get_occurrences(self, start, end):
+        # Lazily yields (due date, task) for the pending occurrences from start to before
+        # end, in time order. Repeating tasks are expanded within the window only.
+        start_timestamp, end_timestamp = to_timestamp(start), to_timestamp(end)
+        single = ((from_timestamp(due), task_id) for due, task_id in
+                  self.due_index[bisect_left(self.due_index, (start_timestamp,)):
+                                 bisect_left(self.due_index, (end_timestamp,))]
+                  if task_id not in self.recurring_ids)
+        series = []
+        for task_id in self.recurring_ids:
+            task = self.tasks[task_id]
+            if not task.completed and task.due_timestamp is not None and task.due_timestamp < end_timestamp:
+                # Occurrences before the task's due date are done
+                occurrences = task.recurrence.occurrences(max(start, task.due_date), end)
+                series.append((moment, task_id) for moment in occurrences)
+        for moment, task_id in merge(single, *series):
+            yield moment, self.tasks[task_id]
     
     def get_overdue_tasks(self):
-        today = datetime.now()
-        return [task for task in self.tasks 
-                if task.due_date and task.due_date < today and not task.completed]
+        overdue_ids = sorted(task_id for _, task_id in self.due_index[:self.count_overdue_tasks()])
+        return [self.tasks[task_id] for task_id in overdue_ids]
+    
+    def get_sort_index(self, sort_by):
+        index = self.sort_indexes.get(sort_by)
+        if index is None:
+            # Sorted once on first use, then kept up to date by every change
+            index = SortedIndex(SORT_KEYS[sort_by], self.tasks.values())
+            self.sort_indexes[sort_by] = index
+        return index
+    
+    def get_filter_ids(self, filter_name):
+        # Ids accepted by a filter, or None when every task is accepted
+        if filter_name == "Pending":
+            return self.tasks.keys() - self.completed_ids
+        if filter_name == "Completed":
+            return self.completed_ids
+        if filter_name == "High Priority":
+            return self.priority_ids[Priority.HIGH]
+        if filter_name == "Medium Priority":
+            return self.priority_ids[Priority.MEDIUM]
+        if filter_name == "Low Priority":
+            return self.priority_ids[Priority.LOW]
+        if filter_name == "Overdue":
+            return {task_id for _, task_id in self.due_index[:self.count_overdue_tasks()]}
+        if filter_name == "Repeating":
+            return self.recurring_ids
+        return None
+    
+    def get_sorted_entries(self, sort_by, filter_name="All", category=None):
+        # (sort key, task id) pairs of the tasks that pass the filter, in sort order.
+        # category: only tasks of that category, "" for those without one, None for all.
+        index = self.get_sort_index(sort_by)
+        if category is not None:
+            task_ids = self.category_ids.get(category, set()) if category else None
+            if task_ids is not None and len(task_ids) * CATEGORY_SORT_SHARE < len(index):
+                # A small category: sorting its own entries beats scanning everyone's
+                if filter_name == "Overdue":
+                    self.refresh_overdue()
+                return sorted((index.keys[task_id], task_id) for task_id in task_ids
+                              if self.matches_filter(self.tasks[task_id], filter_name))
+            entries = self.get_sorted_entries(sort_by, filter_name)
+            if task_ids is not None:
+                return [entry for entry in entries if entry[1] in task_ids]
+            tasks = self.tasks
+            return [entry for entry in entries if not tasks[entry[1]].category]
+        entries = index.entries
+        if filter_name == "Pending":
+            # Cheaper than building the set of pending ids
+            return [entry for entry in entries if entry[1] not in self.completed_ids]
+        task_ids = self.get_filter_ids(filter_name)
+        if task_ids is None:
+            return list(entries)
+        return [entry for entry in entries if entry[1] in task_ids]
+    
+    def get_search_index(self):
+        if self.search_index is None:
+            if self.store is not None:
+                # Read the texts in one query instead of loading each description
+                self.store.flush()
+                self.search_index = SearchIndex().build(self.store.open_texts())
+            else:
+                self.search_index = SearchIndex().build((task.id, task.title, task.description)
+                                                        for task in self.tasks.values())
+        return self.search_index
+    
+    def start_search_index_build(self):
+        # Documents to build a SearchIndex from on a worker thread, and their count.
+        # Text changes made until finish_search_index_build are replayed there.
+        if self.store is not None:
+            self.store.flush()
+            self.search_backlog = {}
+            return self.store.open_texts(), len(self.tasks)
+        self.search_backlog = {}
+        documents = [(task.id, task.title, task.description) for task in self.tasks.values()]
+        return documents, len(documents)
+    
+    def finish_search_index_build(self, index):
+        for task_id, old_text in self.search_backlog.items():
+            if old_text is not None:
+                index.remove(task_id, *old_text)
+            task = self.tasks.get(task_id)
+            if task is not None:
+                index.add(task_id, task.title, task.description)
+        self.search_backlog = None
+        self.search_index = index
+    
+    def cancel_search_index_build(self):
+        self.search_backlog = None
+    
+    def export_snapshot(self):
+        # Tasks to export on a worker thread, with their descriptions, and their count
+        if self.store is not None:
+            self.store.flush()
+            return map(Task.from_record, self.store.open_records()), len(self.tasks)
+        return list(self.tasks.values()), len(self.tasks)
+    
+    def search(self, query, filter_name="All", limit=None, category=None):
+        # Ids of the tasks matching query within a filter and category, best match first
+        if filter_name == "Pending":
+            accepts = lambda task_id: task_id not in self.completed_ids
+        else:
+            task_ids = self.get_filter_ids(filter_name)
+            accepts = None if task_ids is None else task_ids.__contains__
+        if category is not None:
+            if category:
+                in_category = self.category_ids.get(category, set()).__contains__
+            else:
+                in_category = lambda task_id: not self.tasks[task_id].category
+            accepts = in_category if accepts is None else (
+                lambda task_id, accepts=accepts: in_category(task_id) and accepts(task_id))
+        return self.get_search_index().search(query, limit, accepts)
+    
+    def matches_filter(self, task, filter_name, category=None):
+        if category is not None and task.category != category:
+            return False
+        if filter_name == "Overdue":
+            return self.is_overdue(task)
+        accepts = FILTERS.get(filter_name)
+        return accepts is None or accepts(task)
     
     def get_tasks_stats(self):
         total = len(self.tasks)
-        completed = len(self.get_completed_tasks())
+        completed = len(self.completed_ids)
         pending = total - completed
-        high_priority = len(self.get_tasks_by_priority(Priority.HIGH))
-        medium_priority = len(self.get_tasks_by_priority(Priority.MEDIUM))
-        low_priority = len(self.get_tasks_by_priority(Priority.LOW))
-        overdue = len(self.get_overdue_tasks())
+        high_priority = len(self.priority_ids[Priority.HIGH])
+        medium_priority = len(self.priority_ids[Priority.MEDIUM])
+        low_priority = len(self.priority_ids[Priority.LOW])
+        overdue = self.count_overdue_tasks()
+        overdue_occurrences = self.count_overdue_occurrences()
         
         return {
             "total": total,
@@ -81,7 +624,37 @@ class TaskManager:
             "medium_priority": medium_priority,
             "low_priority": low_priority,
             "overdue": overdue,
-            "completion_rate": (completed / total) * 100 if total > 0 else 0
+            "overdue_occurrences": overdue_occurrences,
+            "completion_rate": (completed / total) * 100 if total > 0 else 0,
+            # A year of daily counts, read from the trend buckets
+            "history": self.trends.history()
+        }
+    
+    def recompute_tasks_stats(self):
+        # Full-scan version of get_tasks_stats, used to check the aggregates
+        today = now_timestamp()
+        tasks = list(self.tasks.values())
+        overdue = [task for task in tasks
+                   if task.due_timestamp and task.due_timestamp < today and not task.completed]
+        total = len(tasks)
+        completed = sum(1 for task in tasks if task.completed)
+        trends = TaskTrends()
+        trends.add_many(tasks)
+        return {
+            "total": total,
+            "completed": completed,
+            "pending": total - completed,
+            "high_priority": sum(1 for task in tasks if task.priority == Priority.HIGH),
+            "medium_priority": sum(1 for task in tasks if task.priority == Priority.MEDIUM),
+            "low_priority": sum(1 for task in tasks if task.priority == Priority.LOW),
+            "overdue": len(overdue),
+            # Missed occurrences enumerated one by one
+            "overdue_occurrences": sum(
+                1 if task.recurrence is None else
+                1 + sum(1 for _ in task.recurrence.occurrences(task.due_date + INSTANT, from_timestamp(today)))
+                for task in overdue),
+            "completion_rate": (completed / total) * 100 if total > 0 else 0,
+            "history": trends.history()
         }
     
     def update_setting(self, key, value):
@@ -93,14 +666,31 @@ class TaskManager:
     def get_setting(self, key):
         return self.settings.get(key)
     
+    @property
+    def categories(self):
+        return list(self.category_ids)
+    
+    def category_counts(self):
+        # Tasks per category, and under "" those without one; read from the index sizes
+        counts = {category: len(task_ids) for category, task_ids in self.category_ids.items()}
+        counts[""] = len(self.tasks) - sum(counts.values())
+        return counts
+    
     def add_category(self, category):
-        if category not in self.categories:
-            self.categories.append(category)
+        if category and category not in self.category_ids:
+            self.category_ids[category] = set()
             return True
         return False
     
-    def remove_category(self, category):
-        if category in self.categories:
-            self.categories.remove(category)
-            return True
-        return False 
\ No newline at end of file
+    def remove_category(self, category, merge_into=""):
+        # Deletes a category; its tasks move to merge_into, or to no category, as one
+        # bulk change (so also one step to undo, which brings the category back)
+        if merge_into == category:
+            return False
+        task_ids = self.category_ids.pop(category, None)
+        if task_ids is None:
+            return False
+        self.add_category(merge_into)
+        if task_ids:
+            self.bulk_set({task_id: {"category": merge_into} for task_id in task_ids})
+        return True 
\ No newline at end of file
@@ -0,0 +1,208 @@
+import queue
+import sqlite3
+import threading
+import time
+from src.models.task import Task
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    due_date REAL,
+    priority INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    recurrence TEXT,
+    category TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+CREATE INDEX IF NOT EXISTS tasks_completed ON tasks (completed);
+CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority);
+"""
+
+# Columns added since the table was first created, with their definitions
+ADDED_COLUMNS = {"recurrence": "TEXT", "category": "TEXT NOT NULL DEFAULT ''"}
+
+# A description of NULL means "not loaded", so the stored one is kept
+SAVE_SQL = """
+INSERT INTO tasks (id, title, description, due_date, priority, completed, created_at, updated_at, recurrence, category)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    title = excluded.title,
+    description = COALESCE(excluded.description, tasks.description),
+    due_date = excluded.due_date,
+    priority = excluded.priority,
+    completed = excluded.completed,
+    updated_at = excluded.updated_at,
+    recurrence = excluded.recurrence,
+    category = excluded.category
+"""
+
+DELETE_SQL = "DELETE FROM tasks WHERE id = ?"
+
+# Everything the task table needs; descriptions are fetched when first read
+LOAD_SQL = ("SELECT id, title, NULL, due_date, priority, completed, created_at, updated_at, recurrence, category "
+            "FROM tasks ORDER BY id")
+
+TEXTS_SQL = "SELECT id, title, COALESCE(description, '') FROM tasks"
+
+RECORDS_SQL = ("SELECT id, title, COALESCE(description, ''), due_date, priority, completed, created_at, updated_at, "
+               "recurrence, category FROM tasks ORDER BY id")
+
+
+class StoreError(Exception):
+    pass
+
+
+def _rows(connection, cursor):
+    # Closes the connection once the rows are consumed, or when a reader that
+    # stops early drops the generator
+    try:
+        yield from cursor
+    finally:
+        connection.close()
+
+
+class TaskStore:
+    def __init__(self, path, batch_size=1000, flush_interval=0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval  # how long the writer waits to fill a batch
+
+        self.connection = self._connect()
+        self.connection.executescript(SCHEMA)
+        # Databases made by earlier versions lack the columns added since
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(tasks)")}
+        with self.connection:
+            for name, definition in ADDED_COLUMNS.items():
+                if name not in columns:
+                    self.connection.execute(f"ALTER TABLE tasks ADD COLUMN {name} {definition}")
+
+        # Writes are queued and committed in batches by a background thread
+        self._queue = queue.Queue()
+        self._error = None  # first failed batch since the last flush, raised by flush
+        self._writer = threading.Thread(target=self._run_writer, name="TaskStoreWriter", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only syncs at checkpoints instead of on every commit
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def load_tasks(self):
+        loader = self.load_description
+        for record in self.connection.execute(LOAD_SQL):
+            task = Task.from_record(record)
+            task.description_loader = loader
+            yield task
+
+    def read_tasks(self, progress=None):
+        # Same as load_tasks but on a connection of its own, so it can run on a worker thread
+        connection = self._connect()
+        try:
+            total = connection.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            loader = self.load_description
+            tasks = []
+            for record in connection.execute(LOAD_SQL):
+                task = Task.from_record(record)
+                task.description_loader = loader
+                tasks.append(task)
+                if progress is not None and len(tasks) % 10_000 == 0:
+                    progress(len(tasks), total)
+            return tasks
+        finally:
+            connection.close()
+
+    def open_texts(self):
+        # (id, title, description) rows as committed right now: executing the query
+        # starts the read, and the rows may then be consumed on another thread
+        return self._open_rows(TEXTS_SQL)
+
+    def open_records(self):
+        # Full task records, descriptions included, in the same way as open_texts
+        return self._open_rows(RECORDS_SQL)
+
+    def _open_rows(self, sql):
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            cursor = connection.execute(sql)
+        except BaseException:
+            connection.close()
+            raise
+        return _rows(connection, cursor)
+
+    def load_description(self, task_id):
+        row = self.connection.execute("SELECT description FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return row[0] if row and row[0] is not None else ""
+
+    def save(self, task):
+        self._queue.put(("save", [task.to_record()]))
+
+    def save_all(self, tasks):
+        # The records are made here, as for save: the tasks may change on this
+        # thread while the writer stores them
+        self._queue.put(("save", [task.to_record() for task in tasks]))
+
+    def delete(self, task_id):
+        self._queue.put(("delete", [(task_id,)]))
+
+    def delete_all(self, task_ids):
+        self._queue.put(("delete", [(task_id,) for task_id in task_ids]))
+
+    def flush(self):
+        # Blocks until every queued write has been committed or has failed; raises
+        # StoreError if any of them failed since the last flush
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self.connection.close()
+        self._raise_error()
+
+    def _raise_error(self):
+        error, self._error = self._error, None
+        if error is not None:
+            raise StoreError(f"Saving tasks failed: {error}") from error
+
+    def _run_writer(self):
+        connection = self._connect()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            if batch[-1] is None:
+                running = False
+
+            # One transaction, and so one commit, per batch; a failed batch is rolled
+            # back, and the writer carries on so that flush and close still return
+            try:
+                with connection:
+                    for operation in batch:
+                        if operation is None:
+                            continue
+                        kind, rows = operation
+                        connection.executemany(SAVE_SQL if kind == "save" else DELETE_SQL, rows)
+            except Exception as error:
+                if self._error is None:
+                    self._error = error
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        connection.close()
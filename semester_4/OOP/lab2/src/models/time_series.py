@@ -0,0 +1,104 @@
+from collections import Counter
+from datetime import date, timedelta
+
+
+HOUR = 3_600_000_000  # microseconds
+
+
+class TaskTrends:
+    # Tasks per day as counters that follow every change, so a year of history is
+    # read from at most 365 buckets per series instead of from the tasks:
+    #   created           day the task was created
+    #   completed         day the task was completed
+    #   overdue_started   due day of tasks that were still pending at the end of it
+    #   overdue_ended     day such a task was completed
+    # The overdue backlog at the end of a day is the running sum of started minus ended.
+
+    def __init__(self):
+        self.created = Counter()
+        self.completed = Counter()
+        self.overdue_started = Counter()
+        self.overdue_ended = Counter()
+        # Completed task id -> day it was completed. Tasks loaded as completed count
+        # from their last update, as the completion time itself is not stored.
+        self.completion_days = {}
+        self._hour_days = {}  # hour since the epoch -> local day; with DST it is not a plain division
+
+    def day_of(self, timestamp):
+        hour = timestamp // HOUR
+        day = self._hour_days.get(hour)
+        if day is None:
+            day = self._hour_days[hour] = date.fromtimestamp(hour * 3600).toordinal()
+        return day
+
+    def add(self, task, completion_day=None):
+        self.created[self.day_of(task.created_timestamp)] += 1
+        if not task.completed:
+            completion_day = None
+        else:
+            if completion_day is None:
+                completion_day = self.day_of(task.updated_timestamp)
+            self.completion_days[task.id] = completion_day
+            self.completed[completion_day] += 1
+        self._count_overdue(task.due_timestamp, completion_day, 1)
+
+    def add_many(self, tasks):
+        # Same as add for each task, but counted by hour first, so that most tasks
+        # cost a division and a counter update
+        self._count_hours(self.created, Counter(task.created_timestamp // HOUR for task in tasks))
+        self._count_hours(self.overdue_started, Counter(
+            task.due_timestamp // HOUR for task in tasks if not task.completed and task.due_timestamp is not None))
+        day_of = self.day_of
+        for task in tasks:
+            if task.completed:
+                completion_day = self.completion_days[task.id] = day_of(task.updated_timestamp)
+                self.completed[completion_day] += 1
+                self._count_overdue(task.due_timestamp, completion_day, 1)
+
+    def _count_hours(self, counter, hours):
+        for hour, count in hours.items():
+            counter[self.day_of(hour * HOUR)] += count
+
+    def remove(self, task, due_timestamp, completed):
+        # due_timestamp and completed as they were when the task was counted
+        self.created[self.day_of(task.created_timestamp)] -= 1
+        completion_day = None
+        if completed:
+            completion_day = self.completion_days.pop(task.id)
+            self.completed[completion_day] -= 1
+        self._count_overdue(due_timestamp, completion_day, -1)
+
+    def update(self, task, old_due_timestamp, old_completed):
+        # A task that stays completed keeps its completion day
+        completion_day = self.completion_days.get(task.id)
+        self.remove(task, old_due_timestamp, old_completed)
+        self.add(task, completion_day if old_completed else None)
+
+    def _count_overdue(self, due_timestamp, completion_day, sign):
+        if due_timestamp is None:
+            return
+        due_day = self.day_of(due_timestamp)
+        if completion_day is None:
+            self.overdue_started[due_day] += sign
+        elif completion_day > due_day:
+            self.overdue_started[due_day] += sign
+            self.overdue_ended[completion_day] += sign
+
+    def history(self, last_day=None, days=365):
+        # Per day series for the days up to last_day (a date, today by default)
+        last = (last_day or date.today()).toordinal()
+        first = last - days + 1
+        # The backlog includes everything that fell overdue before the first day
+        backlog = sum(count for day, count in self.overdue_started.items() if day < first)
+        backlog -= sum(count for day, count in self.overdue_ended.items() if day < first)
+        overdue = []
+        for day in range(first, last + 1):
+            backlog += self.overdue_started[day] - self.overdue_ended[day]
+            overdue.append(backlog)
+        return {
+            "days": [date.fromordinal(first) + timedelta(days=offset) for offset in range(days)],
+            "created": [self.created[day] for day in range(first, last + 1)],
+            "completed": [self.completed[day] for day in range(first, last + 1)],
+            "overdue_started": [self.overdue_started[day] for day in range(first, last + 1)],
+            "overdue": overdue,
+        }
@@ -0,0 +1,180 @@
+from collections import deque
+from src.models.task import to_timestamp
+
+
+# Rough sizes in bytes, for the memory limit; text is counted on top
+TASK_SIZE = 300  # a task that only the stack keeps alive
+ID_SIZE = 8  # an id of a task that the manager keeps alive
+FIELD_SIZE = 150  # one changed field, with its old and new value
+
+
+def _tasks_size(tasks):
+    return sum(TASK_SIZE + len(task.title) + len(task._description or "") for task in tasks)
+
+
+def _count(number, noun):
+    return f"{noun}" if number == 1 else f"{number} {noun}s"
+
+
+class AddTasks:
+    def __init__(self, tasks):
+        self.task_ids = [task.id for task in tasks]
+        self.tasks = None  # the removed tasks while undone, for redo
+
+    @property
+    def label(self):
+        return "Add " + _count(len(self.task_ids), "Task")
+
+    def size(self):
+        return ID_SIZE * len(self.task_ids) + (_tasks_size(self.tasks) if self.tasks else 0)
+
+    def undo(self, task_manager):
+        self.tasks = task_manager.bulk_remove(self.task_ids)
+
+    def redo(self, task_manager):
+        task_manager.restore_tasks(self.tasks)
+        self.tasks = None
+
+
+class RemoveTasks:
+    def __init__(self, tasks):
+        self.tasks = tasks
+        for task in tasks:
+            # Read now, storage drops its copy with the task
+            task.description
+
+    @property
+    def label(self):
+        return "Delete " + _count(len(self.tasks), "Task")
+
+    def size(self):
+        return _tasks_size(self.tasks)
+
+    def undo(self, task_manager):
+        task_manager.restore_tasks(self.tasks)
+
+    def redo(self, task_manager):
+        task_manager.bulk_remove([task.id for task in self.tasks])
+
+
+class UpdateTasks:
+    def __init__(self, changes):
+        self.changes = changes  # task id -> {field: (old value, new value)}
+
+    @property
+    def label(self):
+        only_completed = all(fields.keys() == {"completed"} for fields in self.changes.values())
+        return ("Complete " if only_completed else "Edit ") + _count(len(self.changes), "Task")
+
+    def size(self):
+        size = ID_SIZE * len(self.changes)
+        for fields in self.changes.values():
+            for old, new in fields.values():
+                size += FIELD_SIZE
+                if isinstance(old, str):
+                    size += len(old) + len(new)
+        return size
+
+    def _set(self, task_manager, position):
+        task_manager.bulk_set({task_id: {field: values[position] for field, values in fields.items()}
+                               for task_id, fields in self.changes.items()})
+
+    def undo(self, task_manager):
+        self._set(task_manager, 0)
+
+    def redo(self, task_manager):
+        self._set(task_manager, 1)
+
+
+class UndoStack:
+    MEMORY_LIMIT = 64 * 2 ** 20  # bytes, estimated
+
+    def __init__(self, task_manager, memory_limit=MEMORY_LIMIT):
+        # Records the changes of task_manager as field-level deltas. Bulk operations are
+        # one command each, undone and redone with the manager's bulk methods.
+        self.task_manager = task_manager
+        self.memory_limit = memory_limit
+        self.undo_commands = deque()  # (command, size), newest last
+        self.redo_commands = []  # (command, size), next to redo last
+        self.size = 0
+        self._applying = False  # changes made by undo and redo are not recorded
+        task_manager.undo_stack = self
+
+    def record_added(self, tasks):
+        if not self._applying and tasks:
+            self._push(AddTasks(tasks))
+
+    def record_removed(self, tasks):
+        if not self._applying and tasks:
+            self._push(RemoveTasks(tasks))
+
+    def record_updated(self, updates):
+        # updates: (task, old values) pairs, as passed to the manager's task listener
+        if self._applying:
+            return
+        changes = {}
+        for task, old_values in updates:
+            fields = {}
+            for field, old in old_values.items():
+                if field == "due_date":
+                    field, old = "due_timestamp", to_timestamp(old) if old is not None else None
+                new = getattr(task, field)
+                if old != new:
+                    fields[field] = (old, new)
+            if fields:
+                changes[task.id] = fields
+        if changes:
+            self._push(UpdateTasks(changes))
+
+    def _push(self, command):
+        for _, size in self.redo_commands:
+            self.size -= size
+        self.redo_commands.clear()
+        self._add(self.undo_commands, command)
+        self._trim()
+
+    def _add(self, commands, command):
+        size = command.size()
+        commands.append((command, size))
+        self.size += size
+
+    def _trim(self):
+        # Oldest history goes first, then the redo steps furthest away;
+        # the next step to undo, or to redo if there is none, is always kept
+        while self.size > self.memory_limit and len(self.undo_commands) > 1:
+            self.size -= self.undo_commands.popleft()[1]
+        while self.size > self.memory_limit and len(self.redo_commands) > (0 if self.undo_commands else 1):
+            self.size -= self.redo_commands.pop(0)[1]
+
+    def _apply(self, source, target, method):
+        command, size = source.pop()
+        self.size -= size
+        self._applying = True
+        try:
+            getattr(command, method)(self.task_manager)
+        finally:
+            self._applying = False
+        self._add(target, command)
+        self._trim()
+        return command.label
+
+    def undo(self):
+        if self.undo_commands:
+            return self._apply(self.undo_commands, self.redo_commands, "undo")
+        return None
+
+    def redo(self):
+        if self.redo_commands:
+            return self._apply(self.redo_commands, self.undo_commands, "redo")
+        return None
+
+    def undo_label(self):
+        return self.undo_commands[-1][0].label if self.undo_commands else None
+
+    def redo_label(self):
+        return self.redo_commands[-1][0].label if self.redo_commands else None
+
+    def clear(self):
+        self.undo_commands.clear()
+        self.redo_commands.clear()
+        self.size = 0
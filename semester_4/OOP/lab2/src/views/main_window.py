@@ -1,15 +1,13 @@
+import os
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                          QPushButton, QLabel, QTableWidget, QTableWidgetItem,
+                          QPushButton, QLabel, QTableView, QAbstractItemView,
                           QHeaderView, QComboBox, QStatusBar, QToolBar, QMenu,
-                          QMenuBar, QDialog)
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QIcon, QAction, QColor, QFont
-from datetime import datetime
+                          QMenuBar, QDialog, QLineEdit, QProgressBar, QFileDialog)
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtGui import QIcon, QAction, QKeySequence
 
-from src.views.task_dialog import TaskDialog
-from src.views.settings_dialog import SettingsDialog
-from src.views.statistics_dialog import StatisticsDialog
-from src.models.task import Priority
+from src.views.task_table_model import TaskTableModel
+from src.views.task_proxy_model import TaskProxyModel
 
 
 class MainWindow(QMainWindow):
@@ -20,8 +18,17 @@ class MainWindow(QMainWindow):
     complete_task_requested = pyqtSignal(int)
     delete_task_requested = pyqtSignal(int)
     filter_changed = pyqtSignal(str)
+    category_changed = pyqtSignal()
+    search_changed = pyqtSignal(str)
     open_settings_requested = pyqtSignal()
     open_statistics_requested = pyqtSignal()
+    cancel_requested = pyqtSignal()
+    import_tasks_requested = pyqtSignal()
+    export_tasks_requested = pyqtSignal()
+    undo_requested = pyqtSignal()
+    redo_requested = pyqtSignal()
+    
+    TASK_FILE_FILTER = "CSV (*.csv);;JSON Lines (*.jsonl);;iCalendar (*.ics)"
     
     def __init__(self):
         super().__init__()
@@ -32,6 +39,10 @@ class MainWindow(QMainWindow):
         # Apply application-wide style
         self._apply_styles()
         
+        self.task_dialog = None
+        self.settings_dialog = None
+        self.statistics_dialog = None
+        
         self._create_menu_bar()
         self._create_toolbar()
         self._create_central_widget()
@@ -43,7 +54,7 @@ class MainWindow(QMainWindow):
             QMainWindow {
                 background-color: #e8eef7;
             }
-            QTableWidget {
+            QTableView {
                 gridline-color: #c0c0c0;
                 background-color: white;
                 border: 1px solid #c0c0c0;
@@ -52,16 +63,16 @@ class MainWindow(QMainWindow):
                 selection-color: #333333;
                 alternate-background-color: #f0f5ff;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 6px;
                 border-bottom: 1px solid #e0e0e0;
                 color: #1a1a1a;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #c0d8f0;
                 color: #000000;
             }
-            QTableWidget QHeaderView::section {
+            QTableView QHeaderView::section {
                 background-color: #dce6f5;
                 padding: 8px;
                 border: 1px solid #c0c0c0;
@@ -117,6 +128,14 @@ class MainWindow(QMainWindow):
         new_action.triggered.connect(self.add_task_requested.emit)
         file_menu.addAction(new_action)
         
+        import_action = QAction("&Import Tasks...", self)
+        import_action.triggered.connect(self.import_tasks_requested.emit)
+        file_menu.addAction(import_action)
+        
+        export_action = QAction("E&xport Tasks...", self)
+        export_action.triggered.connect(self.export_tasks_requested.emit)
+        file_menu.addAction(export_action)
+        
         exit_action = QAction("&Exit", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
@@ -124,6 +143,20 @@ class MainWindow(QMainWindow):
         # Edit menu
         edit_menu = self.menuBar().addMenu("&Edit")
         
+        self.undo_action = QAction("&Undo", self)
+        self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self.undo_action.setEnabled(False)
+        self.undo_action.triggered.connect(self.undo_requested.emit)
+        edit_menu.addAction(self.undo_action)
+        
+        self.redo_action = QAction("&Redo", self)
+        self.redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        self.redo_action.setEnabled(False)
+        self.redo_action.triggered.connect(self.redo_requested.emit)
+        edit_menu.addAction(self.redo_action)
+        
+        edit_menu.addSeparator()
+        
         settings_action = QAction("&Settings", self)
         settings_action.triggered.connect(self.open_settings_requested.emit)
         edit_menu.addAction(settings_action)
@@ -147,9 +180,28 @@ class MainWindow(QMainWindow):
         toolbar.addWidget(filter_label)
         
         self.filter_combo = QComboBox()
-        self.filter_combo.addItems(["All", "Pending", "Completed", "High Priority", "Medium Priority", "Low Priority", "Overdue"])
+        self.filter_combo.addItems(["All", "Pending", "Completed", "High Priority", "Medium Priority", "Low Priority", "Overdue", "Repeating"])
         self.filter_combo.currentTextChanged.connect(self.filter_changed.emit)
         toolbar.addWidget(self.filter_combo)
+        
+        category_label = QLabel("  Category: ")
+        toolbar.addWidget(category_label)
+        
+        # Filled in by update_categories; the item data is the category, None for all
+        self.category_combo = QComboBox()
+        self.category_combo.addItem("All Categories", None)
+        self.category_combo.currentIndexChanged.connect(self.category_changed.emit)
+        toolbar.addWidget(self.category_combo)
+        
+        search_label = QLabel("  Search: ")
+        toolbar.addWidget(search_label)
+        
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search titles and descriptions")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setMinimumWidth(240)
+        self.search_edit.textChanged.connect(self.search_changed.emit)
+        toolbar.addWidget(self.search_edit)
     
     def _create_central_widget(self):
         central_widget = QWidget()
@@ -160,15 +212,24 @@ class MainWindow(QMainWindow):
         main_layout.setContentsMargins(16, 16, 16, 16)
         main_layout.setSpacing(16)
         
-        # Task table
-        self.task_table = QTableWidget()
-        self.task_table.setColumnCount(5)
-        self.task_table.setHorizontalHeaderLabels(["ID", "Title", "Due Date", "Priority", "Status"])
-        self.task_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        # Task table; its models are attached in set_task_manager
+        self.task_model = None
+        self.task_proxy = None
+        self.task_table = QTableView()
+        
+        # Fixed column widths: sizing to contents would measure every row
+        header = self.task_table.horizontalHeader()
+        for column, width in enumerate([70, 0, 120, 110, 120, 120]):
+            if width:
+                header.setSectionResizeMode(column, QHeaderView.ResizeMode.Fixed)
+                header.resizeSection(column, width)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        
         self.task_table.verticalHeader().setVisible(False)
-        self.task_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.task_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.task_table.itemDoubleClicked.connect(self._on_item_double_clicked)
+        self.task_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.task_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.task_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.task_table.doubleClicked.connect(self._on_item_double_clicked)
         self.task_table.setAlternatingRowColors(True)
         self.task_table.setShowGrid(False)
         self.task_table.verticalHeader().setDefaultSectionSize(36)  # Increase row height
@@ -220,125 +281,156 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Ready")
+        
+        self.overdue_label = QLabel()
+        self.status_bar.addPermanentWidget(self.overdue_label)
+        
+        # Shown while a background job runs
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.hide()
+        self.status_bar.addPermanentWidget(self.progress_bar)
+        
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_requested.emit)
+        self.cancel_button.hide()
+        self.status_bar.addPermanentWidget(self.cancel_button)
     
-    def _on_item_double_clicked(self, item):
-        row = item.row()
-        task_id = int(self.task_table.item(row, 0).text())
-        self.edit_task_requested.emit(task_id)
-    
-    def _on_edit_clicked(self):
+    def _selected_task_id(self):
         selected_rows = self.task_table.selectionModel().selectedRows()
         if selected_rows:
-            row = selected_rows[0].row()
-            task_id = int(self.task_table.item(row, 0).text())
+            task = self.task_proxy.task_at(selected_rows[0].row())
+            if task:
+                return task.id
+        return None
+    
+    def _on_item_double_clicked(self, index):
+        task = self.task_proxy.task_at(index.row())
+        if task:
+            self.edit_task_requested.emit(task.id)
+    
+    def _on_edit_clicked(self):
+        task_id = self._selected_task_id()
+        if task_id is not None:
             self.edit_task_requested.emit(task_id)
     
     def _on_complete_clicked(self):
-        selected_rows = self.task_table.selectionModel().selectedRows()
-        if selected_rows:
-            row = selected_rows[0].row()
-            task_id = int(self.task_table.item(row, 0).text())
+        task_id = self._selected_task_id()
+        if task_id is not None:
             self.complete_task_requested.emit(task_id)
     
     def _on_delete_clicked(self):
-        selected_rows = self.task_table.selectionModel().selectedRows()
-        if selected_rows:
-            row = selected_rows[0].row()
-            task_id = int(self.task_table.item(row, 0).text())
+        task_id = self._selected_task_id()
+        if task_id is not None:
             self.delete_task_requested.emit(task_id)
     
+    def set_task_manager(self, task_manager):
+        # The source model holds every task; the proxy filters and sorts them
+        # using the indexes task_manager maintains and only exposes the visible rows
+        self.task_model = TaskTableModel(task_manager, self)
+        self.task_proxy = TaskProxyModel(task_manager, self)
+        self.task_proxy.setSourceModel(self.task_model)
+        self.task_table.setModel(self.task_proxy)
+    
     def update_tasks(self, tasks):
-        self.task_table.setRowCount(0)
-        
-        for task in tasks:
-            row_position = self.task_table.rowCount()
-            self.task_table.insertRow(row_position)
-            
-            # ID column
-            id_item = QTableWidgetItem(str(task.id))
-            id_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.task_table.setItem(row_position, 0, id_item)
-            
-            # Title column
-            title_item = QTableWidgetItem(task.title)
-            if task.completed:
-                font = title_item.font()
-                font.setStrikeOut(True)
-                title_item.setFont(font)
-                title_item.setForeground(QColor("#9e9e9e"))  # Gray for completed tasks
-            else:
-                font = title_item.font()
-                font.setBold(True)
-                title_item.setFont(font)
-            self.task_table.setItem(row_position, 1, title_item)
-            
-            # Due date column
-            due_date = task.due_date.strftime("%Y-%m-%d") if task.due_date else "—"
-            date_item = QTableWidgetItem(due_date)
-            date_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            # Color code overdue tasks
-            if not task.completed and task.due_date and task.due_date.date() < datetime.now().date():
-                date_item.setForeground(QColor("#e53935"))  # Red for overdue
-                date_item.setBackground(QColor("#ffebee"))  # Light red background
-                font = date_item.font()
-                font.setBold(True)
-                date_item.setFont(font)
-                
-            self.task_table.setItem(row_position, 2, date_item)
-            
-            # Priority column
-            priority_item = QTableWidgetItem(task.priority.name)
-            priority_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            # Color code priorities with backgrounds instead of just text color
-            if task.priority == Priority.HIGH:
-                priority_item.setForeground(QColor("#ffffff"))
-                priority_item.setBackground(QColor("#c62828"))  # Darker red background
-            elif task.priority == Priority.MEDIUM:
-                priority_item.setForeground(QColor("#ffffff"))
-                priority_item.setBackground(QColor("#ef6c00"))  # Darker orange background
-            elif task.priority == Priority.LOW:
-                priority_item.setForeground(QColor("#ffffff"))
-                priority_item.setBackground(QColor("#0277bd"))  # Darker blue background
-            
-            font = priority_item.font()
-            font.setBold(True)
-            priority_item.setFont(font)    
-            self.task_table.setItem(row_position, 3, priority_item)
-            
-            # Status column
-            status = "Completed" if task.completed else "Pending"
-            status_item = QTableWidgetItem(status)
-            status_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            # Add background colors for status
-            if task.completed:
-                status_item.setForeground(QColor("#ffffff"))
-                status_item.setBackground(QColor("#2e7d32"))  # Darker green
-            else:
-                status_item.setForeground(QColor("#ffffff"))
-                status_item.setBackground(QColor("#1565c0"))  # Darker blue
-            
-            font = status_item.font()
-            font.setBold(True)
-            status_item.setFont(font)
-            self.task_table.setItem(row_position, 4, status_item)
-        
-        self.task_table.resizeColumnsToContents()
-        self.task_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.task_model.set_tasks(tasks)
+    
+    def set_task_view(self, filter_name, sort_by, ranked_ids=None, category=None):
+        self.task_proxy.set_view(filter_name, sort_by, ranked_ids, category)
+        return self.task_proxy.task_count()
+    
+    def current_category(self):
+        # The category to show, "" for tasks without one, None for all
+        return self.category_combo.currentData()
+    
+    def update_categories(self, counts):
+        # counts: category -> task count, in the order to list them, "" for no category.
+        # Only the labels change unless categories were added or removed.
+        items = [("All Categories", None)]
+        items += [(f"{category} ({count})", category) for category, count in counts.items() if category]
+        items.append((f"No Category ({counts.get('', 0)})", ""))
+        if [self.category_combo.itemData(position) for position in range(self.category_combo.count())] \
+                == [category for _, category in items]:
+            for position, (label, _) in enumerate(items):
+                self.category_combo.setItemText(position, label)
+            return
+        current = self.current_category()
+        self.category_combo.blockSignals(True)
+        self.category_combo.clear()
+        for label, category in items:
+            self.category_combo.addItem(label, category)
+        positions = [position for position, (_, category) in enumerate(items) if category == current]
+        self.category_combo.setCurrentIndex(positions[0] if positions else 0)
+        self.category_combo.blockSignals(False)
+        if not positions:
+            # The category shown was removed, so all of them are shown now
+            self.category_changed.emit()
+    
+    def apply_task_changes(self, inserted, updated, removed):
+        self.task_model.apply_changes(inserted, updated, removed)
     
     def update_status(self, message):
         self.status_bar.showMessage(message)
-
-    def open_task_dialog(self, task=None):
-        self.task_dialog = TaskDialog(self, task)
+    
+    def update_undo_actions(self, undo_label, redo_label):
+        # Labels of the next steps, None when there is nothing to undo or redo
+        self.undo_action.setText(f"&Undo {undo_label}" if undo_label else "&Undo")
+        self.undo_action.setEnabled(undo_label is not None)
+        self.redo_action.setText(f"&Redo {redo_label}" if redo_label else "&Redo")
+        self.redo_action.setEnabled(redo_label is not None)
+    
+    def update_overdue_count(self, count):
+        self.overdue_label.setText(f"Overdue: {count}")
+    
+    def show_progress(self, message, cancellable=False):
+        self.status_bar.showMessage(message)
+        self.progress_bar.setRange(0, 0)  # busy indicator until the first report
+        self.progress_bar.show()
+        self.cancel_button.setVisible(cancellable)
+    
+    def update_progress(self, done, total):
+        if total:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)
+    
+    def hide_progress(self):
+        self.progress_bar.hide()
+        self.cancel_button.hide()
+    
+    def get_import_path(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Tasks", "", self.TASK_FILE_FILTER)
+        return path
+    
+    def get_export_path(self):
+        path, selected_filter = QFileDialog.getSaveFileName(self, "Export Tasks", "tasks.csv", self.TASK_FILE_FILTER)
+        if path and not os.path.splitext(path)[1]:
+            # Take the extension from the chosen file type
+            path += selected_filter[selected_filter.index("*") + 1:-1]
+        return path
+    
+    # Dialogs are imported and built on first use, which keeps QtCharts out of startup,
+    # and then kept: opening one again only refills it
+    
+    def open_task_dialog(self, task=None, categories=()):
+        if self.task_dialog is None:
+            from src.views.task_dialog import TaskDialog
+            self.task_dialog = TaskDialog(self, task, categories)
+        else:
+            self.task_dialog.set_task(task, categories)
         return self.task_dialog.exec()
     
-    def open_settings_dialog(self, settings, categories):
-        self.settings_dialog = SettingsDialog(self, settings, categories)
+    def open_settings_dialog(self, settings, categories, category_counts=None):
+        if self.settings_dialog is None:
+            from src.views.settings_dialog import SettingsDialog
+            self.settings_dialog = SettingsDialog(self, settings, categories, category_counts)
+        else:
+            self.settings_dialog.set_settings(settings, categories, category_counts)
         return self.settings_dialog.exec()
     
     def open_statistics_dialog(self, stats):
-        self.statistics_dialog = StatisticsDialog(self, stats)
-        return self.statistics_dialog.exec() 
\ No newline at end of file
+        if self.statistics_dialog is None:
+            from src.views.statistics_dialog import StatisticsDialog
+            self.statistics_dialog = StatisticsDialog(self, stats)
+        else:
+            self.statistics_dialog.set_stats(stats)
+        return self.statistics_dialog.exec()
@@ -1,24 +1,40 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                           QCheckBox, QComboBox, QPushButton, QListWidget, 
                           QLineEdit, QFormLayout, QTabWidget, QWidget,
-                          QGroupBox, QDialogButtonBox)
+                          QGroupBox, QDialogButtonBox, QInputDialog, QListWidgetItem)
 from PyQt6.QtCore import Qt
 from src.models.task import Priority
 
 
 class SettingsDialog(QDialog):
-    def __init__(self, parent=None, settings=None, categories=None):
+    def __init__(self, parent=None, settings=None, categories=None, category_counts=None):
         super().__init__(parent)
         
+        self.setWindowTitle("Settings")
+        self.setMinimumSize(500, 400)
+        
+        self._create_layout()
+        self.set_settings(settings, categories, category_counts)
+    
+    def set_settings(self, settings=None, categories=None, category_counts=None):
+        # Shows these settings and categories, so the dialog can be reused
         self.settings = settings or {}
         self.categories = categories or []
+        self.category_counts = dict(category_counts or {})  # category -> number of its tasks
         self.result_settings = self.settings.copy()
         self.result_categories = self.categories.copy()
+        self.result_merges = {}  # removed category -> category its tasks move to, "" for none
         
-        self.setWindowTitle("Settings")
-        self.setMinimumSize(500, 400)
+        self.dark_mode_checkbox.setChecked(self.settings.get("dark_mode", False))
+        self.show_completed_checkbox.setChecked(self.settings.get("show_completed", True))
+        current_priority = self.settings.get("default_priority", Priority.MEDIUM)
+        self.default_priority_combo.setCurrentText(current_priority.name)
+        self.sort_by_combo.setCurrentText(self.settings.get("sort_by", "due_date"))
         
-        self._create_layout()
+        self.categories_list.clear()
+        for category in self.categories:
+            self._add_category_item(category)
+        self.new_category_edit.clear()
     
     def _create_layout(self):
         layout = QVBoxLayout(self)
@@ -35,7 +51,6 @@ class SettingsDialog(QDialog):
         appearance_layout = QVBoxLayout(appearance_group)
         
         self.dark_mode_checkbox = QCheckBox("Dark Mode")
-        self.dark_mode_checkbox.setChecked(self.settings.get("dark_mode", False))
         appearance_layout.addWidget(self.dark_mode_checkbox)
         
         general_layout.addWidget(appearance_group)
@@ -45,18 +60,14 @@ class SettingsDialog(QDialog):
         task_layout = QFormLayout(task_group)
         
         self.show_completed_checkbox = QCheckBox()
-        self.show_completed_checkbox.setChecked(self.settings.get("show_completed", True))
         task_layout.addRow("Show completed tasks:", self.show_completed_checkbox)
         
         self.default_priority_combo = QComboBox()
         self.default_priority_combo.addItems([p.name for p in Priority])
-        current_priority = self.settings.get("default_priority", Priority.MEDIUM)
-        self.default_priority_combo.setCurrentText(current_priority.name)
         task_layout.addRow("Default priority:", self.default_priority_combo)
         
         self.sort_by_combo = QComboBox()
         self.sort_by_combo.addItems(["due_date", "priority", "title", "created_at"])
-        self.sort_by_combo.setCurrentText(self.settings.get("sort_by", "due_date"))
         task_layout.addRow("Sort tasks by:", self.sort_by_combo)
         
         general_layout.addWidget(task_group)
@@ -69,7 +80,6 @@ class SettingsDialog(QDialog):
         categories_layout.addWidget(categories_label)
         
         self.categories_list = QListWidget()
-        self.categories_list.addItems(self.categories)
         categories_layout.addWidget(self.categories_list)
         
         categories_buttons_layout = QHBoxLayout()
@@ -102,18 +112,48 @@ class SettingsDialog(QDialog):
         
         layout.addWidget(button_box)
     
+    def _category_text(self, category):
+        count = self.category_counts.get(category, 0)
+        return f"{category} ({count} task{'' if count == 1 else 's'})"
+    
+    def _add_category_item(self, category):
+        item = QListWidgetItem(self._category_text(category))
+        item.setData(Qt.ItemDataRole.UserRole, category)
+        self.categories_list.addItem(item)
+    
     def _on_add_category(self):
         category = self.new_category_edit.text().strip()
         if category and category not in self.result_categories:
             self.result_categories.append(category)
-            self.categories_list.addItem(category)
+            self._add_category_item(category)
             self.new_category_edit.clear()
     
     def _on_remove_category(self):
         selected_items = self.categories_list.selectedItems()
         if selected_items:
             item = selected_items[0]
-            category = item.text()
+            category = item.data(Qt.ItemDataRole.UserRole)
+            count = self.category_counts.get(category, 0)
+            target = ""
+            if count:
+                # Its tasks can be merged into another category
+                choices = ["No Category"] + [other for other in self.result_categories if other != category]
+                choice, accepted = QInputDialog.getItem(
+                    self, "Remove Category", f"Move the tasks of '{category}' ({count}) to:", choices, 0, False)
+                if not accepted:
+                    return
+                target = "" if choice == "No Category" else choice
+                self.category_counts[target] = self.category_counts.get(target, 0) + count
+                for position in range(self.categories_list.count()):
+                    other = self.categories_list.item(position)
+                    if other.data(Qt.ItemDataRole.UserRole) == target:
+                        other.setText(self._category_text(target))
+            # Categories merged into this one earlier move on with it
+            for removed, merged_into in self.result_merges.items():
+                if merged_into == category:
+                    self.result_merges[removed] = target
+            self.result_merges[category] = target
+            self.category_counts[category] = 0
             self.categories_list.takeItem(self.categories_list.row(item))
             self.result_categories.remove(category)
     
@@ -133,4 +173,7 @@ class SettingsDialog(QDialog):
         return self.result_settings
     
     def get_categories(self):
-        return self.result_categories 
\ No newline at end of file
+        return self.result_categories
+    
+    def get_category_merges(self):
+        return self.result_merges 
\ No newline at end of file
@@ -1,66 +1,58 @@
+from datetime import datetime
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                           QGroupBox, QGridLayout, QDialogButtonBox, QTabWidget,
-                          QWidget)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPalette, QColor
-from PyQt6.QtCharts import QChart, QChartView, QPieSeries, QBarSeries, QBarSet, QBarCategoryAxis, QValueAxis
+                          QWidget, QComboBox)
+from PyQt6.QtCore import Qt, QPointF, QDateTime
+from PyQt6.QtGui import QPalette, QColor, QPainter
+from PyQt6.QtCharts import (QChart, QChartView, QPieSeries, QBarSeries, QBarSet, QBarCategoryAxis, QValueAxis,
+                            QLineSeries, QDateTimeAxis)
 
 
 class StatisticsDialog(QDialog):
+    # (stats key, label) of the figures shown on the Overview tab
+    COUNTS = [("total", "Total tasks:"), ("completed", "Completed:"), ("pending", "Pending:"), ("overdue", "Overdue:"),
+              ("overdue_occurrences", "Overdue occurrences:")]
+    PRIORITIES = [("high_priority", "High Priority:"), ("medium_priority", "Medium Priority:"),
+                  ("low_priority", "Low Priority:")]
+    
     def __init__(self, parent=None, stats=None):
         super().__init__(parent)
         
-        self.stats = stats or {}
-        
         self.setWindowTitle("Task Statistics")
         self.setMinimumSize(600, 500)
         
+        # Built once; set_stats fills in the figures, so the dialog can be shown again
         self._create_layout()
+        self.set_stats(stats)
     
     def _create_layout(self):
         layout = QVBoxLayout(self)
         
         # Create tabs
-        tab_widget = QTabWidget()
+        self.tab_widget = QTabWidget()
         
         # Overview tab
         overview_tab = QWidget()
         overview_layout = QVBoxLayout(overview_tab)
+        self.value_labels = {}
         
         # Task counts group
         counts_group = QGroupBox("Task Counts")
         counts_layout = QGridLayout(counts_group)
-        
-        # Total tasks
-        counts_layout.addWidget(QLabel("Total tasks:"), 0, 0)
-        counts_layout.addWidget(QLabel(str(self.stats.get("total", 0))), 0, 1)
-        
-        # Completed tasks
-        counts_layout.addWidget(QLabel("Completed:"), 1, 0)
-        counts_layout.addWidget(QLabel(str(self.stats.get("completed", 0))), 1, 1)
-        
-        # Pending tasks
-        counts_layout.addWidget(QLabel("Pending:"), 2, 0)
-        counts_layout.addWidget(QLabel(str(self.stats.get("pending", 0))), 2, 1)
-        
-        # Overdue tasks
-        counts_layout.addWidget(QLabel("Overdue:"), 3, 0)
-        counts_layout.addWidget(QLabel(str(self.stats.get("overdue", 0))), 3, 1)
+        for row, (key, text) in enumerate(self.COUNTS):
+            counts_layout.addWidget(QLabel(text), row, 0)
+            self.value_labels[key] = QLabel()
+            counts_layout.addWidget(self.value_labels[key], row, 1)
         
         overview_layout.addWidget(counts_group)
         
         # Priority counts group
         priority_group = QGroupBox("Tasks by Priority")
         priority_layout = QGridLayout(priority_group)
-        
-        priority_layout.addWidget(QLabel("High Priority:"), 0, 0)
-        priority_layout.addWidget(QLabel(str(self.stats.get("high_priority", 0))), 0, 1)
-        
-        priority_layout.addWidget(QLabel("Medium Priority:"), 1, 0)
-        priority_layout.addWidget(QLabel(str(self.stats.get("medium_priority", 0))), 1, 1)
-        
-        priority_layout.addWidget(QLabel("Low Priority:"), 2, 0)
-        priority_layout.addWidget(QLabel(str(self.stats.get("low_priority", 0))), 2, 1)
+        for row, (key, text) in enumerate(self.PRIORITIES):
+            priority_layout.addWidget(QLabel(text), row, 0)
+            self.value_labels[key] = QLabel()
+            priority_layout.addWidget(self.value_labels[key], row, 1)
         
         overview_layout.addWidget(priority_group)
         
@@ -68,11 +60,10 @@ class StatisticsDialog(QDialog):
         completion_group = QGroupBox("Completion Rate")
         completion_layout = QVBoxLayout(completion_group)
         
-        rate = self.stats.get("completion_rate", 0)
-        rate_label = QLabel(f"{rate:.1f}%")
-        rate_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        rate_label.setStyleSheet("font-size: 24px; font-weight: bold;")
-        completion_layout.addWidget(rate_label)
+        self.rate_label = QLabel()
+        self.rate_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.rate_label.setStyleSheet("font-size: 24px; font-weight: bold;")
+        completion_layout.addWidget(self.rate_label)
         
         overview_layout.addWidget(completion_group)
         
@@ -84,47 +75,23 @@ class StatisticsDialog(QDialog):
         pie_chart = QChart()
         pie_chart.setTitle("Tasks by Status")
         
-        series = QPieSeries()
-        
-        # Add slices
-        completed = self.stats.get("completed", 0)
-        pending = self.stats.get("pending", 0)
-        
-        if completed > 0:
-            completed_slice = series.append("Completed", completed)
-            completed_slice.setBrush(QColor("#4CAF50"))  # Green
-        
-        if pending > 0:
-            pending_slice = series.append("Pending", pending)
-            pending_slice.setBrush(QColor("#2196F3"))  # Blue
-
-        if pending > 0 and self.stats.get("overdue", 0) > 0:
-            # Show overdue as part of pending
-            overdue = self.stats.get("overdue", 0)
-            if overdue > 0:
-                overdue_slice = series.append("Overdue", overdue)
-                overdue_slice.setBrush(QColor("#F44336"))  # Red
-                
-        pie_chart.addSeries(series)
+        self.pie_series = QPieSeries()
+        pie_chart.addSeries(self.pie_series)
         pie_chart.legend().setVisible(True)
         
         chart_view = QChartView(pie_chart)
-        chart_view.setRenderHint(chart_view.RenderHint.Antialiasing)
+        chart_view.setRenderHint(QPainter.RenderHint.Antialiasing)
         charts_layout.addWidget(chart_view)
         
         # Priority bar chart
         bar_chart = QChart()
         bar_chart.setTitle("Tasks by Priority")
         
-        bar_set = QBarSet("Number of Tasks")
-        bar_set.append([
-            self.stats.get("high_priority", 0),
-            self.stats.get("medium_priority", 0),
-            self.stats.get("low_priority", 0)
-        ])
+        self.bar_set = QBarSet("Number of Tasks")
+        self.bar_set.append([0, 0, 0])
         
         bar_series = QBarSeries()
-        bar_series.append(bar_set)
+        bar_series.append(self.bar_set)
         
         bar_chart.addSeries(bar_series)
         
@@ -134,30 +101,145 @@ class StatisticsDialog(QDialog):
         bar_chart.addAxis(axis_x, Qt.AlignmentFlag.AlignBottom)
         bar_series.attachAxis(axis_x)
         
-        axis_y = QValueAxis()
-        max_value = max([
-            self.stats.get("high_priority", 0),
-            self.stats.get("medium_priority", 0),
-            self.stats.get("low_priority", 0)
-        ])
-        axis_y.setRange(0, max(1, max_value + 1))  # Avoid range 0-0
-        bar_chart.addAxis(axis_y, Qt.AlignmentFlag.AlignLeft)
-        bar_series.attachAxis(axis_y)
+        self.bar_axis_y = QValueAxis()
+        bar_chart.addAxis(self.bar_axis_y, Qt.AlignmentFlag.AlignLeft)
+        bar_series.attachAxis(self.bar_axis_y)
         
         bar_chart.legend().setVisible(False)
         
         bar_chart_view = QChartView(bar_chart)
-        bar_chart_view.setRenderHint(bar_chart_view.RenderHint.Antialiasing)
+        bar_chart_view.setRenderHint(QPainter.RenderHint.Antialiasing)
         charts_layout.addWidget(bar_chart_view)
         
         # Add tabs to widget
-        tab_widget.addTab(overview_tab, "Overview")
-        tab_widget.addTab(charts_tab, "Charts")
+        self.tab_widget.addTab(overview_tab, "Overview")
+        self.tab_widget.addTab(charts_tab, "Charts")
+        self.trends_index = self.tab_widget.addTab(self._create_trends_tab(), "Trends")
         
-        layout.addWidget(tab_widget)
+        layout.addWidget(self.tab_widget)
         
         # Dialog buttons
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
         button_box.rejected.connect(self.reject)
         
-        layout.addWidget(button_box) 
\ No newline at end of file
+        layout.addWidget(button_box)
+    
+    def set_stats(self, stats):
+        self.stats = stats or {}
+        for key, label in self.value_labels.items():
+            label.setText(str(self.stats.get(key, 0)))
+        self.rate_label.setText(f"{self.stats.get('completion_rate', 0):.1f}%")
+        
+        # Status slices
+        self.pie_series.clear()
+        completed = self.stats.get("completed", 0)
+        pending = self.stats.get("pending", 0)
+        
+        if completed > 0:
+            completed_slice = self.pie_series.append("Completed", completed)
+            completed_slice.setBrush(QColor("#4CAF50"))  # Green
+        
+        if pending > 0:
+            pending_slice = self.pie_series.append("Pending", pending)
+            pending_slice.setBrush(QColor("#2196F3"))  # Blue
+        
+        overdue = self.stats.get("overdue", 0)
+        if pending > 0 and overdue > 0:
+            # Show overdue as part of pending
+            overdue_slice = self.pie_series.append("Overdue", overdue)
+            overdue_slice.setBrush(QColor("#F44336"))  # Red
+        
+        # Priority bars
+        values = [self.stats.get(key, 0) for key, _ in self.PRIORITIES]
+        for position, value in enumerate(values):
+            self.bar_set.replace(position, value)
+        self.bar_axis_y.setRange(0, max(1, max(values) + 1))  # Avoid range 0-0
+        
+        history = self.stats.get("history")
+        self.tab_widget.setTabVisible(self.trends_index, bool(history))
+        if history:
+            self._update_trends()
+    
+    def _create_trends_tab(self):
+        # A year of history, from the daily counts in stats["history"]
+        trends_tab = QWidget()
+        trends_layout = QVBoxLayout(trends_tab)
+        
+        period_layout = QHBoxLayout()
+        period_layout.addWidget(QLabel("Show:"))
+        self.period_combo = QComboBox()
+        self.period_combo.addItems(["Per week", "Per day"])
+        self.period_combo.currentTextChanged.connect(self._update_activity_chart)
+        period_layout.addWidget(self.period_combo)
+        period_layout.addStretch()
+        trends_layout.addLayout(period_layout)
+        
+        # Created and completed tasks per period, redrawn when the period changes
+        activity_chart = QChart()
+        activity_chart.setTitle("Tasks Created and Completed")
+        self.activity_series, self.activity_axes = self._add_line_chart(
+            activity_chart, [("Created", "#2196F3"), ("Completed", "#4CAF50")])
+        
+        activity_view = QChartView(activity_chart)
+        activity_view.setRenderHint(QPainter.RenderHint.Antialiasing)
+        trends_layout.addWidget(activity_view)
+        
+        # Overdue tasks at the end of each day
+        backlog_chart = QChart()
+        backlog_chart.setTitle("Overdue Backlog")
+        self.backlog_series, self.backlog_axes = self._add_line_chart(backlog_chart, [("Overdue", "#F44336")])
+        backlog_chart.legend().setVisible(False)
+        
+        backlog_view = QChartView(backlog_chart)
+        backlog_view.setRenderHint(QPainter.RenderHint.Antialiasing)
+        trends_layout.addWidget(backlog_view)
+        
+        return trends_tab
+    
+    def _update_trends(self):
+        history = self.stats["history"]
+        self._update_activity_chart(self.period_combo.currentText())
+        self._set_points(self.backlog_series, self.backlog_axes, history["days"], [history["overdue"]])
+    
+    def _update_activity_chart(self, period):
+        history = self.stats.get("history")
+        if not history:
+            return
+        days, created, completed = history["days"], history["created"], history["completed"]
+        if period == "Per week":
+            # Weeks end on the last day shown, so the current week is a whole one
+            start = len(days) % 7
+            days = days[start + 6::7]
+            created = [sum(created[end - 6:end + 1]) for end in range(start + 6, len(created), 7)]
+            completed = [sum(completed[end - 6:end + 1]) for end in range(start + 6, len(completed), 7)]
+        self._set_points(self.activity_series, self.activity_axes, days, [created, completed])
+    
+    def _add_line_chart(self, chart, lines):
+        # One line per (name, color) over a date axis; returns the series and the two axes
+        axis_x = QDateTimeAxis()
+        axis_x.setFormat("MMM yyyy")
+        axis_x.setTickCount(7)
+        chart.addAxis(axis_x, Qt.AlignmentFlag.AlignBottom)
+        
+        axis_y = QValueAxis()
+        axis_y.setLabelFormat("%d")
+        chart.addAxis(axis_y, Qt.AlignmentFlag.AlignLeft)
+        
+        series_list = []
+        for name, color in lines:
+            series = QLineSeries()
+            series.setName(name)
+            series.setColor(QColor(color))
+            chart.addSeries(series)
+            series.attachAxis(axis_x)
+            series.attachAxis(axis_y)
+            series_list.append(series)
+        return series_list, (axis_x, axis_y)
+    
+    def _set_points(self, series_list, axes, days, values_list):
+        axis_x, axis_y = axes
+        times = [datetime(day.year, day.month, day.day).timestamp() * 1000 for day in days]
+        axis_x.setRange(QDateTime.fromMSecsSinceEpoch(int(times[0])), QDateTime.fromMSecsSinceEpoch(int(times[-1])))
+        for series, values in zip(series_list, values_list):
+            series.replace([QPointF(time, value) for time, value in zip(times, values)])
+        axis_y.setRange(0, max(1, max(max(values) for values in values_list)))
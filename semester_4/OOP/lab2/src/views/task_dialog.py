@@ -1,24 +1,47 @@
 from datetime import datetime
+from itertools import islice
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                           QLineEdit, QTextEdit, QDateEdit, QComboBox,
                           QPushButton, QFormLayout, QDialogButtonBox)
 from PyQt6.QtCore import Qt, QDate
 from PyQt6.QtGui import QFont, QColor
 from src.models.task import Task, Priority
+from src.models.recurrence import Recurrence
 
 
 class TaskDialog(QDialog):
-    def __init__(self, parent=None, task=None):
+    # (label, RRULE) choices of the Repeat combo; the series starts on the due date
+    REPEATS = [("Does not repeat", None), ("Daily", "FREQ=DAILY"),
+               ("Weekdays", "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"), ("Weekly", "FREQ=WEEKLY"),
+               ("Every 2 weeks", "FREQ=WEEKLY;INTERVAL=2"), ("Monthly", "FREQ=MONTHLY"), ("Custom", None)]
+    PREVIEW_COUNT = 3  # upcoming occurrences shown under the rule
+    
+    def __init__(self, parent=None, task=None, categories=()):
         super().__init__(parent)
-        self.task = task
-        self.result_task = None
-        
-        self.setWindowTitle("Add Task" if task is None else "Edit Task")
         self.setMinimumWidth(400)
         
         self._apply_styles()
         self._create_form()
         self._create_buttons()
+        self.set_task(task, categories)
+    
+    def set_task(self, task=None, categories=()):
+        # Resets the form for adding a task, or for editing task, so the dialog can be reused
+        self.task = task
+        self.result_task = None
+        self.setWindowTitle("Add Task" if task is None else "Edit Task")
+        
+        self.title_edit.clear()
+        self.description_edit.clear()
+        self.due_date_edit.setDate(QDate.currentDate())
+        self.priority_combo.setCurrentText(Priority.MEDIUM.name)
+        self.category_combo.clear()
+        self.category_combo.addItem("No Category", "")
+        for category in categories:
+            self.category_combo.addItem(category, category)
+        self.repeat_combo.setCurrentIndex(0)
+        self.rule_edit.clear()
+        self.title_edit.setFocus()
         
         # Fill form if editing existing task
         if task:
@@ -129,6 +152,34 @@ class TaskDialog(QDialog):
         priority_label.setFont(QFont("", 11))
         form_layout.addRow(priority_label, self.priority_combo)
         
+        # Category, filled in by set_task
+        self.category_combo = QComboBox()
+        self.category_combo.setMinimumHeight(36)
+        category_label = QLabel("Category:")
+        category_label.setFont(QFont("", 11))
+        form_layout.addRow(category_label, self.category_combo)
+        
+        # Repeat, with an RRULE such as "FREQ=WEEKLY;BYDAY=MO,TH;COUNT=10" for custom rules
+        self.repeat_combo = QComboBox()
+        self.repeat_combo.setMinimumHeight(36)
+        self.repeat_combo.addItems([label for label, _ in self.REPEATS])
+        repeat_label = QLabel("Repeat:")
+        repeat_label.setFont(QFont("", 11))
+        form_layout.addRow(repeat_label, self.repeat_combo)
+        
+        self.rule_edit = QLineEdit()
+        self.rule_edit.setPlaceholderText("FREQ=WEEKLY;BYDAY=MO,TH;COUNT=10")
+        self.rule_edit.setVisible(False)
+        form_layout.addRow("", self.rule_edit)
+        
+        self.repeat_preview = QLabel()
+        self.repeat_preview.setStyleSheet("font-weight: normal; color: #424242;")
+        form_layout.addRow("", self.repeat_preview)
+        
+        self.repeat_combo.currentIndexChanged.connect(self._update_repeat)
+        self.rule_edit.textChanged.connect(self._update_repeat)
+        self.due_date_edit.dateChanged.connect(self._update_repeat)
+        
         self.layout.addLayout(form_layout)
     
     def _create_buttons(self):
@@ -152,6 +203,60 @@ class TaskDialog(QDialog):
                                             self.task.due_date.day))
         
         self.priority_combo.setCurrentText(self.task.priority.name)
+        
+        position = self.category_combo.findData(self.task.category)
+        if position < 0:
+            self.category_combo.addItem(self.task.category, self.task.category)
+            position = self.category_combo.count() - 1
+        self.category_combo.setCurrentIndex(position)
+        
+        recurrence = self.task.recurrence
+        if recurrence is not None:
+            for position, (_, rule) in enumerate(self.REPEATS):
+                if rule and Recurrence.from_rule(rule, recurrence.start) == recurrence:
+                    self.repeat_combo.setCurrentIndex(position)
+                    break
+            else:
+                self.repeat_combo.setCurrentText("Custom")
+                self.rule_edit.setText(recurrence.rule())
+    
+    def _due_date(self):
+        due_date_qdate = self.due_date_edit.date()
+        return datetime(due_date_qdate.year(), due_date_qdate.month(), due_date_qdate.day())
+    
+    def _recurrence(self, due_date):
+        # The chosen rule starting at due_date, None for no repeat; ValueError for a bad custom rule
+        label = self.repeat_combo.currentText()
+        rule = self.rule_edit.text().strip() if label == "Custom" else dict(self.REPEATS)[label]
+        if label == "Custom" and not rule:
+            raise ValueError("Enter a rule")
+        if rule is None:
+            return None
+        recurrence = Recurrence.from_rule(rule, due_date)
+        current = self.task.recurrence if self.task else None
+        if current is not None and Recurrence.from_rule(recurrence.rule(), current.start) == current \
+                and self.task.due_date is not None and self.task.due_date.date() == due_date.date():
+            # Unchanged: the series keeps its start, and the task its next occurrence
+            return current
+        return recurrence
+    
+    def _update_repeat(self):
+        self.rule_edit.setVisible(self.repeat_combo.currentText() == "Custom")
+        try:
+            due_date = self._due_date()
+            recurrence = self._recurrence(due_date)
+        except ValueError as error:
+            self.repeat_preview.setText(str(error))
+            return
+        if recurrence is None:
+            self.repeat_preview.clear()
+            return
+        if self.task is not None and recurrence is self.task.recurrence:
+            due_date = self.task.due_date
+        # Only the first few occurrences are expanded
+        upcoming = islice(recurrence.occurrences(due_date), self.PREVIEW_COUNT)
+        self.repeat_preview.setText(f"{recurrence.describe()}, next: "
+                                    + ", ".join(moment.strftime("%a %d %b") for moment in upcoming))
     
     def _on_accept(self):
         # Validate input
@@ -161,21 +266,31 @@ class TaskDialog(QDialog):
         title = self.title_edit.text().strip()
         description = self.description_edit.toPlainText().strip()
         
-        due_date_qdate = self.due_date_edit.date()
-        due_date = datetime(due_date_qdate.year(), due_date_qdate.month(), due_date_qdate.day())
+        due_date = self._due_date()
+        try:
+            recurrence = self._recurrence(due_date)
+        except ValueError:
+            self.rule_edit.setFocus()
+            return
+        if recurrence is not None:
+            # Due at the first occurrence, or still at the next one if the series is unchanged
+            due_date = self.task.due_date if self.task and recurrence is self.task.recurrence \
+                else recurrence.occurrence(0)
         
         priority_name = self.priority_combo.currentText()
         priority = Priority[priority_name]
+        category = self.category_combo.currentData()
         
         if self.task:
             # Update existing task
             self.task.update(title=title, description=description, 
-                            due_date=due_date, priority=priority)
+                            due_date=due_date, priority=priority, recurrence=recurrence, category=category)
             self.result_task = self.task
         else:
             # Create new task
             self.result_task = Task(title=title, description=description, 
-                                  due_date=due_date, priority=priority)
+                                  due_date=due_date, priority=priority, recurrence=recurrence,
+                                  category=category)
         
         self.accept()
     
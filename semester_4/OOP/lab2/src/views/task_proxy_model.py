@@ -0,0 +1,174 @@
+from bisect import bisect_left
+from PyQt6.QtCore import Qt, QAbstractProxyModel, QModelIndex
+from src.models.task_manager import SORT_KEYS
+
+
+class TaskProxyModel(QAbstractProxyModel):
+    # Rows are handed to the view in batches as it scrolls (see fetchMore)
+    BATCH_SIZE = 500
+
+    def __init__(self, task_manager, parent=None):
+        super().__init__(parent)
+        self.task_manager = task_manager
+        self.filter_name = "All"
+        self.category = None  # only tasks of this category, "" for none, None for all
+        self.sort_by = "due_date"
+        self.ranks = None  # task id -> rank while showing search results
+        self._entries = []  # (sort key, task id) of the accepted tasks, in display order
+        self._keys = None  # task id -> sort key its entry was stored with, built on demand
+        self._loaded = 0
+
+    def setSourceModel(self, source_model):
+        super().setSourceModel(source_model)
+        source_model.modelReset.connect(self._rebuild)
+        source_model.rowsInserted.connect(self._on_rows_inserted)
+        source_model.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        source_model.dataChanged.connect(self._on_data_changed)
+        self._rebuild()
+
+    def set_view(self, filter_name, sort_by, ranked_ids=None, category=None):
+        # ranked_ids: search results, already filtered, shown in that order
+        self.filter_name = filter_name
+        self.category = category
+        self.sort_by = sort_by if sort_by in SORT_KEYS else "due_date"
+        self.ranks = None if ranked_ids is None else {task_id: rank for rank, task_id in enumerate(ranked_ids)}
+        self._rebuild()
+
+    def _sort_key(self, task):
+        if self.ranks is not None:
+            return self.ranks.get(task.id)
+        return SORT_KEYS[self.sort_by](task)
+
+    def _rebuild(self):
+        # Filtering and sorting read the indexes TaskManager maintains, not the rows
+        self.beginResetModel()
+        if self.ranks is not None:
+            self._entries = [(rank, task_id) for task_id, rank in self.ranks.items()]
+        else:
+            self._entries = self.task_manager.get_sorted_entries(self.sort_by, self.filter_name, self.category)
+        self._keys = None
+        self._loaded = min(self.BATCH_SIZE, len(self._entries))
+        self.endResetModel()
+
+    def task_at(self, row):
+        if 0 <= row < self._loaded:
+            return self.task_manager.get_task_by_id(self._entries[row][1])
+        return None
+
+    def task_count(self):
+        return len(self._entries)
+
+    def _stored_keys(self):
+        # Only needed once rows start changing, so switching views stays cheap
+        if self._keys is None:
+            self._keys = {task_id: key for key, task_id in self._entries}
+        return self._keys
+
+    def _row_of(self, task_id):
+        keys = self._stored_keys()
+        if task_id not in keys:
+            return -1
+        return bisect_left(self._entries, (keys[task_id], task_id))
+
+    def _place(self, task):
+        # A rebuild may already have picked up a change that is still being delivered
+        self._take(task.id)
+        if not self.task_manager.matches_filter(task, self.filter_name, self.category):
+            return
+        key = self._sort_key(task)
+        if key is None:
+            return
+        row = bisect_left(self._entries, (key, task.id))
+        # Rows past the fetched range are picked up later by fetchMore
+        visible = row < self._loaded or self._loaded == len(self._entries)
+        if visible:
+            self.beginInsertRows(QModelIndex(), row, row)
+        self._entries.insert(row, (key, task.id))
+        self._stored_keys()[task.id] = key
+        if visible:
+            self._loaded += 1
+            self.endInsertRows()
+
+    def _take(self, task_id):
+        row = self._row_of(task_id)
+        if row < 0:
+            return
+        visible = row < self._loaded
+        if visible:
+            self.beginRemoveRows(QModelIndex(), row, row)
+        del self._entries[row]
+        del self._keys[task_id]
+        if visible:
+            self._loaded -= 1
+            self.endRemoveRows()
+
+    def _on_rows_inserted(self, parent, first, last):
+        source = self.sourceModel()
+        for row in range(first, last + 1):
+            self._place(source.task_at(row))
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        source = self.sourceModel()
+        for row in range(first, last + 1):
+            self._take(source.task_at(row).id)
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        source = self.sourceModel()
+        for source_row in range(top_left.row(), bottom_right.row() + 1):
+            task = source.task_at(source_row)
+            row = self._row_of(task.id)
+            accepted = self.task_manager.matches_filter(task, self.filter_name, self.category)
+            if accepted and row >= 0 and self._keys[task.id] == self._sort_key(task):
+                if row < self._loaded:
+                    self.dataChanged.emit(self.index(row, top_left.column()),
+                                          self.index(row, bottom_right.column()))
+                continue
+            # The task left the filter or moved in the sort order
+            self._place(task)
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < self._loaded or not 0 <= column < self.columnCount():
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        source = self.sourceModel()
+        return 0 if parent.isValid() or source is None else source.columnCount()
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._loaded < len(self._entries)
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        count = min(self.BATCH_SIZE, len(self._entries) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        source = self.sourceModel()
+        task_id = self._entries[proxy_index.row()][1]
+        return source.index(source.row_of(task_id), proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        task = self.sourceModel().task_at(source_index.row())
+        row = self._row_of(task.id)
+        if not 0 <= row < self._loaded:
+            return QModelIndex()
+        return self.index(row, source_index.column())
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        return self.sourceModel().headerData(section, orientation, role)
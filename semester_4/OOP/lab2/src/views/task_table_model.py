@@ -0,0 +1,166 @@
+from bisect import bisect_left
+from operator import attrgetter
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor, QFont
+from src.models.task import Priority
+
+
+class TaskTableModel(QAbstractTableModel):
+    HEADERS = ["ID", "Title", "Due Date", "Priority", "Status", "Category"]
+
+    def __init__(self, task_manager, parent=None):
+        super().__init__(parent)
+        self.task_manager = task_manager
+        self._tasks = []
+        self._ids = []  # task ids of the rows, ascending, for bisect lookups
+        self._create_roles()
+
+    def _create_roles(self):
+        # Colors and fonts are created once and shared by every row
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+        self._completed_font = QFont()
+        self._completed_font.setStrikeOut(True)
+
+        self._white = QColor("#ffffff")
+        self._completed_color = QColor("#9e9e9e")  # Gray for completed tasks
+        self._overdue_color = QColor("#e53935")  # Red for overdue
+        self._overdue_background = QColor("#ffebee")  # Light red background
+        self._priority_backgrounds = {
+            Priority.HIGH: QColor("#c62828"),  # Darker red background
+            Priority.MEDIUM: QColor("#ef6c00"),  # Darker orange background
+            Priority.LOW: QColor("#0277bd"),  # Darker blue background
+        }
+        self._completed_background = QColor("#2e7d32")  # Darker green
+        self._pending_background = QColor("#1565c0")  # Darker blue
+
+    def set_tasks(self, tasks):
+        self.beginResetModel()
+        ids = list(map(attrgetter("id"), tasks))
+        if any(a > b for a, b in zip(ids, ids[1:])):
+            # Rows must stay in id order for row_of/insert_task
+            tasks = sorted(tasks, key=attrgetter("id"))
+            ids.sort()
+        self._tasks = tasks
+        self._ids = ids
+        self.endResetModel()
+
+    def task_at(self, row):
+        if 0 <= row < len(self._tasks):
+            return self._tasks[row]
+        return None
+
+    def task_count(self):
+        return len(self._tasks)
+
+    def row_of(self, task_id):
+        row = bisect_left(self._ids, task_id)
+        if row < len(self._ids) and self._ids[row] == task_id:
+            return row
+        return -1
+
+    def insert_task(self, task):
+        row = bisect_left(self._ids, task.id)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._tasks.insert(row, task)
+        self._ids.insert(row, task.id)
+        self.endInsertRows()
+
+    def remove_task(self, task_id):
+        row = self.row_of(task_id)
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._tasks[row]
+        del self._ids[row]
+        self.endRemoveRows()
+
+    def refresh_task(self, task_id):
+        row = self.row_of(task_id)
+        if row >= 0:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def apply_changes(self, inserted, updated, removed):
+        for task_id in removed:
+            self.remove_task(task_id)
+        for task in updated:
+            self.refresh_task(task.id)
+        for task in inserted:
+            self.insert_task(task)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._tasks)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def _is_overdue(self, task):
+        # Same rule as the Overdue filter and the statistics
+        return self.task_manager.is_overdue(task)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self._tasks[index.row()]
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return str(task.id)
+            if column == 1:
+                return task.title
+            if column == 2:
+                if not task.due_date:
+                    return "—"
+                # A repeating task shows its next occurrence
+                due = task.due_date.strftime("%Y-%m-%d")
+                return due if task.recurrence is None else f"{due} ↻"
+            if column == 3:
+                return task.priority.name
+            if column == 5:
+                return task.category or "—"
+            return "Completed" if task.completed else "Pending"
+
+        if role == Qt.ItemDataRole.ToolTipRole:
+            if column == 2 and task.recurrence is not None:
+                return task.recurrence.describe()
+            return None
+
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if column != 1:
+                return Qt.AlignmentFlag.AlignCenter
+            return None
+
+        if role == Qt.ItemDataRole.FontRole:
+            if column == 1:
+                return self._completed_font if task.completed else self._bold_font
+            if column == 2:
+                return self._bold_font if self._is_overdue(task) else None
+            if column in (3, 4):
+                return self._bold_font
+            return None
+
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if column == 1 and task.completed:
+                return self._completed_color
+            if column == 2 and self._is_overdue(task):
+                return self._overdue_color
+            if column in (3, 4):
+                return self._white
+            return None
+
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if column == 2 and self._is_overdue(task):
+                return self._overdue_background
+            if column == 3:
+                return self._priority_backgrounds.get(task.priority)
+            if column == 4:
+                return self._completed_background if task.completed else self._pending_background
+            return None
+
+        return None
@@ -0,0 +1,24 @@
+import io
+import unittest
+
+from src.models.task_io import read_csv, read_jsonl
+
+
+class ReadTest(unittest.TestCase):
+    def test_csv_without_title_column(self):
+        file = io.StringIO("name,description\nBuy milk,Two litres\n")
+        with self.assertRaisesRegex(ValueError, "Missing column 'title'"):
+            list(read_csv(file))
+
+    def test_csv_with_title_only(self):
+        tasks = list(read_csv(io.StringIO("title\nBuy milk\n")))
+        self.assertEqual([task.title for task in tasks], ["Buy milk"])
+
+    def test_jsonl_without_title_key(self):
+        file = io.StringIO('{"title": "Buy milk"}\n\n{"name": "Buy bread"}\n')
+        with self.assertRaisesRegex(ValueError, "Missing key 'title' on line 3"):
+            list(read_jsonl(file))
+
+
+if __name__ == "__main__":
+    unittest.main()
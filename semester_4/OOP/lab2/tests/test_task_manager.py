@@ -0,0 +1,133 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from src.models import task_manager as task_manager_module
+from src.models.recurrence import Recurrence
+from src.models.task import Priority, Task
+from src.models.task_manager import TaskManager
+from src.models.undo import UndoStack
+
+
+def make_tasks(count, fail_after=None):
+    for number in range(count):
+        if number == fail_after:
+            raise ValueError("Unreadable task")
+        yield Task(f"Task {number}")
+
+
+class BulkAddTest(unittest.TestCase):
+    def setUp(self):
+        self.task_manager = TaskManager()
+        self.undo_stack = UndoStack(self.task_manager)
+        self.events = []
+        self.task_manager.add_listener(lambda event, task_ids: self.events.append((event, len(task_ids))))
+
+    @mock.patch.object(task_manager_module, "BULK_ADD_CHUNK", 4)
+    def test_adds_in_chunks_as_one_undo_step(self):
+        task_ids = self.task_manager.bulk_add(make_tasks(10))
+        self.assertEqual(task_ids, list(range(1, 11)))
+        self.assertEqual(self.events, [("bulk_inserted", 4), ("bulk_inserted", 4), ("bulk_inserted", 2)])
+        self.assertEqual(self.undo_stack.undo_label(), "Add 10 Tasks")
+        self.undo_stack.undo()
+        self.assertEqual(self.task_manager.tasks, {})
+
+    @mock.patch.object(task_manager_module, "BULK_ADD_CHUNK", 4)
+    def test_failed_iterator_adds_nothing(self):
+        with self.assertRaises(ValueError):
+            self.task_manager.bulk_add(make_tasks(10, fail_after=9))
+        self.assertEqual(self.task_manager.tasks, {})
+        self.assertEqual(self.task_manager.due_index, [])
+        self.assertIsNone(self.undo_stack.undo_label())
+
+
+class RestoreTasksTest(unittest.TestCase):
+    def setUp(self):
+        self.task_manager = TaskManager()
+        self.undo_stack = UndoStack(self.task_manager)
+        for number in range(5):
+            self.task_manager.add_task(Task(f"Task {number}"))
+
+    def test_undo_delete_keeps_id_order(self):
+        self.task_manager.delete_task(2)
+        self.undo_stack.undo()
+        self.assertEqual([task.id for task in self.task_manager.get_all_tasks()], [1, 2, 3, 4, 5])
+
+    def test_undo_bulk_delete_keeps_id_order(self):
+        self.task_manager.bulk_remove([4, 1])
+        self.undo_stack.undo()
+        self.assertEqual(list(self.task_manager.tasks), [1, 2, 3, 4, 5])
+        self.undo_stack.redo()
+        self.undo_stack.undo()
+        self.assertEqual(list(self.task_manager.tasks), [1, 2, 3, 4, 5])
+
+    def test_undo_reversed_delete_of_last_tasks_keeps_id_order(self):
+        self.task_manager.bulk_remove([5, 4])
+        self.undo_stack.undo()
+        self.assertEqual([task.id for task in self.task_manager.get_all_tasks()], [1, 2, 3, 4, 5])
+
+    def test_restore_nothing(self):
+        self.assertEqual(self.task_manager.restore_tasks([]), [])
+        self.assertEqual(list(self.task_manager.tasks), [1, 2, 3, 4, 5])
+
+
+class IncrementalStatsTest(unittest.TestCase):
+    # The aggregates behind get_tasks_stats must match a full recompute after any edit
+    def setUp(self):
+        self.task_manager = TaskManager()
+        self.undo_stack = UndoStack(self.task_manager)
+        self.rng = random.Random(42)
+        # Whole days (and six hours off for series) away from now, so that nothing falls
+        # due between computing the stats and recomputing them
+        self.now = datetime.now().replace(microsecond=0)
+
+    def make_task(self):
+        rng = self.rng
+        due_date = rng.choice([None, self.now + timedelta(days=rng.randint(-30, 30) or 1)])
+        recurrence = None
+        if rng.random() < 0.2:
+            start = self.now - timedelta(days=rng.randint(1, 60), hours=6)
+            recurrence = Recurrence(start, rng.choice(Recurrence.FREQUENCIES), interval=rng.randint(1, 3))
+        return Task(f"Task {rng.random()}", "Description", due_date, rng.choice(list(Priority)),
+                    completed=rng.random() < 0.2, recurrence=recurrence)
+
+    def random_ids(self, count):
+        task_ids = list(self.task_manager.tasks)
+        return self.rng.sample(task_ids, min(count, len(task_ids)))
+
+    def edit(self):
+        rng, task_manager = self.rng, self.task_manager
+        action = rng.randrange(9)
+        task_ids = self.random_ids(1)
+        if action == 0 or not task_ids:
+            task_manager.add_task(self.make_task())
+        elif action == 1:
+            task_manager.update_task(task_ids[0], priority=rng.choice(list(Priority)),
+                                     due_date=self.now + timedelta(days=rng.randint(-30, 30) or 1))
+        elif action == 2:
+            task_manager.complete_task(task_ids[0])
+        elif action == 3:
+            task_manager.delete_task(task_ids[0])
+        elif action == 4:
+            task_manager.bulk_add(self.make_task() for _ in range(rng.randint(1, 100)))
+        elif action == 5:
+            task_manager.bulk_remove(self.random_ids(rng.randint(1, 80)))
+        elif action == 6:
+            task_manager.bulk_set({task_id: {"completed": rng.random() < 0.5, "priority": rng.choice(list(Priority))}
+                                   for task_id in self.random_ids(rng.randint(1, 80))})
+        elif action == 7:
+            self.undo_stack.undo()
+        else:
+            self.undo_stack.redo()
+
+    def test_stats_match_recompute_after_each_edit(self):
+        self.task_manager.bulk_add(self.make_task() for _ in range(200))
+        for step in range(300):
+            self.edit()
+            self.assertEqual(self.task_manager.get_tasks_stats(), self.task_manager.recompute_tasks_stats(),
+                             f"after step {step}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from src.models import task_store as task_store_module
+from src.models.task import Task
+from src.models.task_store import StoreError, TaskStore
+
+
+class OpenRowsTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = TaskStore(os.path.join(directory.name, "tasks.db"))
+        self.addCleanup(self.store.close)
+        tasks = [Task(f"Task {number}", "Description") for number in range(3)]
+        for number, task in enumerate(tasks, start=1):
+            task.id = number
+        self.store.save_all(tasks)
+        self.store.flush()
+        self.connections = []
+        connect = sqlite3.connect
+        patcher = mock.patch.object(task_store_module.sqlite3, "connect",
+                                    lambda *args, **kwargs: self._track(connect(*args, **kwargs)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _track(self, connection):
+        self.connections.append(connection)
+        return connection
+
+    def assert_closed(self):
+        self.assertEqual(len(self.connections), 1)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            self.connections[0].execute("SELECT 1")
+
+    def test_connection_closed_when_rows_consumed(self):
+        rows = self.store.open_texts()
+        self.assertEqual([row[0] for row in rows], [1, 2, 3])
+        self.assert_closed()
+
+    def test_connection_closed_when_reader_stops_early(self):
+        rows = self.store.open_records()
+        self.assertEqual(next(rows)[1], "Task 0")
+        rows.close()
+        self.assert_closed()
+
+
+class WriterTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "tasks.db")
+        self.store = TaskStore(self.path)
+
+    def make_task(self, task_id, title):
+        task = Task(title)
+        task.id = task_id
+        return task
+
+    def stored_ids(self):
+        return [row[0] for row in self.store.open_texts()]
+
+    def test_failed_write_is_raised_by_flush(self):
+        self.store.save(self.make_task(1, "Buy milk"))
+        self.store.save(self.make_task(2, None))  # violates NOT NULL
+        with self.assertRaisesRegex(StoreError, "NOT NULL"):
+            self.store.flush()
+        # The writer survives: later writes are stored and flush returns
+        self.store.save(self.make_task(3, "Buy bread"))
+        self.store.flush()
+        self.assertIn(3, self.stored_ids())
+        self.assertNotIn(2, self.stored_ids())
+        self.store.close()
+
+    def test_close_returns_after_failed_write(self):
+        self.store.save(self.make_task(1, None))
+        with self.assertRaises(StoreError):
+            self.store.close()
+        self.assertFalse(self.store._writer.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
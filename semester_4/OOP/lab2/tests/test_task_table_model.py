@@ -0,0 +1,48 @@
+import unittest
+
+from src.models.task import Task
+from src.models.task_manager import TaskManager
+from src.models.undo import UndoStack
+
+try:
+    from PyQt6.QtWidgets import QApplication
+    from src.views.task_table_model import TaskTableModel
+except ImportError:
+    QApplication = None
+
+
+def make_task(task_id):
+    task = Task(f"Task {task_id}")
+    task.id = task_id
+    return task
+
+
+@unittest.skipIf(QApplication is None, "PyQt6 is not installed")
+class TaskTableModelTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_set_tasks_orders_rows_by_id(self):
+        model = TaskTableModel(None)
+        model.set_tasks([make_task(task_id) for task_id in [1, 3, 4, 5, 2]])
+        self.assertEqual([model.task_at(row).id for row in range(model.task_count())], [1, 2, 3, 4, 5])
+        for task_id in range(1, 6):
+            self.assertEqual(model.row_of(task_id), task_id - 1)
+        self.assertEqual(model.row_of(6), -1)
+
+    def test_row_of_after_undoing_a_delete(self):
+        task_manager = TaskManager()
+        undo_stack = UndoStack(task_manager)
+        for number in range(5):
+            task_manager.add_task(Task(f"Task {number}"))
+        task_manager.delete_task(2)
+        undo_stack.undo()
+        model = TaskTableModel(task_manager)
+        model.set_tasks(task_manager.get_all_tasks())
+        for task_id in range(1, 6):
+            self.assertEqual(model.task_at(model.row_of(task_id)).id, task_id)
+
+
+if __name__ == "__main__":
+    unittest.main()